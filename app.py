@@ -1,10 +1,45 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, abort, g, Response, stream_with_context, has_request_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.exc import IntegrityError, OperationalError, DBAPIError
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from werkzeug.middleware.proxy_fix import ProxyFix
+from datetime import datetime, date, timedelta
 import os
 from functools import wraps
+from itertools import chain, accumulate, count
+from collections import OrderedDict, Counter, defaultdict
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+import urllib.request
+import threading
+import bisect
+import re
+import math
+import mmap
+import struct
+import contextvars
+import time
+import hashlib
+import hmac
+import operator
+import uuid
+import base64
+import click
+import csv
+import io
+import json
+import sqlite3
+
+try:
+    import orjson
+except ImportError:  # optional, much faster JSON encoding
+    orjson = None
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -13,10 +48,105 @@ app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:/
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 
+# Reverse proxies in front of the app. Their X-Forwarded-For and
+# X-Forwarded-Proto headers are trusted for that many hops, so
+# request.remote_addr, which rate limits key on, is the client's address.
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES)
+
+# Engine tuning. Pool settings apply to every database; the SQLite pragmas are
+# set on each new connection (WAL lets readers run alongside a writer, and
+# busy_timeout makes concurrent writers wait instead of failing).
+database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+if database_url.get_backend_name() != 'sqlite' or database_url.database not in (None, '', ':memory:'):
+    # In-memory SQLite uses a single static connection, so there is no pool to size
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+    }
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+}
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
+
+# Read replicas: DATABASE_REPLICA_URLS is a comma-separated list of replica
+# URLs, registered as the binds replica_1..replica_n. Routes marked
+# @replica_read send their queries to one of them (see READ REPLICAS).
+REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+app.config['SQLALCHEMY_BINDS'] = {f'replica_{number}': url for number, url in enumerate(REPLICA_URLS, 1)}
+
+
+# Sends reads to the replica chosen for the current request, if any. Writes,
+# flushes and explicitly bound statements always go to the primary.
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = g.get('replica')
+        if replica and bind is None and not self._flushing and not getattr(clause, 'is_dml', False):
+            return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
 # Initialize extensions
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 CORS(app, supports_credentials=True, origins=['http://localhost:3000', 'http://localhost:5000', '*'])
 
+# ==================== PASSWORD HASHING ====================
+
+# Any werkzeug method string, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'.
+# Stored hashes made with other parameters are upgraded on the next login.
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_TIMEOUT = int(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+_password_pool = None
+_password_pool_pid = None
+_password_pool_lock = threading.Lock()
+
+
+# Runs a werkzeug hash function in a small per-process pool, so a worker's
+# request threads are not blocked on the GIL while a hash is computed.
+# PASSWORD_HASH_WORKERS=0 hashes inline.
+def run_password_hasher(func, *args):
+    global _password_pool, _password_pool_pid
+    if PASSWORD_HASH_WORKERS <= 0:
+        return func(*args)
+    
+    with _password_pool_lock:
+        # A pool inherited through fork (e.g. gunicorn --preload) is unusable
+        if _password_pool is None or _password_pool_pid != os.getpid():
+            _password_pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+            _password_pool_pid = os.getpid()
+    return _password_pool.submit(func, *args).result(timeout=PASSWORD_HASH_TIMEOUT)
+
+
+_password_hash_prefix = None
+
+
+# werkzeug expands defaults into the stored prefix ('scrypt' -> 'scrypt:32768:8:1'),
+# so compare against the prefix of an actual hash made with the configured method
+def password_hash_prefix():
+    global _password_hash_prefix
+    if _password_hash_prefix is None:
+        _password_hash_prefix = generate_password_hash('', method=PASSWORD_HASH_METHOD).split('$', 1)[0]
+    return _password_hash_prefix
+
+
 # ==================== DATABASE MODELS ====================
 
 class User(db.Model):
@@ -37,10 +167,13 @@ class User(db.Model):
     complaints = db.relationship('Complaint', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = run_password_hasher(generate_password_hash, password, PASSWORD_HASH_METHOD)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return run_password_hasher(check_password_hash, self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return self.password_hash.split('$', 1)[0] != password_hash_prefix()
     
     def to_dict(self):
         return {
@@ -54,20 +187,49 @@ class User(db.Model):
         }
 
 
+class Amenity(db.Model):
+    __tablename__ = 'amenities'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), unique=True, nullable=False)
+    
+    # Amenities are looked up by name case-insensitively
+    __table_args__ = (
+        db.Index('ix_amenities_lower_name', db.func.lower(name)),
+    )
+
+
+# The primary keys serve "amenities of a listing"; the reverse indexes serve
+# "listings with an amenity"
+wedding_hall_amenities = db.Table(
+    'wedding_hall_amenities',
+    db.Column('wedding_hall_id', db.Integer, db.ForeignKey('wedding_halls.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('amenity_id', db.Integer, db.ForeignKey('amenities.id'), primary_key=True),
+    db.Index('ix_wedding_hall_amenities_amenity', 'amenity_id', 'wedding_hall_id')
+)
+
+hotel_room_amenities = db.Table(
+    'hotel_room_amenities',
+    db.Column('hotel_room_id', db.Integer, db.ForeignKey('hotel_rooms.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('amenity_id', db.Integer, db.ForeignKey('amenities.id'), primary_key=True),
+    db.Index('ix_hotel_room_amenities_amenity', 'amenity_id', 'hotel_room_id')
+)
+
+
 class WeddingHall(db.Model):
     __tablename__ = 'wedding_halls'
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
-    location = db.Column(db.String(200), nullable=False)
-    capacity = db.Column(db.Integer, nullable=False)
-    price_per_day = db.Column(db.Float, nullable=False)
+    location = db.Column(db.String(200), nullable=False, index=True)
+    capacity = db.Column(db.Integer, nullable=False, index=True)
+    price_per_day = db.Column(db.Float, nullable=False, index=True)
     description = db.Column(db.Text)
-    amenities = db.Column(db.String(500))  # Comma-separated
-    rating = db.Column(db.Float, default=4.5)
+    rating = db.Column(db.Float, default=4.5, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     bookings = db.relationship('Booking', backref='wedding_hall', lazy=True, cascade='all, delete-orphan')
+    amenities = db.relationship('Amenity', secondary=wedding_hall_amenities, lazy='selectin', order_by='Amenity.name')
     
     def to_dict(self):
         return {
@@ -77,7 +239,7 @@ class WeddingHall(db.Model):
             'capacity': self.capacity,
             'price_per_day': self.price_per_day,
             'description': self.description,
-            'amenities': self.amenities.split(',') if self.amenities else [],
+            'amenities': [amenity.name for amenity in self.amenities],
             'rating': self.rating
         }
 
@@ -87,16 +249,16 @@ class HotelRoom(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
-    hotel_name = db.Column(db.String(120), nullable=False)
-    room_type = db.Column(db.String(50), nullable=False)  # Single, Double, Suite
-    capacity = db.Column(db.Integer, nullable=False)
-    price_per_night = db.Column(db.Float, nullable=False)
-    amenities = db.Column(db.String(500))  # Comma-separated
-    rating = db.Column(db.Float, default=4.0)
-    available = db.Column(db.Boolean, default=True)
+    hotel_name = db.Column(db.String(120), nullable=False, index=True)
+    room_type = db.Column(db.String(50), nullable=False, index=True)  # Single, Double, Suite
+    capacity = db.Column(db.Integer, nullable=False, index=True)
+    price_per_night = db.Column(db.Float, nullable=False, index=True)
+    rating = db.Column(db.Float, default=4.0, index=True)
+    available = db.Column(db.Boolean, default=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     bookings = db.relationship('Booking', backref='hotel_room', lazy=True, cascade='all, delete-orphan')
+    amenities = db.relationship('Amenity', secondary=hotel_room_amenities, lazy='selectin', order_by='Amenity.name')
     
     def to_dict(self):
         return {
@@ -106,7 +268,7 @@ class HotelRoom(db.Model):
             'room_type': self.room_type,
             'capacity': self.capacity,
             'price_per_night': self.price_per_night,
-            'amenities': self.amenities.split(',') if self.amenities else [],
+            'amenities': [amenity.name for amenity in self.amenities],
             'rating': self.rating,
             'available': self.available
         }
@@ -118,15 +280,20 @@ class ShoppingItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     category = db.Column(db.String(80), nullable=False)  # Electronics, Fashion, Home, etc
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Float, nullable=False, index=True)
     stock = db.Column(db.Integer, default=10)
     description = db.Column(db.Text)
-    rating = db.Column(db.Float, default=4.0)
-    vendor = db.Column(db.String(120), nullable=False)
+    rating = db.Column(db.Float, default=4.0, index=True)
+    vendor = db.Column(db.String(120), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     orders = db.relationship('Order', backref='item', lazy=True, cascade='all, delete-orphan')
     
+    # Category browsing is usually sorted by price
+    __table_args__ = (
+        db.Index('ix_shopping_items_category_price', 'category', 'price'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -144,7 +311,7 @@ class Booking(db.Model):
     __tablename__ = 'bookings'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     booking_type = db.Column(db.String(50), nullable=False)  # 'wedding_hall', 'hotel_room'
     wedding_hall_id = db.Column(db.Integer, db.ForeignKey('wedding_halls.id'))
     hotel_room_id = db.Column(db.Integer, db.ForeignKey('hotel_rooms.id'))
@@ -159,9 +326,19 @@ class Booking(db.Model):
     payment_status = db.Column(db.String(20), default='pending')  # pending, paid, failed
     payment_id = db.Column(db.String(100))  # Razorpay payment ID
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Revenue reports by period
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Availability lookups range-scan on check_out_date so only bookings ending
+    # after the requested start are visited, regardless of how much history exists
+    __table_args__ = (
+        db.Index('ix_bookings_hall_availability', 'wedding_hall_id', 'check_out_date', 'check_in_date', 'status'),
+        db.Index('ix_bookings_room_availability', 'hotel_room_id', 'check_out_date', 'check_in_date', 'status'),
+        # Lifecycle jobs: unpaid pending bookings by age, confirmed bookings by check-out
+        db.Index('ix_bookings_status_payment_created', 'status', 'payment_status', 'created_at'),
+        db.Index('ix_bookings_status_check_out', 'status', 'check_out_date'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -178,21 +355,87 @@ class Booking(db.Model):
         }
 
 
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+
+class RateRule(db.Model):
+    __tablename__ = 'rate_rules'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    booking_type = db.Column(db.String(50), nullable=False)  # 'wedding_hall', 'hotel_room'
+    resource_id = db.Column(db.Integer)  # None: every hall or room of the type
+    name = db.Column(db.String(120), nullable=False)
+    
+    start_date = db.Column(db.Date)  # None: open-ended; end_date is exclusive
+    end_date = db.Column(db.Date)
+    weekdays = db.Column(db.Integer)  # Bitmask, Monday = 1; None: every day
+    min_guests = db.Column(db.Integer, default=1)  # Applies to parties of at least this size
+    
+    multiplier = db.Column(db.Float, default=1.0)
+    amount = db.Column(db.Float, default=0.0)  # Added per night after the multipliers
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_rate_rules_resource', 'booking_type', 'resource_id'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'booking_type': self.booking_type,
+            'resource_id': self.resource_id,
+            'name': self.name,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'weekdays': weekday_names(self.weekdays),
+            'min_guests': self.min_guests,
+            'multiplier': self.multiplier,
+            'amount': self.amount,
+            'created_at': self.created_at.isoformat()
+        }
+
+
+def weekday_names(mask):
+    if mask is None:
+        return None
+    return [name for i, name in enumerate(WEEKDAYS) if mask >> i & 1]
+
+
 class Order(db.Model):
     __tablename__ = 'orders'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     item_id = db.Column(db.Integer, db.ForeignKey('shopping_items.id'), nullable=False)
+    cart_id = db.Column(db.String(32), index=True)  # Shared by orders placed together
     
     quantity = db.Column(db.Integer, nullable=False)
     total_price = db.Column(db.Float, nullable=False)
-    status = db.Column(db.String(20), default='pending')  # pending, paid, shipped, delivered
+    status = db.Column(db.String(20), default='pending')  # pending, paid, shipped, delivered, expired
     payment_id = db.Column(db.String(100))
+    reserved_until = db.Column(db.DateTime)  # Stock is released if still pending after this
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     user = db.relationship('User', backref='orders')
+    
+    __table_args__ = (
+        db.Index('ix_orders_status_reserved_until', 'status', 'reserved_until'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'item_id': self.item_id,
+            'cart_id': self.cart_id,
+            'quantity': self.quantity,
+            'total_price': self.total_price,
+            'status': self.status,
+            'reserved_until': self.reserved_until.isoformat() if self.reserved_until else None,
+            'created_at': self.created_at.isoformat()
+        }
 
 
 class Contact(db.Model):
@@ -208,13 +451,20 @@ class Contact(db.Model):
     
     status = db.Column(db.String(20), default='unread')  # unread, read, resolved
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    resolved_at = db.Column(db.DateTime)
+    
+    # Triage queues filter by status and age; resolution stats range over resolved_at
+    __table_args__ = (
+        db.Index('ix_contacts_status_created', 'status', 'created_at'),
+        db.Index('ix_contacts_resolved_at', 'resolved_at'),
+    )
 
 
 class Complaint(db.Model):
     __tablename__ = 'complaints'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
     complaint_type = db.Column(db.String(50), nullable=False)  # booking, payment, service, other
     subject = db.Column(db.String(200), nullable=False)
@@ -225,7 +475,125 @@ class Complaint(db.Model):
     admin_notes = db.Column(db.Text)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    resolved_at = db.Column(db.DateTime)
+    resolved_at = db.Column(db.DateTime)  # Set when resolved or closed, cleared if reopened
+    
+    # Triage queues filter by status plus priority or type, and by age
+    __table_args__ = (
+        db.Index('ix_complaints_status_priority_created', 'status', 'priority', 'created_at'),
+        db.Index('ix_complaints_status_type_created', 'status', 'complaint_type', 'created_at'),
+        db.Index('ix_complaints_resolved_at', 'resolved_at'),
+    )
+
+
+class Payment(db.Model):
+    __tablename__ = 'payments'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'))
+    cart_id = db.Column(db.String(32))  # Pays every order placed together
+    
+    amount = db.Column(db.Float, nullable=False)
+    currency = db.Column(db.String(3), default='INR')
+    status = db.Column(db.String(20), default='created')  # created, paid, failed, refund_due
+    gateway = db.Column(db.String(20), nullable=False)
+    gateway_order_id = db.Column(db.String(100), unique=True, nullable=False)
+    gateway_payment_id = db.Column(db.String(100))
+    idempotency_key = db.Column(db.String(100))  # Client's Idempotency-Key header
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'idempotency_key', name='uq_payments_user_idempotency_key'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'booking_id': self.booking_id,
+            'cart_id': self.cart_id,
+            'amount': self.amount,
+            'currency': self.currency,
+            'status': self.status,
+            'gateway': self.gateway,
+            'gateway_order_id': self.gateway_order_id,
+            'created_at': self.created_at.isoformat()
+        }
+
+
+# Every webhook delivery received, keyed by the gateway's event id. The unique
+# index makes a retried delivery a single failed insert; rows still 'received'
+# are the queue the payment verification job works through.
+class WebhookEvent(db.Model):
+    __tablename__ = 'webhook_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.String(100), unique=True, nullable=False)
+    event_type = db.Column(db.String(50))
+    payload = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='received')  # received, processed, ignored, failed
+    error = db.Column(db.Text)
+    
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_webhook_events_status_id', 'status', 'id'),
+    )
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text)  # JSON keyword arguments for the handler
+    status = db.Column(db.String(20), default='queued')  # queued, running, done, failed
+    run_at = db.Column(db.DateTime, default=datetime.utcnow)
+    attempts = db.Column(db.Integer, default=0)
+    locked_until = db.Column(db.DateTime)  # A running job past this is picked up again
+    last_error = db.Column(db.Text)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+
+# Transactional outbox: rows are written in the same commit as the change
+# they announce and delivered later by the notification dispatcher
+class Notification(db.Model):
+    __tablename__ = 'notifications'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event = db.Column(db.String(50), nullable=False)  # contact_received, complaint_submitted, booking_created
+    channel = db.Column(db.String(20), nullable=False)  # email, admin
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    
+    status = db.Column(db.String(20), default='pending')  # pending, sending, sent, failed
+    send_at = db.Column(db.DateTime, default=datetime.utcnow)
+    attempts = db.Column(db.Integer, default=0)
+    locked_until = db.Column(db.DateTime)  # A batch still sending past this is picked up again
+    last_error = db.Column(db.Text)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_notifications_status_send_at', 'status', 'send_at'),
+    )
+
+
+class SchemaMigration(db.Model):
+    __tablename__ = 'schema_migrations'
+    
+    version = db.Column(db.String(100), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
 # ==================== AUTHENTICATION DECORATOR ====================
@@ -245,176 +613,1565 @@ def admin_required(f):
         if 'user_id' not in session:
             return jsonify({'error': 'Unauthorized'}), 401
         
-        user = User.query.get(session['user_id'])
-        if not user or not user.is_admin:
+        user = current_user()
+        if not user or not user['is_admin']:
             return jsonify({'error': 'Admin access required'}), 403
         
         return f(*args, **kwargs)
     return decorated_function
 
 
-# ==================== AUTHENTICATION ROUTES ====================
+# ==================== READ REPLICAS ====================
 
-@app.route('/api/auth/signup', methods=['POST'])
-def signup():
-    data = request.get_json()
+REPLICA_HEALTH_INTERVAL = float(os.environ.get('REPLICA_HEALTH_INTERVAL', 5))
+REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 0))  # seconds, PostgreSQL only; 0: no lag check
+READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 10))
+
+
+# The replica binds of this worker, taken in turn. Each is health checked
+# at most every REPLICA_HEALTH_INTERVAL seconds by the first request that
+# picks it after that; an unhealthy replica is skipped until it passes again.
+class ReplicaSet:
+    def __init__(self, keys, interval, max_lag):
+        self.keys = keys
+        self.interval = interval
+        self.max_lag = max_lag
+        self.healthy = dict.fromkeys(keys, True)
+        self.checked = dict.fromkeys(keys, float('-inf'))
+        self.turns = count()
     
-    if not data or not all(k in data for k in ['username', 'email', 'password', 'full_name', 'phone']):
-        return jsonify({'error': 'Missing required fields'}), 400
+    # The next healthy replica in round-robin order, or None for the primary
+    def choose(self):
+        for _ in self.keys:
+            key = self.keys[next(self.turns) % len(self.keys)]
+            if self.is_healthy(key):
+                return key
+        return None
     
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already exists'}), 400
+    def is_healthy(self, key):
+        now = time.monotonic()
+        if now - self.checked[key] >= self.interval:
+            self.checked[key] = now
+            self.healthy[key] = self.ping(key)
+        return self.healthy[key]
     
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already exists'}), 400
+    # A replica is healthy when it answers a query against the schema and,
+    # with REPLICA_MAX_LAG set on PostgreSQL, has replayed recent enough WAL
+    def ping(self, key):
+        engine = db.engines[key]
+        try:
+            with engine.connect() as connection:
+                connection.execute(db.select(User.id).limit(1))
+                if self.max_lag and engine.dialect.name == 'postgresql':
+                    lag = connection.scalar(db.text(
+                        'SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)'
+                    ))
+                    if lag > self.max_lag:
+                        app.logger.warning('Replica %s is %.1fs behind, using other databases', key, lag)
+                        return False
+        except DBAPIError as error:
+            app.logger.warning('Replica %s failed its health check: %s', key, error.orig)
+            return False
+        return True
     
-    user = User(
-        username=data['username'],
-        email=data['email'],
-        full_name=data['full_name'],
-        phone=data['phone']
-    )
-    user.set_password(data['password'])
+    def mark_down(self, key):
+        self.healthy[key] = False
+        self.checked[key] = time.monotonic()
+
+
+replicas = ReplicaSet(list(app.config['SQLALCHEMY_BINDS']), REPLICA_HEALTH_INTERVAL, REPLICA_MAX_LAG) \
+    if REPLICA_URLS else None
+
+
+@event.listens_for(db.session, 'after_commit')
+def record_request_commit(session):
+    if has_request_context():
+        g.committed = True
+
+
+# Signed-in clients read from the primary for READ_YOUR_WRITES_SECONDS after
+# a request that committed, so a booking shows up in their next list or
+# availability check however far the replicas are behind
+@app.after_request
+def pin_writers_to_primary(response):
+    if replicas and g.get('committed') and 'user_id' in session:
+        session['primary_until'] = int(time.time()) + READ_YOUR_WRITES_SECONDS
+    return response
+
+
+def pinned_to_primary():
+    return session.get('primary_until', 0) > time.time()
+
+
+# Runs a read-only route against a replica when one is configured and
+# healthy. If the replica fails mid-request it is marked down and the route
+# runs again on the primary. Routes whose responses are cached are left on
+# the primary (see catalog_cached).
+def replica_read(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not replicas:
+            return f(*args, **kwargs)
+        
+        replica = None if pinned_to_primary() else replicas.choose()
+        DB_ROUTED_READS.inc(replica or 'primary')
+        if replica is None:
+            return f(*args, **kwargs)
+        
+        g.replica = replica
+        try:
+            return f(*args, **kwargs)
+        except OperationalError as error:
+            app.logger.warning(
+                'Replica %s failed, retrying %s on the primary: %s', replica, request.endpoint, error.orig
+            )
+            db.session.rollback()
+            replicas.mark_down(replica)
+            g.replica = None
+            DB_ROUTED_READS.inc('primary')
+            return f(*args, **kwargs)
+    return decorated_function
+
+
+@app.cli.command('sync-replicas')
+def sync_replicas_command():
+    """Copy the primary into each SQLite replica, for local testing."""
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('sync-replicas copies SQLite files; replicate other databases natively')
+    source = sqlite3.connect(db.engine.url.database)
+    try:
+        for key in app.config['SQLALCHEMY_BINDS']:
+            url = db.engines[key].url
+            if url.get_backend_name() != 'sqlite':
+                print(f'Skipped {key}: not a SQLite database')
+                continue
+            target = sqlite3.connect(url.database)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+            db.engines[key].dispose()
+            print(f'Copied the primary to {key} ({url.database})')
+    finally:
+        source.close()
+
+
+# ==================== CACHING ====================
+
+class LRUCache:
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
     
-    db.session.add(user)
-    db.session.commit()
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
     
-    session['user_id'] = user.id
+    def set(self, key, value, ex=None):
+        ttl = ex if ex is not None else self.ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl if ttl else None, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
     
-    return jsonify({
-        'message': 'Signup successful',
-        'user': user.to_dict()
-    }), 201
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
 
 
-@app.route('/api/auth/login', methods=['POST'])
-def login():
-    data = request.get_json()
-    
-    if not data or not all(k in data for k in ['username', 'password']):
-        return jsonify({'error': 'Missing credentials'}), 400
+# Local stand-in for a shared cache such as Redis: every worker on the host
+# sees the same entries. Exposes the same get/set(ex=) subset as redis-py.
+class FileCache:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
     
-    user = User.query.filter_by(username=data['username']).first()
-    
-    if not user or not user.check_password(data['password']):
-        return jsonify({'error': 'Invalid credentials'}), 401
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
     
-    session['user_id'] = user.id
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                expires_at, value = f.read().split(b'\n', 1)
+        except (OSError, ValueError):
+            return None
+        if expires_at and float(expires_at) <= time.time():
+            return None
+        return value
     
-    return jsonify({
-        'message': 'Login successful',
-        'user': user.to_dict()
-    }), 200
+    def set(self, key, value, ex=None):
+        if isinstance(value, str):
+            value = value.encode()
+        expires_at = str(time.time() + ex).encode() if ex else b''
+        tmp_path = f'{self._path(key)}.{uuid.uuid4().hex}'
+        with open(tmp_path, 'wb') as f:
+            f.write(expires_at + b'\n' + value)
+        os.replace(tmp_path, self._path(key))
 
 
-@app.route('/api/auth/logout', methods=['POST'])
-def logout():
-    session.pop('user_id', None)
-    return jsonify({'message': 'Logged out successfully'}), 200
+def cache_backend_from_url(url, maxsize, ttl):
+    if not url:
+        return LRUCache(maxsize, ttl)
+    parsed = urlparse(url)
+    if parsed.scheme == 'file':
+        return FileCache(parsed.path)
+    if parsed.scheme in ('redis', 'rediss'):
+        import redis
+        return redis.Redis.from_url(url)
+    raise ValueError(f'Unsupported cache URL: {url}')
 
 
-@app.route('/api/auth/me', methods=['GET'])
-@login_required
-def get_current_user():
-    user = User.query.get(session['user_id'])
-    return jsonify(user.to_dict()), 200
+# (models, cache) pairs: the cache is cleared after any commit that wrote one of the models
+cache_invalidations = []
 
 
-# ==================== WEDDING HALL ROUTES ====================
+def invalidate_on_commit(cache, *models):
+    cache_invalidations.append((models, cache))
 
-@app.route('/api/wedding-halls', methods=['GET'])
-def get_wedding_halls():
-    halls = WeddingHall.query.all()
-    return jsonify([hall.to_dict() for hall in halls]), 200
 
+def invalidate_caches_for(*models):
+    for cache_models, cache in cache_invalidations:
+        if any(issubclass(model, cache_models) for model in models):
+            cache.clear()
 
-@app.route('/api/wedding-halls/<int:hall_id>', methods=['GET'])
-def get_wedding_hall(hall_id):
-    hall = WeddingHall.query.get_or_404(hall_id)
-    return jsonify(hall.to_dict()), 200
 
+@event.listens_for(db.session, 'after_flush')
+def record_written_models(session, flush_context):
+    written = session.info.setdefault('written_models', set())
+    written.update(type(obj) for obj in chain(session.new, session.dirty, session.deleted))
 
-@app.route('/api/wedding-halls', methods=['POST'])
-@admin_required
-def create_wedding_hall():
-    data = request.get_json()
-    
-    if not data or not all(k in data for k in ['name', 'location', 'capacity', 'price_per_day']):
-        return jsonify({'error': 'Missing required fields'}), 400
-    
-    hall = WeddingHall(
-        name=data['name'],
-        location=data['location'],
-        capacity=data['capacity'],
-        price_per_day=data['price_per_day'],
-        description=data.get('description'),
-        amenities=data.get('amenities', '')
-    )
-    
-    db.session.add(hall)
-    db.session.commit()
-    
-    return jsonify({
-        'message': 'Wedding hall created',
-        'hall': hall.to_dict()
-    }), 201
 
+@event.listens_for(db.session, 'after_commit')
+def invalidate_written_caches(session):
+    written = session.info.pop('written_models', None)
+    if written:
+        invalidate_caches_for(*written)
 
-# ==================== HOTEL ROOM ROUTES ====================
 
-@app.route('/api/hotel-rooms', methods=['GET'])
-def get_hotel_rooms():
-    rooms = HotelRoom.query.all()
-    return jsonify([room.to_dict() for room in rooms]), 200
+@event.listens_for(db.session, 'after_rollback')
+def discard_written_models(session):
+    session.info.pop('written_models', None)
 
 
-@app.route('/api/hotel-rooms/<int:room_id>', methods=['GET'])
-def get_hotel_room(room_id):
-    room = HotelRoom.query.get_or_404(room_id)
-    return jsonify(room.to_dict()), 200
+# ==================== CATALOG CACHE ====================
 
+CATALOG_CACHE_TTL = int(os.environ.get('CATALOG_CACHE_TTL', 300))
 
-@app.route('/api/hotel-rooms', methods=['POST'])
-@admin_required
-def create_hotel_room():
-    data = request.get_json()
+
+# Read-through cache of serialized catalog responses. Keys carry a generation
+# token that clear() replaces, so one write invalidates every cached page
+# without having to enumerate keys in a shared backend.
+class CatalogCache:
+    GENERATION_KEY = 'catalog:generation'
     
-    if not data or not all(k in data for k in ['name', 'hotel_name', 'room_type', 'capacity', 'price_per_night']):
-        return jsonify({'error': 'Missing required fields'}), 400
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
     
-    room = HotelRoom(
-        name=data['name'],
-        hotel_name=data['hotel_name'],
-        room_type=data['room_type'],
-        capacity=data['capacity'],
-        price_per_night=data['price_per_night'],
-        amenities=data.get('amenities', '')
-    )
+    def _key(self, key):
+        generation = self.backend.get(self.GENERATION_KEY) or b'0'
+        return f'catalog:{generation.decode()}:{key}'
     
-    db.session.add(room)
-    db.session.commit()
+    def get(self, key):
+        return self.backend.get(self._key(key))
     
-    return jsonify({
-        'message': 'Hotel room created',
-        'room': room.to_dict()
-    }), 201
+    def set(self, key, value):
+        self.backend.set(self._key(key), value, ex=self.ttl)
+    
+    def clear(self):
+        self.backend.set(self.GENERATION_KEY, uuid.uuid4().hex.encode())
 
 
-# ==================== SHOPPING ROUTES ====================
+catalog_cache = CatalogCache(
+    cache_backend_from_url(
+        os.environ.get('CATALOG_CACHE_URL'),
+        int(os.environ.get('CATALOG_CACHE_SIZE', 1024)),
+        CATALOG_CACHE_TTL
+    ),
+    CATALOG_CACHE_TTL
+)
+invalidate_on_commit(catalog_cache, WeddingHall, HotelRoom, ShoppingItem)
 
-@app.route('/api/shopping-items', methods=['GET'])
-def get_shopping_items():
-    category = request.args.get('category')
-    
-    if category:
-        items = ShoppingItem.query.filter_by(category=category).all()
-    else:
-        items = ShoppingItem.query.all()
-    
-    return jsonify([item.to_dict() for item in items]), 200
+
+# Caches successful JSON responses as "<etag> <body>" bytes keyed by the full
+# request path, and answers If-None-Match with 304 Not Modified. Cached routes
+# read from the primary, never a replica: one stale page read from a lagging
+# replica would be served to every client until it expired. Clients pinned to
+# the primary after a write skip the cache, so theirs shows up at once.
+def catalog_cached(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if pinned_to_primary():
+            return f(*args, **kwargs)
+        
+        key = request.full_path
+        cached = catalog_cache.get(key)
+        if cached is not None:
+            etag, body = cached.split(b' ', 1)
+            response = Response(body, mimetype='application/json')
+            response.set_etag(etag.decode())
+            return response.make_conditional(request)
+        
+        response = app.make_response(f(*args, **kwargs))
+        if response.status_code != 200:
+            return response
+        body = response.get_data()
+        etag = hashlib.md5(body).hexdigest()
+        catalog_cache.set(key, etag.encode() + b' ' + body)
+        response.set_etag(etag)
+        return response.make_conditional(request)
+    return decorated_function
+
+
+# ==================== SERIALIZATION ====================
+
+# Columns returned by list endpoints, matching each model's to_dict(). Lists
+# select just these columns, so rows are never hydrated into ORM objects.
+USER_FIELDS = (User.id, User.username, User.email, User.full_name, User.phone, User.is_admin, User.created_at)
+HALL_FIELDS = (
+    WeddingHall.id, WeddingHall.name, WeddingHall.location, WeddingHall.capacity,
+    WeddingHall.price_per_day, WeddingHall.description, WeddingHall.rating
+)
+ROOM_FIELDS = (
+    HotelRoom.id, HotelRoom.name, HotelRoom.hotel_name, HotelRoom.room_type, HotelRoom.capacity,
+    HotelRoom.price_per_night, HotelRoom.rating, HotelRoom.available
+)
+ITEM_FIELDS = (
+    ShoppingItem.id, ShoppingItem.name, ShoppingItem.category, ShoppingItem.price, ShoppingItem.stock,
+    ShoppingItem.description, ShoppingItem.rating, ShoppingItem.vendor
+)
+BOOKING_FIELDS = (
+    Booking.id, Booking.user_id, Booking.booking_type, Booking.check_in_date, Booking.check_out_date,
+    Booking.total_price, Booking.guests, Booking.special_requests, Booking.status,
+    Booking.payment_status, Booking.created_at
+)
+ORDER_FIELDS = (
+    Order.id, Order.user_id, Order.item_id, Order.cart_id, Order.quantity, Order.total_price,
+    Order.status, Order.reserved_until, Order.created_at
+)
+CONTACT_FIELDS = (
+    Contact.id, Contact.name, Contact.email, Contact.phone, Contact.message, Contact.status, Contact.created_at,
+    Contact.resolved_at
+)
+COMPLAINT_FIELDS = (
+    Complaint.id, Complaint.user_id, Complaint.complaint_type, Complaint.subject, Complaint.description,
+    Complaint.status, Complaint.priority, Complaint.admin_notes, Complaint.created_at, Complaint.resolved_at
+)
+# Triage queues leave out the message and description text; the detail
+# routes return it. Contacts get a short preview of the message instead.
+CONTACT_QUEUE_FIELDS = (
+    Contact.id, Contact.name, Contact.email, Contact.phone, db.func.substr(Contact.message, 1, 100).label('preview'),
+    Contact.status, Contact.created_at, Contact.resolved_at
+)
+COMPLAINT_QUEUE_FIELDS = (
+    Complaint.id, Complaint.user_id, Complaint.complaint_type, Complaint.subject, Complaint.status,
+    Complaint.priority, Complaint.created_at, Complaint.resolved_at
+)
+USER_COMPLAINT_FIELDS = (
+    Complaint.id, Complaint.complaint_type, Complaint.subject, Complaint.status, Complaint.priority,
+    Complaint.created_at
+)
+RATE_RULE_FIELDS = (
+    RateRule.id, RateRule.booking_type, RateRule.resource_id, RateRule.name, RateRule.start_date,
+    RateRule.end_date, RateRule.weekdays, RateRule.min_guests, RateRule.multiplier, RateRule.amount,
+    RateRule.created_at
+)
+
+
+def json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=json_default, separators=(',', ':')).encode()
+
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+
+def serialize_rows(rows, fields):
+    keys = [field.key for field in fields]
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def amenities_select(association, key, ids):
+    return db.select(association.c[key], Amenity.name) \
+        .join(Amenity, Amenity.id == association.c.amenity_id) \
+        .where(association.c[key].in_(ids)) \
+        .order_by(Amenity.name)
+
+
+# Adds an `amenities` list to each serialized hall or room with one query per page
+def attach_amenities(items, association, key):
+    by_id = {item['id']: item for item in items}
+    for item in items:
+        item['amenities'] = []
+    if by_id:
+        for row_id, name in db.session.execute(amenities_select(association, key, by_id)):
+            by_id[row_id]['amenities'].append(name)
+    return items
+
+
+def page_response(query, key_column, fields, sort_column=None, descending=False):
+    rows, next_cursor = paginate(query.with_entities(*fields), key_column, sort_column, descending)
+    return serialize_rows(rows, fields), next_cursor
+
+
+# ==================== SESSION PRINCIPAL ====================
+
+PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 30))
+principal_cache = LRUCache(int(os.environ.get('PRINCIPAL_CACHE_SIZE', 10000)), PRINCIPAL_CACHE_TTL)
+invalidate_on_commit(principal_cache, User)
+
+
+# The signed-in user's to_dict(), resolved at most once per request and kept
+# in a short-TTL cache that is cleared whenever a User is written. Other
+# workers pick up changes within PRINCIPAL_CACHE_TTL seconds.
+def current_user():
+    if 'current_user' not in g:
+        user_id = session.get('user_id')
+        user = principal_cache.get(user_id) if user_id is not None else None
+        if user is None and user_id is not None:
+            record = db.session.get(User, user_id)
+            if record:
+                user = record.to_dict()
+                principal_cache.set(user_id, user)
+        g.current_user = user
+    return g.current_user
+
+
+def sign_in(user):
+    session['user_id'] = user.id
+    principal_cache.set(user.id, user.to_dict())
+
+
+# ==================== PAGINATION ====================
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, default=json_default).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        abort(400, description='Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        abort(400, description='Invalid cursor')
+    return values
+
+
+# Keyset pagination on a unique, indexed column, optionally ordered by another
+# column first (ties broken by the key). Applies the `cursor` and `limit` in
+# `args` to a query or select() and returns it with the page size; one extra
+# row is fetched to know whether another page exists.
+def keyset_page(query, args, key_column, sort_column=None, descending=False):
+    limit = min(max(args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    cursor = args.get('cursor')
+    
+    if cursor and sort_column is None:
+        last_key, = decode_cursor(cursor, 1)
+        query = query.filter(key_column > last_key)
+    elif cursor:
+        last_sort, last_key = decode_cursor(cursor, 2)
+        if isinstance(sort_column.type, db.DateTime):
+            # Datetimes travel in cursors as ISO strings
+            try:
+                last_sort = datetime.fromisoformat(last_sort)
+            except (TypeError, ValueError):
+                abort(400, description='Invalid cursor')
+        after = sort_column < last_sort if descending else sort_column > last_sort
+        query = query.filter(db.or_(after, db.and_(sort_column == last_sort, key_column > last_key)))
+    
+    order_by = [key_column]
+    if sort_column is not None:
+        order_by.insert(0, sort_column.desc() if descending else sort_column)
+    
+    return query.order_by(*order_by).limit(limit + 1), limit
+
+
+# Drops the extra row and returns the page with the cursor for the next page
+# (None on the last page)
+def finish_page(rows, limit, key_column, sort_column=None):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = [getattr(rows[-1], key_column.key)]
+        if sort_column is not None:
+            last.insert(0, getattr(rows[-1], sort_column.key))
+        next_cursor = encode_cursor(last)
+    return rows, next_cursor
+
+
+def paginate(query, key_column, sort_column=None, descending=False):
+    query, limit = keyset_page(query, request.args, key_column, sort_column, descending)
+    return finish_page(query.all(), limit, key_column, sort_column)
+
+
+# ==================== CATALOG SEARCH ====================
+
+# model -> FTS5 table name; only tables created successfully
+# at startup are used, everything else falls back to LIKE matching
+FULL_TEXT_SEARCH = {}
+
+
+def parse_bool(value):
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError(value)
+
+
+def in_stock(column, value):
+    return column > 0 if value else column <= 0
+
+
+def setup_full_text_search(model, columns):
+    if db.engine.dialect.name != 'sqlite':
+        return
+    
+    table = model.__tablename__
+    fts = f'{table}_fts'
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    statements = [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+    
+    exists = db.session.execute(
+        db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': fts}
+    ).first()
+    try:
+        if not exists:
+            for statement in statements:
+                db.session.execute(db.text(statement))
+            db.session.commit()
+    except OperationalError:
+        # SQLite built without FTS5
+        db.session.rollback()
+        return
+    FULL_TEXT_SEARCH[model] = fts
+
+
+def search_filter(model, text):
+    terms = text.split()
+    if model in FULL_TEXT_SEARCH:
+        fts = FULL_TEXT_SEARCH[model]
+        # Quote every term so user input is never parsed as FTS5 syntax
+        match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        matches = db.text(f'SELECT rowid FROM {fts} WHERE {fts} MATCH :match') \
+            .bindparams(match=match).columns(db.column('rowid'))
+        return model.id.in_(matches)
+    
+    columns = [getattr(model, column) for column in CATALOG_SEARCH_COLUMNS[model]]
+    return db.and_(*[
+        db.or_(*[column.ilike(f'%{term}%') for column in columns])
+        for term in terms
+    ])
+
+
+def parse_list(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+# Turns the filters in `args` (param -> (column, operator, parser)), `q`
+# full-text search and `sort` (a sortable name, '-' prefix for descending)
+# into WHERE criteria and the sort column
+def catalog_criteria(model, filters, sorts, args):
+    criteria = []
+    
+    for param, (column, op, parse) in filters.items():
+        raw = args.get(param)
+        if not raw:
+            continue
+        try:
+            value = parse(raw)
+        except ValueError:
+            abort(400, description=f'Invalid value for {param}')
+        criteria.append(op(column, value))
+    
+    text = args.get('q', '').strip()
+    if text:
+        criteria.append(search_filter(model, text))
+    
+    sort = args.get('sort')
+    sort_column, descending = None, False
+    if sort:
+        descending = sort.startswith('-')
+        sort_column = sorts.get(sort.lstrip('-'))
+        if sort_column is None:
+            abort(400, description=f"sort must be one of: {', '.join(sorts)}")
+    
+    return criteria, sort_column, descending
+
+
+# One page of `fields` as dicts for the current request
+def catalog_query(model, fields, filters, sorts):
+    criteria, sort_column, descending = catalog_criteria(model, filters, sorts, request.args)
+    return page_response(model.query.filter(*criteria), model.id, fields, sort_column, descending)
+
+
+# ==================== AMENITIES ====================
+
+# Accepts a comma-separated string or a list of names and returns the
+# matching Amenity rows, creating any that don't exist yet
+def amenities_from(value):
+    if isinstance(value, str):
+        value = value.split(',')
+    names = list(dict.fromkeys(name.strip() for name in value or [] if name.strip()))
+    if not names:
+        return []
+    
+    existing = {
+        amenity.name.lower(): amenity
+        for amenity in Amenity.query.filter(db.func.lower(Amenity.name).in_([name.lower() for name in names]))
+    }
+    amenities = []
+    for name in names:
+        if name.lower() not in existing:
+            existing[name.lower()] = Amenity(name=name)
+        amenities.append(existing[name.lower()])
+    return amenities
+
+
+# Filter operator for "has all of these amenities": one indexed EXISTS probe
+# per amenity, so paginated queries stop as soon as a page is filled. Amenity
+# ids are looked up in scalar subqueries (an unknown name matches nothing), so
+# the filter is a single statement that also runs on the async driver.
+def has_amenities(association, key):
+    def has_all(column, names):
+        return db.and_(*[
+            db.exists().where(
+                association.c[key] == column,
+                association.c.amenity_id == db.select(Amenity.id)
+                .where(db.func.lower(Amenity.name) == name)
+                .scalar_subquery()
+            )
+            for name in {name.lower() for name in names}
+        ])
+    return has_all
+
+
+# Moves the legacy comma-separated `amenities` column into the association
+# tables. Migrated rows are cleared, so this is a no-op once done.
+def migrate_amenity_strings():
+    inspector = db.inspect(db.engine)
+    for model, association, key in (
+        (WeddingHall, wedding_hall_amenities, 'wedding_hall_id'),
+        (HotelRoom, hotel_room_amenities, 'hotel_room_id'),
+    ):
+        table = model.__tablename__
+        if 'amenities' not in {column['name'] for column in inspector.get_columns(table)}:
+            continue
+        
+        rows = db.session.execute(
+            db.text(f"SELECT id, amenities FROM {table} WHERE amenities IS NOT NULL AND amenities != ''")
+        ).all()
+        if not rows:
+            continue
+        
+        amenities = {amenity.name.lower(): amenity for amenity in amenities_from(
+            [name for _, value in rows for name in value.split(',')]
+        )}
+        db.session.add_all(amenities.values())
+        db.session.flush()
+        
+        links = {
+            (row_id, amenities[name.lower()].id)
+            for row_id, value in rows
+            for name in parse_list(value)
+        }
+        db.session.execute(association.insert(), [{key: row_id, 'amenity_id': amenity_id} for row_id, amenity_id in links])
+        db.session.execute(db.text(f'UPDATE {table} SET amenities = NULL'))
+        db.session.commit()
+
+
+# ==================== STREAMING EXPORT ====================
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def export_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+# Streams `columns` of every row as NDJSON or CSV. Rows are fetched as plain
+# tuples in chunks (server-side cursor where supported), so memory use does
+# not grow with the table and the first chunk is sent straight away.
+def export_response(name, columns):
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        abort(400, description="format must be 'ndjson' or 'csv'")
+    
+    fields = [column.key for column in columns]
+    statement = db.select(*columns).order_by(columns[0]).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    
+    def generate():
+        result = db.session.execute(statement)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == 'csv':
+            writer.writerow(fields)
+        
+        for chunk in result.partitions():
+            for row in chunk:
+                values = [export_value(value) for value in row]
+                if fmt == 'csv':
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(fields, values))))
+                    buffer.write('\n')
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={name}.{fmt}'}
+    )
+
+
+# ==================== AVAILABILITY ====================
+
+MAX_AVAILABILITY_WINDOW_DAYS = 366
+
+
+def parse_date(value):
+    return datetime.fromisoformat(value).date()
+
+
+def overlap_criteria(resource_column, resource_id, start, end):
+    # Half-open intervals: a booking checking out on `start` does not overlap
+    return (
+        resource_column == resource_id,
+        Booking.check_out_date > start,
+        Booking.check_in_date < end,
+        Booking.status != 'cancelled'
+    )
+
+
+def overlapping_bookings(resource_column, resource_id, start, end):
+    return Booking.query.filter(*overlap_criteria(resource_column, resource_id, start, end))
+
+
+def taken_dates(resource_column, resource_id, start, end):
+    return db.select(Booking.check_in_date, Booking.check_out_date) \
+        .where(*overlap_criteria(resource_column, resource_id, start, end)) \
+        .order_by(Booking.check_in_date)
+
+
+# Gaps between the (check_in, check_out) rows of `taken`, sorted by check-in
+def free_date_ranges(taken, start, end):
+    ranges = []
+    cursor = start
+    for check_in, check_out in taken:
+        if check_in > cursor:
+            ranges.append({'from': cursor.isoformat(), 'to': check_in.isoformat()})
+        cursor = max(cursor, check_out)
+    if cursor < end:
+        ranges.append({'from': cursor.isoformat(), 'to': end.isoformat()})
+    return ranges
+
+
+# The `from` / `to` window in `args` (default: the next 30 days). Raises
+# ValueError with the message for the client when it is invalid.
+def availability_window(args):
+    try:
+        start = parse_date(args['from']) if args.get('from') else date.today()
+        end = parse_date(args['to']) if args.get('to') else start + timedelta(days=30)
+    except ValueError:
+        raise ValueError('Invalid date format, expected YYYY-MM-DD')
+    
+    if end <= start:
+        raise ValueError("'to' must be after 'from'")
+    if (end - start).days > MAX_AVAILABILITY_WINDOW_DAYS:
+        raise ValueError(f'Date range cannot exceed {MAX_AVAILABILITY_WINDOW_DAYS} days')
+    return start, end
+
+
+def availability_response(resource_column, resource_id):
+    try:
+        start, end = availability_window(request.args)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    taken = db.session.execute(taken_dates(resource_column, resource_id, start, end))
+    return jsonify({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'free': free_date_ranges(taken, start, end)
+    }), 200
+
+
+# ==================== BACKGROUND JOBS ====================
+
+JOB_POLL_INTERVAL = int(os.environ.get('JOB_POLL_INTERVAL', 5))  # 0: no in-process worker
+JOB_BATCH_SIZE = int(os.environ.get('JOB_BATCH_SIZE', 5000))
+JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', 300))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', 7))
+
+# name -> handler(**payload), and name -> seconds between runs for periodic jobs
+JOB_HANDLERS = {}
+PERIODIC_JOBS = {}
+
+
+# Registers a job handler; with `every` (seconds, 0 disables) the job
+# re-enqueues itself after each run
+def job(name, every=None):
+    def register(f):
+        JOB_HANDLERS[name] = f
+        if every:
+            PERIODIC_JOBS[name] = every
+        return f
+    return register
+
+
+# Adds a job to the session; it is queued when the caller commits, so it only
+# runs if the surrounding write does
+def enqueue(name, run_at=None, **payload):
+    queued = Job(name=name, payload=json.dumps(payload), run_at=run_at or datetime.utcnow())
+    db.session.add(queued)
+    return queued
+
+
+def schedule_periodic_jobs():
+    pending = set(db.session.scalars(
+        db.select(Job.name).where(Job.name.in_(PERIODIC_JOBS), Job.status.in_(('queued', 'running')))
+    ))
+    for name in PERIODIC_JOBS.keys() - pending:
+        enqueue(name)
+    db.session.commit()
+
+
+def claimable(now):
+    return db.and_(
+        Job.run_at <= now,
+        db.or_(Job.status == 'queued', db.and_(Job.status == 'running', Job.locked_until < now))
+    )
+
+
+# Marks up to `limit` due jobs as running in one statement. The condition is
+# re-checked by the UPDATE itself, so concurrent workers never claim the same job.
+def claim_due_jobs(limit):
+    now = datetime.utcnow()
+    due = db.select(Job.id).where(claimable(now)).order_by(Job.run_at).limit(limit)
+    claimed = db.session.scalars(
+        db.update(Job)
+        .where(Job.id.in_(due), claimable(now))
+        .values(status='running', attempts=Job.attempts + 1, locked_until=now + timedelta(seconds=JOB_LEASE_SECONDS))
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return claimed
+
+
+# Runs one claimed job. Failed one-off jobs are retried with exponential
+# backoff; periodic jobs are simply queued for their next run.
+def run_job(job_id):
+    claimed = db.session.get(Job, job_id)
+    name, payload = claimed.name, json.loads(claimed.payload or '{}')
+    error = None
+    try:
+        JOB_HANDLERS[name](**payload)
+    except Exception as exc:
+        db.session.rollback()
+        app.logger.exception('Job %s (%s) failed', job_id, name)
+        error = repr(exc)
+    
+    claimed = db.session.get(Job, job_id)
+    now = datetime.utcnow()
+    claimed.locked_until = None
+    claimed.last_error = error
+    if error and name not in PERIODIC_JOBS and claimed.attempts < JOB_MAX_ATTEMPTS:
+        claimed.status = 'queued'
+        claimed.run_at = now + timedelta(seconds=30 * 2 ** claimed.attempts)
+    else:
+        claimed.status = 'failed' if error else 'done'
+        claimed.finished_at = now
+    
+    if name in PERIODIC_JOBS and not db.session.scalar(
+        db.select(Job.id).where(Job.name == name, Job.status == 'queued').limit(1)
+    ):
+        enqueue(name, run_at=now + timedelta(seconds=PERIODIC_JOBS[name]))
+    db.session.commit()
+
+
+def run_pending_jobs(limit=100):
+    claimed = claim_due_jobs(limit)
+    for job_id in claimed:
+        run_job(job_id)
+    return len(claimed)
+
+
+def run_job_worker():
+    with app.app_context():
+        schedule_periodic_jobs()
+    while True:
+        time.sleep(JOB_POLL_INTERVAL)
+        with app.app_context():
+            try:
+                run_pending_jobs()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('Running background jobs failed')
+
+
+_job_worker_started = False
+_job_worker_lock = threading.Lock()
+
+
+# Starts this process's worker thread once. It is started by the first
+# request the process serves (and by asgi.py at startup) rather than on
+# import, so CLI commands and scripts that import the app never claim jobs,
+# and each forked server worker runs its own thread.
+def start_job_worker():
+    global _job_worker_started
+    if JOB_POLL_INTERVAL <= 0 or _job_worker_started:
+        return
+    with _job_worker_lock:
+        if not _job_worker_started:
+            threading.Thread(target=run_job_worker, name='job-worker', daemon=True).start()
+            _job_worker_started = True
+
+
+@app.before_request
+def start_job_worker_when_serving():
+    start_job_worker()
+
+
+# Applies `values` to every booking matching `criteria` with set-based UPDATEs
+# of JOB_BATCH_SIZE rows, committing after each so no single transaction
+# holds the write lock for long. Returns the number of bookings changed.
+def update_bookings_in_batches(criteria, values):
+    total = 0
+    while True:
+        # Rows are locked as the batch is picked (skipping any a request is
+        # updating) so they still match the criteria when updated; SQLite
+        # ignores FOR UPDATE as a statement there holds the write lock anyway
+        batch = db.select(Booking.id).where(*criteria).limit(JOB_BATCH_SIZE).with_for_update(skip_locked=True)
+        updated = db.session.execute(
+            db.update(Booking)
+            .where(Booking.id.in_(batch))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        total += updated
+        if updated < JOB_BATCH_SIZE:
+            break
+    if total:
+        invalidate_caches_for(Booking)
+    return total
+
+
+@job('purge_finished_jobs', every=86400)
+def purge_finished_jobs(now=None):
+    cutoff = (now or datetime.utcnow()) - timedelta(days=JOB_RETENTION_DAYS)
+    deleted = db.session.execute(
+        db.delete(Job).where(Job.status.in_(('done', 'failed')), Job.finished_at < cutoff)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+@app.cli.command('run-jobs')
+@click.option('--once', is_flag=True, help='Run the jobs that are due now and exit.')
+def run_jobs_command(once):
+    """Run queued and periodic background jobs."""
+    schedule_periodic_jobs()
+    while True:
+        ran = run_pending_jobs()
+        if once:
+            print(f'Ran {ran} jobs')
+            return
+        if not ran:
+            time.sleep(JOB_POLL_INTERVAL or 5)
+
+
+# ==================== NOTIFICATIONS ====================
+
+NOTIFICATION_DISPATCH_INTERVAL = int(os.environ.get('NOTIFICATION_DISPATCH_INTERVAL', 10))  # 0: dispatcher process only
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', 100))
+NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', 8))
+NOTIFICATION_RETRY_SECONDS = int(os.environ.get('NOTIFICATION_RETRY_SECONDS', 30))
+NOTIFICATION_LEASE_SECONDS = int(os.environ.get('NOTIFICATION_LEASE_SECONDS', 60))
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', 30))
+ADMIN_NOTIFICATION_RECIPIENT = os.environ.get('ADMIN_NOTIFICATION_RECIPIENT', 'admin@bookingplatform.com')
+
+NOTIFICATION_FIELDS = (
+    Notification.id, Notification.event, Notification.channel, Notification.recipient,
+    Notification.subject, Notification.body
+)
+
+
+# Senders take a batch of notification dicts and return {id: error} for the
+# ones they could not deliver; raising fails the whole batch. The log and
+# file sinks stand in for email/SMS providers, which plug in the same way.
+class LogSender:
+    def send(self, messages):
+        for message in messages:
+            app.logger.info('Notification %(id)s to %(channel)s %(recipient)s: %(subject)s', message)
+        return {}
+
+
+class FileSender:
+    def __init__(self, path):
+        self.path = path
+    
+    def send(self, messages):
+        lines = ''.join(json.dumps(message, default=json_default) + '\n' for message in messages)
+        with open(self.path, 'a') as f:
+            f.write(lines)
+        return {}
+
+
+def notification_sender_from_url(url):
+    if not url or url == 'log:':
+        return LogSender()
+    parsed = urlparse(url)
+    if parsed.scheme == 'file':
+        return FileSender(parsed.path)
+    raise ValueError(f'Unsupported notification sender URL: {url}')
+
+
+notification_sender = notification_sender_from_url(os.environ.get('NOTIFICATION_SENDER_URL'))
+
+
+# Adds a notification to the session; like enqueue(), it is only sent if the
+# surrounding write commits, and the request never waits for delivery
+def notify(event, channel, recipient, subject, body):
+    notification = Notification(event=event, channel=channel, recipient=recipient, subject=subject, body=body)
+    db.session.add(notification)
+    return notification
+
+
+def sendable(now):
+    return db.and_(
+        Notification.send_at <= now,
+        db.or_(
+            Notification.status == 'pending',
+            db.and_(Notification.status == 'sending', Notification.locked_until < now)
+        )
+    )
+
+
+# Marks up to `limit` due notifications as sending in one statement, as
+# claim_due_jobs() does, so concurrent dispatchers never send one twice
+def claim_notifications(limit):
+    now = datetime.utcnow()
+    due = db.select(Notification.id).where(sendable(now)).order_by(Notification.send_at).limit(limit)
+    claimed = db.session.execute(
+        db.update(Notification)
+        .where(Notification.id.in_(due), sendable(now))
+        .values(
+            status='sending',
+            attempts=Notification.attempts + 1,
+            locked_until=now + timedelta(seconds=NOTIFICATION_LEASE_SECONDS)
+        )
+        .returning(*NOTIFICATION_FIELDS, Notification.attempts)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.session.commit()
+    return claimed
+
+
+# Sends one claimed batch and records the outcome with one UPDATE for the
+# delivered notifications and one executemany for the failed ones. Failures
+# are retried with exponential backoff up to NOTIFICATION_MAX_ATTEMPTS times.
+def dispatch_notification_batch(limit=NOTIFICATION_BATCH_SIZE):
+    claimed = claim_notifications(limit)
+    if not claimed:
+        return 0
+    
+    try:
+        errors = notification_sender.send(serialize_rows([row[:-1] for row in claimed], NOTIFICATION_FIELDS))
+    except Exception as exc:
+        app.logger.exception('Sending %d notifications failed', len(claimed))
+        errors = {row.id: repr(exc) for row in claimed}
+    
+    now = datetime.utcnow()
+    sent = [row.id for row in claimed if row.id not in errors]
+    if sent:
+        db.session.execute(
+            db.update(Notification)
+            .where(Notification.id.in_(sent))
+            .values(status='sent', sent_at=now, locked_until=None, last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+    failed = [row for row in claimed if row.id in errors]
+    if failed:
+        notifications = Notification.__table__
+        db.session.execute(
+            notifications.update()
+            .where(notifications.c.id == db.bindparam('failed_id'))
+            .values(
+                status=db.bindparam('failed_status'),
+                send_at=db.bindparam('retry_at'),
+                locked_until=None,
+                last_error=db.bindparam('error')
+            ),
+            [{
+                'failed_id': row.id,
+                'failed_status': 'pending' if row.attempts < NOTIFICATION_MAX_ATTEMPTS else 'failed',
+                'retry_at': now + timedelta(seconds=NOTIFICATION_RETRY_SECONDS * 2 ** (row.attempts - 1)),
+                'error': str(errors[row.id])
+            } for row in failed]
+        )
+    db.session.commit()
+    return len(claimed)
+
+
+# Drains the outbox batch by batch until less than a full batch is due
+@job('dispatch_notifications', every=NOTIFICATION_DISPATCH_INTERVAL)
+def dispatch_notifications():
+    total = 0
+    while True:
+        dispatched = dispatch_notification_batch()
+        total += dispatched
+        if dispatched < NOTIFICATION_BATCH_SIZE:
+            return total
+
+
+@job('purge_sent_notifications', every=86400)
+def purge_sent_notifications(now=None):
+    cutoff = (now or datetime.utcnow()) - timedelta(days=NOTIFICATION_RETENTION_DAYS)
+    deleted = db.session.execute(
+        db.delete(Notification).where(Notification.status.in_(('sent', 'failed')), Notification.send_at < cutoff)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+@app.cli.command('dispatch-notifications')
+@click.option('--once', is_flag=True, help='Send the notifications that are due now and exit.')
+def dispatch_notifications_command(once):
+    """Send queued notifications."""
+    while True:
+        dispatched = dispatch_notifications()
+        if once:
+            print(f'Dispatched {dispatched} notifications')
+            return
+        if not dispatched:
+            time.sleep(NOTIFICATION_DISPATCH_INTERVAL or 5)
+
+
+# ==================== RATE LIMITING ====================
+
+# Off switch for load tests and trusted deployments; policies are read per route below
+RATE_LIMITING = os.environ.get('RATE_LIMITING', 'true').lower() in ('1', 'true', 'yes')
+RATE_LIMIT_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+# '10/minute' -> (tokens per second, burst). 'off' disables the limit.
+def parse_rate_limit(value):
+    if value.strip().lower() in ('', '0', 'off'):
+        return None
+    count, period = value.split('/')
+    count = int(count)
+    return count / RATE_LIMIT_PERIODS[period.strip().lower().rstrip('s')], count
+
+
+# Refills a bucket for the time since it was last updated and takes one
+# token. Returns (allowed, tokens left, seconds until a token is available).
+def take_token(tokens, updated, now, rate, burst):
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0
+    return False, tokens, (1 - tokens) / rate
+
+
+# Buckets in this process, least recently used evicted past maxsize (an
+# evicted bucket starts full again)
+class MemoryBucketStore:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def take(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            allowed, tokens, retry_after = take_token(tokens, updated, now, rate, burst)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+# Local stand-in for a shared store: buckets live in a memory-mapped file of
+# fixed slots, so every worker on the host draws from the same buckets. Each
+# slot holds (key hash, tokens, updated) and is locked with a byte-range lock
+# while it is updated. Keys hashing to a slot owned by another key take it
+# over with a full bucket.
+class FileBucketStore:
+    SLOT = struct.Struct('<Qdd')
+    
+    def __init__(self, path, slots):
+        import fcntl
+        self._fcntl = fcntl
+        self.slots = slots
+        size = slots * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        # Byte-range locks are held per process, so threads also need a lock
+        self._lock = threading.Lock()
+    
+    def take(self, key, rate, burst):
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+        offset = digest % self.slots * self.SLOT.size
+        with self._lock:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_EX, self.SLOT.size, offset)
+            try:
+                now = time.time()
+                owner, tokens, updated = self.SLOT.unpack_from(self._map, offset)
+                if owner != digest:
+                    tokens, updated = burst, now
+                allowed, tokens, retry_after = take_token(tokens, updated, now, rate, burst)
+                self.SLOT.pack_into(self._map, offset, digest, tokens, now)
+            finally:
+                self._fcntl.lockf(self._fd, self._fcntl.LOCK_UN, self.SLOT.size, offset)
+        return allowed, retry_after
+
+
+def bucket_store_from_url(url, size):
+    if not url:
+        return MemoryBucketStore(size)
+    parsed = urlparse(url)
+    if parsed.scheme == 'file':
+        return FileBucketStore(parsed.path, size)
+    raise ValueError(f'Unsupported rate limit store URL: {url}')
+
+
+rate_limit_store = bucket_store_from_url(
+    os.environ.get('RATE_LIMIT_STORE_URL'),
+    int(os.environ.get('RATE_LIMIT_STORE_SIZE', 65536))
+)
+
+
+_proxy_warning_logged = False
+
+
+# The address anonymous requests are limited by. A forwarded request while
+# TRUSTED_PROXIES is unset is keyed on the proxy, putting every client in one
+# bucket, so the first one is logged.
+def client_address():
+    global _proxy_warning_logged
+    if not TRUSTED_PROXIES and not _proxy_warning_logged and 'X-Forwarded-For' in request.headers:
+        _proxy_warning_logged = True
+        app.logger.warning(
+            'Request forwarded by %s but TRUSTED_PROXIES is not set: rate limits will treat every client '
+            'behind the proxy as one', request.remote_addr
+        )
+    return request.remote_addr
+
+
+# Token bucket per client for one route, configurable as RATE_LIMIT_<NAME>.
+# by='ip' keys on the client address; by='user' on the signed-in user, falling
+# back to the address. Runs before authentication and reads only the session
+# cookie, so a rejected request never reaches the database.
+def rate_limited(name, default, by='ip'):
+    policy = parse_rate_limit(os.environ.get(f'RATE_LIMIT_{name.upper()}', default))
+    
+    def decorator(f):
+        if not RATE_LIMITING or policy is None:
+            return f
+        rate, burst = policy
+        
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            user_id = session.get('user_id') if by == 'user' else None
+            key = f'{name}:user:{user_id}' if user_id else f'{name}:ip:{client_address()}'
+            allowed, retry_after = rate_limit_store.take(key, rate, burst)
+            if not allowed:
+                return jsonify({'error': 'Too many requests'}), 429, {'Retry-After': str(math.ceil(retry_after))}
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
+# ==================== AUTHENTICATION ROUTES ====================
+
+@app.route('/api/auth/signup', methods=['POST'])
+@rate_limited('signup', '10/hour')
+def signup():
+    data = request.get_json()
+    
+    if not data or not all(k in data for k in ['username', 'email', 'password', 'full_name', 'phone']):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    if User.query.filter_by(username=data['username']).first():
+        return jsonify({'error': 'Username already exists'}), 400
+    
+    if User.query.filter_by(email=data['email']).first():
+        return jsonify({'error': 'Email already exists'}), 400
+    
+    user = User(
+        username=data['username'],
+        email=data['email'],
+        full_name=data['full_name'],
+        phone=data['phone']
+    )
+    user.set_password(data['password'])
+    
+    db.session.add(user)
+    db.session.commit()
+    
+    sign_in(user)
+    
+    return jsonify({
+        'message': 'Signup successful',
+        'user': user.to_dict()
+    }), 201
+
+
+@app.route('/api/auth/login', methods=['POST'])
+@rate_limited('login', '20/minute')
+def login():
+    data = request.get_json()
+    
+    if not data or not all(k in data for k in ['username', 'password']):
+        return jsonify({'error': 'Missing credentials'}), 400
+    
+    user = User.query.filter_by(username=data['username']).first()
+    
+    if not user or not user.check_password(data['password']):
+        return jsonify({'error': 'Invalid credentials'}), 401
+    
+    if user.password_needs_rehash():
+        user.set_password(data['password'])
+        db.session.commit()
+    
+    sign_in(user)
+    
+    return jsonify({
+        'message': 'Login successful',
+        'user': user.to_dict()
+    }), 200
+
+
+@app.route('/api/auth/logout', methods=['POST'])
+def logout():
+    session.pop('user_id', None)
+    return jsonify({'message': 'Logged out successfully'}), 200
+
+
+@app.route('/api/auth/me', methods=['GET'])
+@login_required
+def get_current_user():
+    user = current_user()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify(user), 200
+
+
+# ==================== CATALOG FILTERS ====================
+
+CATALOG_SEARCH_COLUMNS = {
+    WeddingHall: ('name', 'description'),
+    HotelRoom: ('name', 'hotel_name'),
+    ShoppingItem: ('name', 'description'),
+    Complaint: ('subject',),
+    Contact: ('name', 'email'),
+}
+
+HALL_FILTERS = {
+    'location': (WeddingHall.location, operator.eq, str),
+    'min_capacity': (WeddingHall.capacity, operator.ge, int),
+    'max_capacity': (WeddingHall.capacity, operator.le, int),
+    'min_price': (WeddingHall.price_per_day, operator.ge, float),
+    'max_price': (WeddingHall.price_per_day, operator.le, float),
+    'min_rating': (WeddingHall.rating, operator.ge, float),
+    'amenities': (WeddingHall.id, has_amenities(wedding_hall_amenities, 'wedding_hall_id'), parse_list),
+}
+HALL_SORTS = {
+    'price': WeddingHall.price_per_day,
+    'capacity': WeddingHall.capacity,
+    'rating': WeddingHall.rating,
+    'name': WeddingHall.name,
+}
+
+ROOM_FILTERS = {
+    'hotel_name': (HotelRoom.hotel_name, operator.eq, str),
+    'room_type': (HotelRoom.room_type, operator.eq, str),
+    'min_capacity': (HotelRoom.capacity, operator.ge, int),
+    'max_capacity': (HotelRoom.capacity, operator.le, int),
+    'min_price': (HotelRoom.price_per_night, operator.ge, float),
+    'max_price': (HotelRoom.price_per_night, operator.le, float),
+    'available': (HotelRoom.available, operator.eq, parse_bool),
+    'amenities': (HotelRoom.id, has_amenities(hotel_room_amenities, 'hotel_room_id'), parse_list),
+}
+ROOM_SORTS = {
+    'price': HotelRoom.price_per_night,
+    'capacity': HotelRoom.capacity,
+    'rating': HotelRoom.rating,
+    'name': HotelRoom.name,
+}
+
+ITEM_FILTERS = {
+    'category': (ShoppingItem.category, operator.eq, str),
+    'vendor': (ShoppingItem.vendor, operator.eq, str),
+    'min_price': (ShoppingItem.price, operator.ge, float),
+    'max_price': (ShoppingItem.price, operator.le, float),
+    'in_stock': (ShoppingItem.stock, in_stock, parse_bool),
+}
+ITEM_SORTS = {
+    'price': ShoppingItem.price,
+    'rating': ShoppingItem.rating,
+    'name': ShoppingItem.name,
+}
+
+
+# ==================== WEDDING HALL ROUTES ====================
+
+@app.route('/api/wedding-halls', methods=['GET'])
+@catalog_cached
+def get_wedding_halls():
+    halls, next_cursor = catalog_query(WeddingHall, HALL_FIELDS, HALL_FILTERS, HALL_SORTS)
+    attach_amenities(halls, wedding_hall_amenities, 'wedding_hall_id')
+    return json_response({'items': halls, 'next_cursor': next_cursor})
+
+
+@app.route('/api/wedding-halls/<int:hall_id>', methods=['GET'])
+@catalog_cached
+def get_wedding_hall(hall_id):
+    hall = WeddingHall.query.get_or_404(hall_id)
+    return jsonify(hall.to_dict()), 200
+
+
+@app.route('/api/wedding-halls/<int:hall_id>/availability', methods=['GET'])
+@replica_read
+def get_wedding_hall_availability(hall_id):
+    WeddingHall.query.get_or_404(hall_id)
+    return availability_response(Booking.wedding_hall_id, hall_id)
+
+
+@app.route('/api/wedding-halls', methods=['POST'])
+@admin_required
+def create_wedding_hall():
+    data = request.get_json()
+    
+    if not data or not all(k in data for k in ['name', 'location', 'capacity', 'price_per_day']):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    hall = WeddingHall(
+        name=data['name'],
+        location=data['location'],
+        capacity=data['capacity'],
+        price_per_day=data['price_per_day'],
+        description=data.get('description'),
+        amenities=amenities_from(data.get('amenities'))
+    )
+    
+    db.session.add(hall)
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Wedding hall created',
+        'hall': hall.to_dict()
+    }), 201
+
+
+# ==================== HOTEL ROOM ROUTES ====================
+
+@app.route('/api/hotel-rooms', methods=['GET'])
+@catalog_cached
+def get_hotel_rooms():
+    rooms, next_cursor = catalog_query(HotelRoom, ROOM_FIELDS, ROOM_FILTERS, ROOM_SORTS)
+    attach_amenities(rooms, hotel_room_amenities, 'hotel_room_id')
+    return json_response({'items': rooms, 'next_cursor': next_cursor})
+
+
+@app.route('/api/hotel-rooms/<int:room_id>', methods=['GET'])
+@catalog_cached
+def get_hotel_room(room_id):
+    room = HotelRoom.query.get_or_404(room_id)
+    return jsonify(room.to_dict()), 200
+
+
+@app.route('/api/hotel-rooms/<int:room_id>/availability', methods=['GET'])
+@replica_read
+def get_hotel_room_availability(room_id):
+    HotelRoom.query.get_or_404(room_id)
+    return availability_response(Booking.hotel_room_id, room_id)
+
+
+@app.route('/api/hotel-rooms', methods=['POST'])
+@admin_required
+def create_hotel_room():
+    data = request.get_json()
+    
+    if not data or not all(k in data for k in ['name', 'hotel_name', 'room_type', 'capacity', 'price_per_night']):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    room = HotelRoom(
+        name=data['name'],
+        hotel_name=data['hotel_name'],
+        room_type=data['room_type'],
+        capacity=data['capacity'],
+        price_per_night=data['price_per_night'],
+        amenities=amenities_from(data.get('amenities'))
+    )
+    
+    db.session.add(room)
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Hotel room created',
+        'room': room.to_dict()
+    }), 201
+
+
+# ==================== SHOPPING ROUTES ====================
+
+@app.route('/api/shopping-items', methods=['GET'])
+@catalog_cached
+def get_shopping_items():
+    items, next_cursor = catalog_query(ShoppingItem, ITEM_FIELDS, ITEM_FILTERS, ITEM_SORTS)
+    return json_response({'items': items, 'next_cursor': next_cursor})
 
 
 @app.route('/api/shopping-items/<int:item_id>', methods=['GET'])
+@catalog_cached
 def get_shopping_item(item_id):
     item = ShoppingItem.query.get_or_404(item_id)
     return jsonify(item.to_dict()), 200
@@ -446,9 +2203,308 @@ def create_shopping_item():
     }), 201
 
 
+# ==================== PRICING ====================
+
+PRICING_HORIZON_DAYS = int(os.environ.get('PRICING_HORIZON_DAYS', 400))
+PRICING_CACHE_TTL = int(os.environ.get('PRICING_CACHE_TTL', 300))
+rate_calendar_cache = LRUCache(int(os.environ.get('PRICING_CACHE_SIZE', 4096)), PRICING_CACHE_TTL)
+invalidate_on_commit(rate_calendar_cache, RateRule, WeddingHall, HotelRoom)
+
+MAX_QUOTES = 500
+MAX_QUOTE_NIGHTS = 366
+
+# booking_type -> (model, base price column, resource key in booking payloads)
+PRICED_RESOURCES = {
+    'wedding_hall': (WeddingHall, WeddingHall.price_per_day, 'wedding_hall_id'),
+    'hotel_room': (HotelRoom, HotelRoom.price_per_night, 'hotel_room_id'),
+}
+
+def resource_not_found(booking_type):
+    return 'Hall not found' if booking_type == 'wedding_hall' else 'Room not found'
+
+
+# Booking.wedding_hall_id or Booking.hotel_room_id
+def booking_column(booking_type):
+    return getattr(Booking, PRICED_RESOURCES[booking_type][2])
+
+
+RATE_RULE_COLUMNS = (
+    RateRule.resource_id, RateRule.start_date, RateRule.end_date, RateRule.weekdays,
+    RateRule.min_guests, RateRule.multiplier, RateRule.amount
+)
+
+
+# Nightly prices of one resource compiled from its rules for `days` nights
+# from `start`. Every party size a rule distinguishes gets an array of prefix
+# sums, so pricing any stay inside the window is a single subtraction.
+class RateCalendar:
+    def __init__(self, base_price, rules, start, days):
+        self.base_price = base_price
+        self.rules = rules
+        self.start = start
+        self.days = days
+        self.tiers = sorted({1} | {rule[3] for rule in rules})
+        self.sums = {tier: array('d', accumulate(self.nightly_prices(tier), initial=0)) for tier in self.tiers}
+    
+    # Multipliers compound and amounts add up, so the order of the rules does not matter
+    def nightly_prices(self, guests):
+        multipliers = [1.0] * self.days
+        amounts = [0.0] * self.days
+        first_weekday = self.start.weekday()
+        for start, end, weekdays, min_guests, multiplier, amount in self.rules:
+            if min_guests > guests:
+                continue
+            first = 0 if start is None else max((start - self.start).days, 0)
+            last = self.days if end is None else min((end - self.start).days, self.days)
+            for i in range(first, last):
+                if weekdays is None or weekdays >> (first_weekday + i) % 7 & 1:
+                    multipliers[i] *= multiplier
+                    amounts[i] += amount
+        return [max(self.base_price * m + a, 0) for m, a in zip(multipliers, amounts)]
+    
+    def price(self, check_in, check_out, guests):
+        first = (check_in - self.start).days
+        last = (check_out - self.start).days
+        if first < 0 or last > self.days:
+            # Outside the compiled window: compile just this stay
+            return RateCalendar(self.base_price, self.rules, check_in, last - first).price(check_in, check_out, guests)
+        sums = self.sums[self.tiers[bisect.bisect_right(self.tiers, guests) - 1]]
+        return round(sums[last] - sums[first], 2)
+
+
+# The rules applying to each of `resource_ids` (its own plus the ones for
+# every resource of the type) as plain tuples, with one query
+def rate_rules_for(booking_type, resource_ids):
+    rules = {resource_id: [] for resource_id in resource_ids}
+    shared = []
+    query = db.select(*RATE_RULE_COLUMNS).where(
+        RateRule.booking_type == booking_type,
+        db.or_(RateRule.resource_id.in_(rules), RateRule.resource_id.is_(None))
+    )
+    for resource_id, *rule in db.session.execute(query):
+        (shared if resource_id is None else rules[resource_id]).append(tuple(rule))
+    return {resource_id: shared + own for resource_id, own in rules.items()}
+
+
+# Calendars covering the next PRICING_HORIZON_DAYS for `resource_ids`, keyed
+# by id. Cached per resource and compiled in one batch for the misses;
+# resources that do not exist are left out.
+def rate_calendars(booking_type, resource_ids):
+    calendars = {}
+    missing = []
+    for resource_id in set(resource_ids):
+        calendar = rate_calendar_cache.get((booking_type, resource_id))
+        if calendar is None:
+            missing.append(resource_id)
+        else:
+            calendars[resource_id] = calendar
+    
+    if missing:
+        model, price_column, _ = PRICED_RESOURCES[booking_type]
+        prices = dict(db.session.execute(db.select(model.id, price_column).where(model.id.in_(missing))).all())
+        today = date.today()
+        for resource_id, rules in rate_rules_for(booking_type, prices).items():
+            calendar = RateCalendar(prices[resource_id], rules, today, PRICING_HORIZON_DAYS)
+            rate_calendar_cache.set((booking_type, resource_id), calendar)
+            calendars[resource_id] = calendar
+    return calendars
+
+
+# Prices a stay from the rules as they are right now, bypassing the cache
+def stay_price(booking_type, resource_id, base_price, check_in, check_out, guests):
+    rules = rate_rules_for(booking_type, [resource_id])[resource_id]
+    calendar = RateCalendar(base_price, rules, check_in, (check_out - check_in).days)
+    return calendar.price(check_in, check_out, guests)
+
+
+def party_size(value):
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError('Guests must be a positive whole number')
+    return value
+
+
+# (booking_type, resource_id, check_in, check_out, guests) for one quote
+# item. Raises ValueError with the message for the client when it is invalid.
+def quote_stay(item):
+    if not isinstance(item, dict) or item.get('booking_type') not in PRICED_RESOURCES:
+        raise ValueError('Invalid booking type')
+    booking_type = item['booking_type']
+    resource_key = PRICED_RESOURCES[booking_type][2]
+    resource_id = item.get(resource_key)
+    if isinstance(resource_id, bool) or not isinstance(resource_id, int):
+        raise ValueError(f'Missing {resource_key}')
+    
+    try:
+        check_in = parse_date(item['check_in_date'])
+        check_out = parse_date(item['check_out_date'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Invalid or missing booking dates')
+    if check_out <= check_in:
+        raise ValueError('Check-out date must be after check-in date')
+    if (check_out - check_in).days > MAX_QUOTE_NIGHTS:
+        raise ValueError(f'Stays cannot exceed {MAX_QUOTE_NIGHTS} nights')
+    
+    return booking_type, resource_id, check_in, check_out, party_size(item.get('guests', 1))
+
+
+def rate_rule_from(data):
+    booking_type = data.get('booking_type')
+    if booking_type not in PRICED_RESOURCES:
+        raise ValueError('Invalid booking type')
+    if not data.get('name'):
+        raise ValueError('Missing rule name')
+    
+    try:
+        start = parse_date(data['start_date']) if data.get('start_date') else None
+        end = parse_date(data['end_date']) if data.get('end_date') else None
+    except (TypeError, ValueError):
+        raise ValueError('Invalid date format, expected YYYY-MM-DD')
+    if start and end and end <= start:
+        raise ValueError("'end_date' must be after 'start_date'")
+    
+    weekdays = data.get('weekdays')
+    if weekdays is not None:
+        try:
+            weekdays = sum(1 << WEEKDAYS.index(day.lower()) for day in set(weekdays))
+        except (AttributeError, TypeError, ValueError):
+            raise ValueError(f"'weekdays' must be a list of {', '.join(WEEKDAYS)}")
+    
+    try:
+        multiplier = float(data.get('multiplier', 1))
+        amount = float(data.get('amount', 0))
+    except (TypeError, ValueError):
+        raise ValueError("'multiplier' and 'amount' must be numbers")
+    if not multiplier > 0:
+        raise ValueError("'multiplier' must be positive")
+    
+    return RateRule(
+        booking_type=booking_type,
+        resource_id=data.get('resource_id'),
+        name=data['name'],
+        start_date=start,
+        end_date=end,
+        weekdays=weekdays,
+        min_guests=party_size(data.get('min_guests', 1)),
+        multiplier=multiplier,
+        amount=amount
+    )
+
+
+@app.route('/api/quotes', methods=['POST'])
+@rate_limited('quotes', '120/minute')
+def create_quotes():
+    data = request.get_json()
+    
+    if not data or not isinstance(data.get('items'), list) or not data['items']:
+        return jsonify({'error': 'Missing quote items'}), 400
+    if len(data['items']) > MAX_QUOTES:
+        return jsonify({'error': f'At most {MAX_QUOTES} quotes per request'}), 400
+    
+    stays = []
+    for item in data['items']:
+        try:
+            stays.append(quote_stay(item))
+        except ValueError as error:
+            stays.append(str(error))
+    
+    resource_ids = defaultdict(list)
+    for stay in stays:
+        if not isinstance(stay, str):
+            resource_ids[stay[0]].append(stay[1])
+    calendars = {booking_type: rate_calendars(booking_type, ids) for booking_type, ids in resource_ids.items()}
+    
+    # Quotes line up with the items; invalid ones carry an error instead of a price
+    quotes = []
+    for stay in stays:
+        if isinstance(stay, str):
+            quotes.append({'error': stay})
+            continue
+        booking_type, resource_id, check_in, check_out, guests = stay
+        quote = {
+            'booking_type': booking_type,
+            PRICED_RESOURCES[booking_type][2]: resource_id,
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': check_out.isoformat(),
+            'guests': guests
+        }
+        calendar = calendars[booking_type].get(resource_id)
+        if calendar is None:
+            quote['error'] = resource_not_found(booking_type)
+        else:
+            quote['nights'] = (check_out - check_in).days
+            quote['total_price'] = calendar.price(check_in, check_out, guests)
+        quotes.append(quote)
+    
+    return json_response({'quotes': quotes})
+
+
+@app.route('/api/admin/rate-rules', methods=['GET'])
+@admin_required
+@replica_read
+def get_rate_rules():
+    rules, next_cursor = page_response(RateRule.query, RateRule.id, RATE_RULE_FIELDS)
+    for rule in rules:
+        rule['weekdays'] = weekday_names(rule['weekdays'])
+    return json_response({'items': rules, 'next_cursor': next_cursor})
+
+
+@app.route('/api/admin/rate-rules', methods=['POST'])
+@admin_required
+def create_rate_rule():
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    try:
+        rule = rate_rule_from(data)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    if rule.resource_id is not None and not db.session.get(PRICED_RESOURCES[rule.booking_type][0], rule.resource_id):
+        return jsonify({'error': resource_not_found(rule.booking_type)}), 404
+    
+    db.session.add(rule)
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Rate rule created',
+        'rule': rule.to_dict()
+    }), 201
+
+
+@app.route('/api/admin/rate-rules/<int:rule_id>/delete', methods=['POST'])
+@admin_required
+def delete_rate_rule(rule_id):
+    rule = RateRule.query.get_or_404(rule_id)
+    db.session.delete(rule)
+    db.session.commit()
+    return jsonify({'message': 'Rate rule deleted'}), 200
+
+
 # ==================== BOOKING ROUTES ====================
 
+MAX_BATCH_BOOKINGS = 100
+
+
+# One confirmation email to the signed-in user for bookings made together
+def notify_booked(bookings):
+    user = current_user()
+    stays = '\n'.join(
+        f'#{booking.id} {booking.booking_type.replace("_", " ")}: {booking.check_in_date} to '
+        f'{booking.check_out_date}, {booking.total_price:.2f}'
+        for booking in bookings
+    )
+    subject = 'Booking received' if len(bookings) == 1 else f'{len(bookings)} bookings received'
+    notify(
+        'booking_created', 'email', user['email'], subject,
+        f"Hi {user['full_name']},\n\nWe received your booking request:\n{stays}\n\n"
+        "It will be confirmed once payment is complete."
+    )
+
+
 @app.route('/api/bookings', methods=['POST'])
+@rate_limited('bookings', '30/minute', by='user')
 @login_required
 def create_booking():
     data = request.get_json()
@@ -456,39 +2512,63 @@ def create_booking():
     if not data or 'booking_type' not in data:
         return jsonify({'error': 'Missing booking type'}), 400
     
-    from datetime import datetime
-    check_in = datetime.fromisoformat(data['check_in_date']).date()
-    check_out = datetime.fromisoformat(data['check_out_date']).date()
+    try:
+        check_in = parse_date(data['check_in_date'])
+        check_out = parse_date(data['check_out_date'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Invalid or missing booking dates'}), 400
+    
+    if check_out <= check_in:
+        return jsonify({'error': 'Check-out date must be after check-in date'}), 400
     
-    # Calculate price based on booking type
-    total_price = 0
+    try:
+        guests = party_size(data.get('guests', 1))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    # Price from the resource's rate rules. The resource row is locked
+    # (SELECT ... FOR UPDATE on PostgreSQL) so bookings for it are serialized.
     if data['booking_type'] == 'wedding_hall':
-        hall = WeddingHall.query.get(data['wedding_hall_id'])
+        hall = WeddingHall.query.filter_by(id=data.get('wedding_hall_id')).with_for_update().first()
         if not hall:
             return jsonify({'error': 'Hall not found'}), 404
-        days = (check_out - check_in).days
-        total_price = hall.price_per_day * days
+        total_price = stay_price('wedding_hall', hall.id, hall.price_per_day, check_in, check_out, guests)
+        resource_column, resource_id = Booking.wedding_hall_id, hall.id
     
     elif data['booking_type'] == 'hotel_room':
-        room = HotelRoom.query.get(data['hotel_room_id'])
+        room = HotelRoom.query.filter_by(id=data.get('hotel_room_id')).with_for_update().first()
         if not room:
             return jsonify({'error': 'Room not found'}), 404
-        nights = (check_out - check_in).days
-        total_price = room.price_per_night * nights
+        total_price = stay_price('hotel_room', room.id, room.price_per_night, check_in, check_out, guests)
+        resource_column, resource_id = Booking.hotel_room_id, room.id
+    
+    else:
+        return jsonify({'error': 'Invalid booking type'}), 400
     
     booking = Booking(
         user_id=session['user_id'],
         booking_type=data['booking_type'],
-        wedding_hall_id=data.get('wedding_hall_id'),
-        hotel_room_id=data.get('hotel_room_id'),
+        wedding_hall_id=resource_id if data['booking_type'] == 'wedding_hall' else None,
+        hotel_room_id=resource_id if data['booking_type'] == 'hotel_room' else None,
         check_in_date=check_in,
         check_out_date=check_out,
         total_price=total_price,
-        guests=data.get('guests', 1),
+        guests=guests,
         special_requests=data.get('special_requests')
     )
     
+    # Insert first, then check: the pending insert holds the write lock until
+    # commit, so a concurrent worker cannot pass the same check in between
     db.session.add(booking)
+    db.session.flush()
+    
+    conflict = overlapping_bookings(resource_column, resource_id, check_in, check_out) \
+        .filter(Booking.id != booking.id).first()
+    if conflict:
+        db.session.rollback()
+        return jsonify({'error': 'Selected dates are not available'}), 409
+    
+    notify_booked([booking])
     db.session.commit()
     
     return jsonify({
@@ -497,44 +2577,646 @@ def create_booking():
     }), 201
 
 
+@app.route('/api/bookings/batch', methods=['POST'])
+@rate_limited('booking_batches', '10/minute', by='user')
+@login_required
+def create_booking_batch():
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object with a bookings list'}), 400
+    
+    items = data.get('bookings')
+    if not isinstance(items, list) or not 0 < len(items) <= MAX_BATCH_BOOKINGS:
+        return jsonify({'error': f'A batch must have between 1 and {MAX_BATCH_BOOKINGS} bookings'}), 400
+    
+    stays = []
+    for index, item in enumerate(items):
+        try:
+            stays.append(quote_stay(item))
+        except ValueError as error:
+            return jsonify({'error': str(error), 'index': index}), 400
+    
+    # Stays in the batch must not overlap each other either
+    by_resource = defaultdict(list)
+    for index, (booking_type, resource_id, check_in, check_out, _) in enumerate(stays):
+        by_resource[booking_type, resource_id].append((check_in, check_out, index))
+    for ranges in by_resource.values():
+        ranges.sort()
+        for (_, previous_check_out, previous_index), (check_in, _, index) in zip(ranges, ranges[1:]):
+            if check_in < previous_check_out:
+                return jsonify({'error': 'Selected dates are not available', 'index': max(index, previous_index)}), 409
+    
+    # One IN query per booking type fetches and locks every resource (types
+    # in name order and rows in id order, so concurrent batches lock rows in
+    # the same order), one more fetches their rate rules
+    prices = {}
+    rules = {}
+    for booking_type in sorted({stay[0] for stay in stays}):
+        model, price_column, _ = PRICED_RESOURCES[booking_type]
+        ids = {resource_id for stay_type, resource_id in by_resource if stay_type == booking_type}
+        prices[booking_type] = dict(db.session.execute(
+            db.select(model.id, price_column).where(model.id.in_(ids)).order_by(model.id).with_for_update()
+        ).all())
+        rules[booking_type] = rate_rules_for(booking_type, prices[booking_type])
+    
+    rows = []
+    for index, (item, (booking_type, resource_id, check_in, check_out, guests)) in enumerate(zip(items, stays)):
+        if resource_id not in prices[booking_type]:
+            db.session.rollback()
+            return jsonify({'error': resource_not_found(booking_type), 'index': index}), 404
+        calendar = RateCalendar(
+            prices[booking_type][resource_id], rules[booking_type][resource_id], check_in, (check_out - check_in).days
+        )
+        rows.append({
+            'user_id': session['user_id'],
+            'booking_type': booking_type,
+            'wedding_hall_id': resource_id if booking_type == 'wedding_hall' else None,
+            'hotel_room_id': resource_id if booking_type == 'hotel_room' else None,
+            'check_in_date': check_in,
+            'check_out_date': check_out,
+            'total_price': calendar.price(check_in, check_out, guests),
+            'guests': guests,
+            'special_requests': item.get('special_requests')
+        })
+    
+    # Insert first, then check every stay with one query, as in create_booking.
+    # A Core INSERT ... RETURNING is a single statement, where the ORM would
+    # insert row by row on SQLite to return primary keys in order.
+    created = db.session.execute(
+        db.insert(Booking).returning(*BOOKING_FIELDS, Booking.wedding_hall_id, Booking.hotel_room_id), rows
+    ).all()
+    
+    overlaps = [
+        db.and_(*overlap_criteria(booking_column(booking_type), resource_id, check_in, check_out))
+        for booking_type, resource_id, check_in, check_out, _ in stays
+    ]
+    conflict = db.session.execute(
+        db.select(Booking.wedding_hall_id, Booking.hotel_room_id, Booking.check_in_date, Booking.check_out_date)
+        .where(db.or_(*overlaps), Booking.id.notin_([row.id for row in created]))
+        .limit(1)
+    ).first()
+    if conflict:
+        db.session.rollback()
+        hall_id, room_id, taken_from, taken_to = conflict
+        index = next(
+            index for index, (booking_type, resource_id, check_in, check_out, _) in enumerate(stays)
+            if resource_id == (hall_id if booking_type == 'wedding_hall' else room_id)
+            and check_in < taken_to and taken_from < check_out
+        )
+        return jsonify({'error': 'Selected dates are not available', 'index': index}), 409
+    
+    notify_booked(created)
+    db.session.commit()
+    # Bulk inserts bypass the session, so caches are invalidated explicitly
+    invalidate_caches_for(Booking)
+    
+    # RETURNING order is not guaranteed; stays in a batch never share a
+    # resource and check-in date, so that identifies each row
+    by_stay = {(row.wedding_hall_id, row.hotel_room_id, row.check_in_date): row for row in created}
+    bookings = serialize_rows(
+        [by_stay[row['wedding_hall_id'], row['hotel_room_id'], row['check_in_date']] for row in rows], BOOKING_FIELDS
+    )
+    # SQLite's RETURNING gives whole prices back as integers, where a booking
+    # read back through the ORM has a float
+    for booking in bookings:
+        booking['total_price'] = float(booking['total_price'])
+    return json_response({'message': 'Bookings created', 'bookings': bookings}, 201)
+
+
 @app.route('/api/bookings', methods=['GET'])
 @login_required
+@replica_read
 def get_user_bookings():
-    bookings = Booking.query.filter_by(user_id=session['user_id']).all()
-    return jsonify([booking.to_dict() for booking in bookings]), 200
+    bookings, next_cursor = page_response(Booking.query.filter_by(user_id=session['user_id']), Booking.id, BOOKING_FIELDS)
+    return json_response({'items': bookings, 'next_cursor': next_cursor})
+
+
+@app.route('/api/bookings/<int:booking_id>', methods=['GET'])
+@login_required
+def get_booking(booking_id):
+    booking = Booking.query.get_or_404(booking_id)
+    
+    if booking.user_id != session['user_id'] and not current_user()['is_admin']:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    return jsonify(booking.to_dict()), 200
+
+
+@app.route('/api/bookings/<int:booking_id>/cancel', methods=['POST'])
+@login_required
+def cancel_booking(booking_id):
+    booking = Booking.query.get_or_404(booking_id)
+    
+    if booking.user_id != session['user_id']:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    if booking.status in ['completed', 'cancelled']:
+        return jsonify({'error': 'Cannot cancel this booking'}), 400
+    
+    booking.status = 'cancelled'
+    db.session.commit()
+    
+    return jsonify({'message': 'Booking cancelled', 'booking': booking.to_dict()}), 200
+
+
+# ==================== BOOKING LIFECYCLE ====================
+
+BOOKING_PAYMENT_TTL_HOURS = int(os.environ.get('BOOKING_PAYMENT_TTL_HOURS', 24))
+
+
+# Cancels pending bookings still unpaid BOOKING_PAYMENT_TTL_HOURS after they
+# were made, including those whose payment failed. An IN list rather than
+# != 'paid' keeps payment_status a lookup in the status index.
+@job('expire_unpaid_bookings', every=int(os.environ.get('BOOKING_EXPIRY_INTERVAL', 300)))
+def expire_unpaid_bookings(now=None):
+    cutoff = (now or datetime.utcnow()) - timedelta(hours=BOOKING_PAYMENT_TTL_HOURS)
+    return update_bookings_in_batches(
+        (Booking.status == 'pending', Booking.payment_status.in_(('pending', 'failed')), Booking.created_at < cutoff),
+        {'status': 'cancelled'}
+    )
+
+
+# Marks confirmed bookings completed once their check-out date has passed
+@job('complete_past_bookings', every=int(os.environ.get('BOOKING_COMPLETION_INTERVAL', 3600)))
+def complete_past_bookings(today=None):
+    return update_bookings_in_batches(
+        (Booking.status == 'confirmed', Booking.check_out_date <= (today or date.today())),
+        {'status': 'completed'}
+    )
+
+
+# ==================== ORDER ROUTES ====================
+
+RESERVATION_TTL_MINUTES = int(os.environ.get('RESERVATION_TTL_MINUTES', 15))
+RESERVATION_SWEEP_INTERVAL = int(os.environ.get('RESERVATION_SWEEP_INTERVAL', 60))
+MAX_CART_LINES = 100
+
+
+# Takes stock for one line with a conditional decrement, so concurrent buyers
+# can never take the stock below zero. Returns False if not enough is left.
+def reserve_stock(item_id, quantity):
+    result = db.session.execute(
+        db.update(ShoppingItem)
+        .where(ShoppingItem.id == item_id, ShoppingItem.stock >= quantity)
+        .values(stock=ShoppingItem.stock - quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+# Expires pending orders whose hold has lapsed and returns their quantity to
+# stock, as two set-based statements in one transaction
+@job('release_expired_reservations', every=RESERVATION_SWEEP_INTERVAL)
+def release_expired_reservations(now=None):
+    expired = db.session.execute(
+        db.update(Order)
+        .where(Order.status == 'pending', Order.reserved_until < (now or datetime.utcnow()))
+        .values(status='expired')
+        .returning(Order.item_id, Order.quantity)
+        .execution_options(synchronize_session=False)
+    ).all()
+    
+    released = Counter()
+    for item_id, quantity in expired:
+        released[item_id] += quantity
+    if released:
+        release_stock(released.items())
+    db.session.commit()
+    if released:
+        invalidate_caches_for(ShoppingItem)
+    return len(expired)
+
+
+# Returns (item_id, quantity) pairs to stock in one executemany UPDATE
+def release_stock(quantities):
+    items = ShoppingItem.__table__
+    db.session.execute(
+        items.update()
+        .where(items.c.id == db.bindparam('released_item_id'))
+        .values(stock=items.c.stock + db.bindparam('released_quantity')),
+        [{'released_item_id': item_id, 'released_quantity': quantity} for item_id, quantity in quantities]
+    )
+
+
+@app.cli.command('release-holds')
+def release_holds_command():
+    """Release stock held by expired unpaid orders."""
+    print(f'Released {release_expired_reservations()} expired reservations')
+
+
+# Adds the cart and reservation columns to an orders table created before
+# carts existed. Earlier orders become single-order carts keyed by their id,
+# so they can still be paid for with cart_id; they never held reserved stock,
+# so reserved_until stays NULL and the sweeper leaves them alone.
+def migrate_order_carts():
+    add_column(Order, 'cart_id')
+    add_column(Order, 'reserved_until')
+    backfill(Order, {'cart_id': db.cast(Order.id, db.String)}, Order.cart_id.is_(None))
+
+
+@app.route('/api/orders', methods=['POST'])
+@rate_limited('orders', '30/minute', by='user')
+@login_required
+def create_order():
+    data = request.get_json()
+    
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object with item_id or items'}), 400
+    if not data:
+        return jsonify({'error': 'Missing order items'}), 400
+    
+    # Accept a single {item_id, quantity} or a cart of {items: [...]}
+    lines = data['items'] if 'items' in data else [data]
+    if not isinstance(lines, list) or not 0 < len(lines) <= MAX_CART_LINES:
+        return jsonify({'error': f'An order must have between 1 and {MAX_CART_LINES} items'}), 400
+    
+    quantities = Counter()
+    for line in lines:
+        if not isinstance(line, dict) or not isinstance(line.get('item_id'), int) \
+                or not isinstance(line.get('quantity', 1), int) or line.get('quantity', 1) < 1:
+            return jsonify({'error': 'Each item needs an integer item_id and a positive quantity'}), 400
+        quantities[line['item_id']] += line.get('quantity', 1)
+    
+    prices = dict(db.session.execute(
+        db.select(ShoppingItem.id, ShoppingItem.price).where(ShoppingItem.id.in_(quantities))
+    ).all())
+    missing = set(quantities) - set(prices)
+    if missing:
+        return jsonify({'error': 'Item not found', 'item_ids': sorted(missing)}), 404
+    
+    # Reserve in id order so concurrent carts lock rows in the same order
+    for item_id in sorted(quantities):
+        if not reserve_stock(item_id, quantities[item_id]):
+            db.session.rollback()
+            return jsonify({'error': 'Insufficient stock', 'item_id': item_id}), 409
+    
+    cart_id = uuid.uuid4().hex
+    reserved_until = datetime.utcnow() + timedelta(minutes=RESERVATION_TTL_MINUTES)
+    orders = [
+        Order(
+            user_id=session['user_id'],
+            item_id=item_id,
+            cart_id=cart_id,
+            quantity=quantity,
+            total_price=prices[item_id] * quantity,
+            reserved_until=reserved_until
+        )
+        for item_id, quantity in quantities.items()
+    ]
+    db.session.add_all(orders)
+    db.session.commit()
+    # Stock changed through Core UPDATEs, which bypass the session, so the
+    # cached catalog (stock, in_stock filters) is invalidated explicitly
+    invalidate_caches_for(ShoppingItem)
+    
+    return jsonify({
+        'message': 'Order placed',
+        'cart_id': cart_id,
+        'reserved_until': reserved_until.isoformat(),
+        'orders': [order.to_dict() for order in orders]
+    }), 201
+
+
+@app.route('/api/orders', methods=['GET'])
+@login_required
+def get_user_orders():
+    orders, next_cursor = page_response(Order.query.filter_by(user_id=session['user_id']), Order.id, ORDER_FIELDS)
+    return json_response({'items': orders, 'next_cursor': next_cursor})
+
+
+# ==================== PAYMENTS ====================
+
+class PaymentError(Exception):
+    pass
+
+
+# Local stand-in for the gateway: orders are created without a network call
+# and webhooks are trusted once their signature checks out. sign() produces
+# the signature header for test and benchmark deliveries.
+class FakeGateway:
+    name = 'fake'
+    
+    def __init__(self, webhook_secret):
+        self.webhook_secret = webhook_secret
+        self.key_id = None
+    
+    def create_order(self, amount, currency, receipt):
+        return {'id': f'order_fake_{uuid.uuid4().hex}', 'amount': amount, 'currency': currency}
+    
+    def fetch_payment(self, payment_id):
+        return None
+    
+    def sign(self, body):
+        return hmac.new(self.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+    
+    def verify_signature(self, body, signature):
+        return hmac.compare_digest(self.sign(body), signature or '')
+
+
+class RazorpayGateway(FakeGateway):
+    name = 'razorpay'
+    API_URL = 'https://api.razorpay.com/v1'
+    
+    def __init__(self, key_id, key_secret, webhook_secret):
+        super().__init__(webhook_secret)
+        self.key_id = key_id
+        self.auth = 'Basic ' + base64.b64encode(f'{key_id}:{key_secret}'.encode()).decode()
+    
+    def _request(self, path, payload=None):
+        request = urllib.request.Request(
+            f'{self.API_URL}{path}',
+            data=json.dumps(payload).encode() if payload is not None else None,
+            headers={'Authorization': self.auth, 'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read())
+    
+    def create_order(self, amount, currency, receipt):
+        return self._request('/orders', {'amount': amount, 'currency': currency, 'receipt': receipt})
+    
+    def fetch_payment(self, payment_id):
+        return self._request(f'/payments/{payment_id}')
+
+
+# PAYMENT_GATEWAY picks the gateway; it defaults to razorpay. The fake gateway
+# accepts any webhook signed with its secret, so it has to be asked for
+# explicitly and given a secret of its own.
+def payment_gateway_from_env():
+    name = os.environ.get('PAYMENT_GATEWAY', 'razorpay')
+    if name == 'fake':
+        if not os.environ.get('PAYMENT_WEBHOOK_SECRET'):
+            raise RuntimeError('PAYMENT_GATEWAY=fake requires PAYMENT_WEBHOOK_SECRET')
+        return FakeGateway(os.environ['PAYMENT_WEBHOOK_SECRET'])
+    if name != 'razorpay':
+        raise ValueError(f'Unsupported payment gateway: {name}')
+    missing = [key for key in ('RAZORPAY_KEY_ID', 'RAZORPAY_KEY_SECRET', 'RAZORPAY_WEBHOOK_SECRET')
+               if not os.environ.get(key)]
+    if missing:
+        raise RuntimeError(f'Razorpay is not configured: set {", ".join(missing)} '
+                           f'(or PAYMENT_GATEWAY=fake with PAYMENT_WEBHOOK_SECRET for local use)')
+    return RazorpayGateway(
+        os.environ['RAZORPAY_KEY_ID'],
+        os.environ['RAZORPAY_KEY_SECRET'],
+        os.environ['RAZORPAY_WEBHOOK_SECRET']
+    )
+
+
+payment_gateway = payment_gateway_from_env()
+
+
+def minor_units(amount):
+    return int(round(amount * 100))
+
+
+# The amount still owed for one of the user's bookings or carts
+def payable_amount(user_id, booking_id=None, cart_id=None):
+    if booking_id is not None:
+        booking = db.session.get(Booking, booking_id)
+        if not booking or booking.user_id != user_id:
+            abort(404)
+        if booking.status != 'pending' or booking.payment_status == 'paid':
+            abort(400, description='Booking is not awaiting payment')
+        return booking.total_price
+    
+    total = db.session.scalar(
+        db.select(db.func.sum(Order.total_price))
+        .where(Order.cart_id == cart_id, Order.user_id == user_id, Order.status == 'pending')
+    )
+    if not total:
+        abort(400, description='No pending orders in this cart')
+    return total
+
+
+# Takes stock again for a cart's orders whose hold lapsed before the capture
+# arrived. All or nothing: if an item has run out, the stock already taken
+# is put back and False is returned.
+def reclaim_expired_orders(cart_id):
+    lines = db.session.execute(
+        db.select(Order.item_id, db.func.sum(Order.quantity))
+        .where(Order.cart_id == cart_id, Order.status == 'expired')
+        .group_by(Order.item_id)
+        .order_by(Order.item_id)
+    ).all()
+    for taken, (item_id, quantity) in enumerate(lines):
+        if not reserve_stock(item_id, quantity):
+            if taken:
+                release_stock(lines[:taken])
+            return False
+    return True
+
+
+# A capture that cannot be fulfilled: the money is kept track of as owed
+# back instead of the payment being reported paid
+def flag_refund(payment, reason):
+    payment.status = 'refund_due'
+    app.logger.warning('Payment %s was captured but cannot be fulfilled: %s', payment.id, reason)
+    notify(
+        'payment_refund_due', 'admin', ADMIN_NOTIFICATION_RECIPIENT, f'Refund due for payment {payment.id}',
+        f'{payment.amount:.2f} {payment.currency} captured as {payment.gateway_payment_id}, but {reason}.'
+    )
+
+
+# Applies a verified capture. Captures can arrive after the booking was
+# cancelled (or paid by another payment) or after the cart's hold expired;
+# lapsed orders are reserved again when the stock is still there, and
+# anything that cannot be fulfilled leaves the payment refund_due.
+def mark_paid(payment, gateway_payment_id):
+    if payment.status in ('paid', 'refund_due'):
+        return
+    payment.gateway_payment_id = gateway_payment_id
+    if payment.booking_id is not None:
+        booking = db.session.get(Booking, payment.booking_id)
+        if booking.status == 'cancelled' or booking.payment_status == 'paid':
+            reason = 'the booking was cancelled' if booking.status == 'cancelled' else 'the booking is already paid'
+            return flag_refund(payment, reason)
+        booking.payment_status = 'paid'
+        booking.payment_id = gateway_payment_id
+        if booking.status == 'pending':
+            booking.status = 'confirmed'
+    else:
+        unpaid = Order.cart_id == payment.cart_id, Order.status.in_(('pending', 'expired'))
+        if not db.session.scalar(db.select(db.func.count()).where(*unpaid)):
+            return flag_refund(payment, 'the cart has no unpaid orders left')
+        if not reclaim_expired_orders(payment.cart_id):
+            return flag_refund(payment, 'the hold expired and the stock has since been sold')
+        db.session.execute(
+            db.update(Order)
+            .where(*unpaid)
+            .values(status='paid', payment_id=gateway_payment_id, reserved_until=None)
+            .execution_options(synchronize_session=False)
+        )
+    payment.status = 'paid'
+
+
+def mark_failed(payment, gateway_payment_id):
+    if payment.status in ('paid', 'refund_due'):
+        return
+    payment.status = 'failed'
+    payment.gateway_payment_id = gateway_payment_id
+    if payment.booking_id is not None:
+        db.session.get(Booking, payment.booking_id).payment_status = 'failed'
+
+
+def payment_entity(event):
+    return json.loads(event.payload)['payload']['payment']['entity']
+
+
+def apply_payment_event(event, payments):
+    if event.event_type not in ('payment.captured', 'payment.failed'):
+        return 'ignored'
+    
+    entity = payment_entity(event)
+    payment = payments.get(entity.get('order_id'))
+    if not payment:
+        raise PaymentError(f"Unknown order {entity.get('order_id')}")
+    
+    if event.event_type == 'payment.failed':
+        mark_failed(payment, entity['id'])
+        return 'processed'
+    
+    # Confirm with the gateway rather than trusting the event alone
+    verified = payment_gateway.fetch_payment(entity['id']) or entity
+    if verified.get('status') != 'captured' or verified.get('order_id') != payment.gateway_order_id:
+        raise PaymentError('Payment is not captured for this order')
+    if verified.get('amount') != minor_units(payment.amount) or verified.get('currency') != payment.currency:
+        raise PaymentError('Captured amount does not match the payment')
+    mark_paid(payment, entity['id'])
+    return 'processed'
+
+
+# Verifies and applies received webhooks in order, a batch per run. Events
+# are validated before anything is written, so a rejected one changes nothing.
+@job('process_payment_events', every=int(os.environ.get('PAYMENT_EVENT_INTERVAL', 5)))
+def process_payment_events():
+    events = WebhookEvent.query.filter_by(status='received') \
+        .order_by(WebhookEvent.id).limit(JOB_BATCH_SIZE).all()
+    
+    # Load the batch's payments and bookings up front instead of one at a time
+    order_ids = set()
+    for event in events:
+        try:
+            order_ids.add(payment_entity(event).get('order_id'))
+        except (KeyError, TypeError, ValueError):
+            pass
+    payments = {
+        payment.gateway_order_id: payment
+        for payment in Payment.query.filter(Payment.gateway_order_id.in_(order_ids))
+    }
+    # Held in a local so the identity map keeps them and session.get() finds them
+    booking_ids = [payment.booking_id for payment in payments.values() if payment.booking_id is not None]
+    bookings = Booking.query.filter(Booking.id.in_(booking_ids)).all()
+    
+    processed = 0
+    for event in events:
+        try:
+            event.status = apply_payment_event(event, payments)
+        except OSError:
+            # Gateway unreachable: leave the rest for the next run
+            break
+        except (PaymentError, KeyError, TypeError, ValueError) as error:
+            event.status = 'failed'
+            event.error = repr(error)
+        event.processed_at = datetime.utcnow()
+        processed += 1
+    db.session.commit()
+    # A capture for a lapsed cart takes its stock again
+    if any(payment.cart_id for payment in payments.values()):
+        invalidate_caches_for(ShoppingItem)
+    return processed
 
 
-@app.route('/api/bookings/<int:booking_id>', methods=['GET'])
+@app.route('/api/payments', methods=['POST'])
+@rate_limited('payments', '20/minute', by='user')
 @login_required
-def get_booking(booking_id):
-    booking = Booking.query.get_or_404(booking_id)
+def create_payment():
+    data = request.get_json() or {}
+    user_id = session['user_id']
+    key = request.headers.get('Idempotency-Key')
     
-    if booking.user_id != session['user_id'] and not User.query.get(session['user_id']).is_admin:
-        return jsonify({'error': 'Unauthorized'}), 403
+    # A retried request with the same key gets the payment it already created
+    if key:
+        existing = Payment.query.filter_by(user_id=user_id, idempotency_key=key).first()
+        if existing:
+            return jsonify({'payment': existing.to_dict(), 'key_id': payment_gateway.key_id}), 200
     
-    return jsonify(booking.to_dict()), 200
+    if ('booking_id' in data) == ('cart_id' in data):
+        return jsonify({'error': 'Pass either booking_id or cart_id'}), 400
+    
+    amount = payable_amount(user_id, data.get('booking_id'), data.get('cart_id'))
+    receipt = f"booking-{data['booking_id']}" if 'booking_id' in data else f"cart-{data['cart_id']}"
+    try:
+        order = payment_gateway.create_order(minor_units(amount), 'INR', receipt)
+    except OSError:
+        return jsonify({'error': 'Payment gateway unavailable'}), 502
+    
+    payment = Payment(
+        user_id=user_id,
+        booking_id=data.get('booking_id'),
+        cart_id=data.get('cart_id'),
+        amount=amount,
+        currency='INR',
+        gateway=payment_gateway.name,
+        gateway_order_id=order['id'],
+        idempotency_key=key
+    )
+    db.session.add(payment)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request with the same key won
+        db.session.rollback()
+        payment = Payment.query.filter_by(user_id=user_id, idempotency_key=key).first_or_404()
+        return jsonify({'payment': payment.to_dict(), 'key_id': payment_gateway.key_id}), 200
+    
+    return jsonify({'payment': payment.to_dict(), 'key_id': payment_gateway.key_id}), 201
 
 
-@app.route('/api/bookings/<int:booking_id>/cancel', methods=['POST'])
+@app.route('/api/payments/<int:payment_id>', methods=['GET'])
 @login_required
-def cancel_booking(booking_id):
-    booking = Booking.query.get_or_404(booking_id)
+def get_payment(payment_id):
+    payment = Payment.query.get_or_404(payment_id)
     
-    if booking.user_id != session['user_id']:
+    if payment.user_id != session['user_id']:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    if booking.status in ['completed', 'cancelled']:
-        return jsonify({'error': 'Cannot cancel this booking'}), 400
+    return jsonify(payment.to_dict()), 200
+
+
+# Gateway webhooks are acknowledged as soon as they are stored; verification
+# runs in the process_payment_events job. A redelivered event id fails the
+# unique index and is acknowledged again without being queued twice.
+@app.route('/api/payments/webhook', methods=['POST'])
+def payment_webhook():
+    body = request.get_data()
+    if not payment_gateway.verify_signature(body, request.headers.get('X-Razorpay-Signature')):
+        return jsonify({'error': 'Invalid signature'}), 400
     
-    booking.status = 'cancelled'
-    db.session.commit()
+    event_id = request.headers.get('X-Razorpay-Event-Id')
+    try:
+        event_type = json.loads(body)['event']
+    except (ValueError, KeyError, TypeError):
+        return jsonify({'error': 'Invalid payload'}), 400
+    if not event_id:
+        return jsonify({'error': 'Missing X-Razorpay-Event-Id'}), 400
     
-    return jsonify({'message': 'Booking cancelled', 'booking': booking.to_dict()}), 200
+    # A Core insert: this is the hot path during a burst and needs no ORM state
+    try:
+        db.session.execute(WebhookEvent.__table__.insert(), {
+            'event_id': event_id, 'event_type': event_type, 'payload': body.decode(),
+            'status': 'received', 'received_at': datetime.utcnow()
+        })
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'status': 'duplicate'}), 200
+    
+    return jsonify({'status': 'queued'}), 202
 
 
 # ==================== CONTACT ROUTES ====================
 
 @app.route('/api/contact', methods=['POST'])
+@rate_limited('contact', '5/minute')
 def submit_contact():
     data = request.get_json()
     
@@ -552,6 +3234,14 @@ def submit_contact():
     )
     
     db.session.add(contact)
+    notify(
+        'contact_received', 'admin', ADMIN_NOTIFICATION_RECIPIENT, f"New message from {data['name']}",
+        f"{data['name']} <{data['email']}> {data.get('phone') or ''}\n\n{data['message']}"
+    )
+    notify(
+        'contact_received', 'email', data['email'], 'We received your message',
+        f"Hi {data['name']},\n\nThanks for getting in touch. Our team will get back to you shortly."
+    )
     db.session.commit()
     
     return jsonify({
@@ -563,6 +3253,7 @@ def submit_contact():
 # ==================== COMPLAINT ROUTES ====================
 
 @app.route('/api/complaints', methods=['POST'])
+@rate_limited('complaints', '10/hour', by='user')
 @login_required
 def submit_complaint():
     data = request.get_json()
@@ -579,6 +3270,16 @@ def submit_complaint():
     )
     
     db.session.add(complaint)
+    user = current_user()
+    notify(
+        'complaint_submitted', 'admin', ADMIN_NOTIFICATION_RECIPIENT,
+        f"New {complaint.priority} priority complaint: {complaint.subject}",
+        f"From {user['username']} <{user['email']}>\n\n{complaint.description}"
+    )
+    notify(
+        'complaint_submitted', 'email', user['email'], f'We received your complaint: {complaint.subject}',
+        f"Hi {user['full_name']},\n\nYour complaint has been logged and our support team will look into it."
+    )
     db.session.commit()
     
     return jsonify({
@@ -593,119 +3294,910 @@ def submit_complaint():
 @app.route('/api/complaints', methods=['GET'])
 @login_required
 def get_user_complaints():
-    complaints = Complaint.query.filter_by(user_id=session['user_id']).all()
-    return jsonify([{
-        'id': c.id,
-        'complaint_type': c.complaint_type,
-        'subject': c.subject,
-        'status': c.status,
-        'priority': c.priority,
-        'created_at': c.created_at.isoformat()
-    } for c in complaints]), 200
+    complaints, next_cursor = page_response(
+        Complaint.query.filter_by(user_id=session['user_id']), Complaint.id, USER_COMPLAINT_FIELDS
+    )
+    return json_response({'items': complaints, 'next_cursor': next_cursor})
+
+
+# ==================== BULK IMPORT ====================
+
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_IMPORT_ERRORS = 1000
+BOOKING_TYPES = ('wedding_hall', 'hotel_room')
+BOOKING_STATUSES = ('pending', 'confirmed', 'completed', 'cancelled')
+PAYMENT_STATUSES = ('pending', 'paid', 'failed')
+
+
+def to_bool(value):
+    return value if isinstance(value, bool) else parse_bool(str(value))
+
+
+def to_datetime(value):
+    return datetime.fromisoformat(value)
+
+
+def one_of(*choices):
+    def parse(value):
+        if value not in choices:
+            raise ValueError(f"must be one of: {', '.join(choices)}")
+        return value
+    return parse
+
+
+# kind -> (model, {field: (parser, required)})
+IMPORT_SPECS = {
+    'wedding_halls': (WeddingHall, {
+        'name': (str, True),
+        'location': (str, True),
+        'capacity': (int, True),
+        'price_per_day': (float, True),
+        'description': (str, False),
+        'rating': (float, False),
+    }),
+    'hotel_rooms': (HotelRoom, {
+        'name': (str, True),
+        'hotel_name': (str, True),
+        'room_type': (str, True),
+        'capacity': (int, True),
+        'price_per_night': (float, True),
+        'rating': (float, False),
+        'available': (to_bool, False),
+    }),
+    'shopping_items': (ShoppingItem, {
+        'name': (str, True),
+        'category': (str, True),
+        'price': (float, True),
+        'vendor': (str, True),
+        'stock': (int, False),
+        'description': (str, False),
+        'rating': (float, False),
+    }),
+    'bookings': (Booking, {
+        'user_id': (int, True),
+        'booking_type': (one_of(*BOOKING_TYPES), True),
+        'wedding_hall_id': (int, False),
+        'hotel_room_id': (int, False),
+        'check_in_date': (parse_date, True),
+        'check_out_date': (parse_date, True),
+        'total_price': (float, True),
+        'guests': (int, False),
+        'special_requests': (str, False),
+        'status': (one_of(*BOOKING_STATUSES), False),
+        'payment_status': (one_of(*PAYMENT_STATUSES), False),
+        'payment_id': (str, False),
+        'created_at': (to_datetime, False),
+    }),
+}
+
+AMENITY_LINKS = {
+    WeddingHall: (wedding_hall_amenities, 'wedding_hall_id'),
+    HotelRoom: (hotel_room_amenities, 'hotel_room_id'),
+}
+
+
+# Yields one dict per record from a JSON array, NDJSON or CSV stream. Lines
+# that fail to parse are yielded as ValueError so they can be reported per row.
+def read_records(stream, fmt):
+    if fmt == 'json':
+        records = json.load(stream)
+        if not isinstance(records, list):
+            raise ValueError('Expected a JSON array')
+        yield from records
+    elif fmt == 'ndjson':
+        for line in io.TextIOWrapper(stream, encoding='utf-8'):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield ValueError('Invalid JSON')
+    elif fmt == 'csv':
+        yield from csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
+
+
+def column_default(model, field):
+    default = model.__table__.c[field].default
+    if default is None:
+        return None
+    return default.arg(None) if default.is_callable else default.arg
+
+
+# Missing optional fields get their column default so that every row in a
+# chunk has the same keys and is inserted with a single executemany
+def validate_record(record, model, fields):
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError('Expected an object')
+    
+    row = {}
+    for field, (parse, required) in fields.items():
+        value = record.get(field)
+        if value is None or value == '':
+            if required:
+                raise ValueError(f'Missing {field}')
+            row[field] = column_default(model, field)
+            continue
+        try:
+            row[field] = parse(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'Invalid {field}: {e}')
+    return row
+
+
+def validate_booking_chunk(rows):
+    if not rows:
+        return {}
+    
+    def existing(model, key):
+        ids = {row[key] for _, row in rows if key in row}
+        return set(db.session.scalars(db.select(model.id).where(model.id.in_(ids)))) if ids else set()
+    
+    users = existing(User, 'user_id')
+    halls = existing(WeddingHall, 'wedding_hall_id')
+    rooms = existing(HotelRoom, 'hotel_room_id')
+    
+    errors = {}
+    for number, row in rows:
+        resource_key, other_key = ('wedding_hall_id', 'hotel_room_id') if row['booking_type'] == 'wedding_hall' \
+            else ('hotel_room_id', 'wedding_hall_id')
+        row[other_key] = None
+        if row['check_out_date'] <= row['check_in_date']:
+            errors[number] = 'check_out_date must be after check_in_date'
+        elif row['user_id'] not in users:
+            errors[number] = 'Unknown user_id'
+        elif row.get(resource_key) not in (halls if resource_key == 'wedding_hall_id' else rooms):
+            errors[number] = f'Unknown {resource_key}'
+    
+    # Live rows must not overlap a stored booking or an earlier row of the
+    # chunk; earlier chunks are already committed, so the query covers them
+    live = [(number, row) for number, row in rows if number not in errors and row.get('status') != 'cancelled']
+    if not live:
+        return errors
+    taken = {}
+    for resource_key in ('wedding_hall_id', 'hotel_room_id'):
+        ids = {row[resource_key] for _, row in live if row[resource_key] is not None}
+        if not ids:
+            continue
+        column = getattr(Booking, resource_key)
+        stored = db.session.execute(
+            db.select(column, Booking.check_in_date, Booking.check_out_date).where(
+                column.in_(ids),
+                Booking.check_out_date > min(row['check_in_date'] for _, row in live),
+                Booking.check_in_date < max(row['check_out_date'] for _, row in live),
+                Booking.status != 'cancelled'
+            )
+        )
+        for resource_id, check_in, check_out in stored:
+            taken.setdefault((resource_key, resource_id), []).append((check_in, check_out))
+    
+    for number, row in live:
+        resource_key = 'wedding_hall_id' if row['booking_type'] == 'wedding_hall' else 'hotel_room_id'
+        stays = taken.setdefault((resource_key, row[resource_key]), [])
+        if any(check_out > row['check_in_date'] and check_in < row['check_out_date'] for check_in, check_out in stays):
+            errors[number] = 'Selected dates are not available'
+        else:
+            stays.append((row['check_in_date'], row['check_out_date']))
+    return errors
+
+
+def insert_chunk(model, rows):
+    amenities = [row.pop('amenities', None) for row in rows]
+    if model not in AMENITY_LINKS or not any(amenities):
+        db.session.execute(db.insert(model), rows)
+        return
+    
+    ids = db.session.scalars(db.insert(model).returning(model.id, sort_by_parameter_order=True), rows).all()
+    by_name = {amenity.name.lower(): amenity for amenity in amenities_from(
+        [name for names in amenities if names for name in names]
+    )}
+    db.session.add_all(by_name.values())
+    db.session.flush()
+    
+    association, key = AMENITY_LINKS[model]
+    links = {
+        (row_id, by_name[name.lower()].id)
+        for row_id, names in zip(ids, amenities) if names
+        for name in names
+    }
+    db.session.execute(association.insert(), [{key: row_id, 'amenity_id': amenity_id} for row_id, amenity_id in links])
+
+
+# Validates and inserts records in chunks, committing each chunk. Invalid
+# rows are skipped and reported by their 1-based position in the input.
+def import_records(kind, records):
+    model, fields = IMPORT_SPECS[kind]
+    inserted = 0
+    errors = []
+    error_count = 0
+    
+    def flush(chunk):
+        nonlocal inserted, error_count
+        chunk_errors = validate_booking_chunk(chunk) if model is Booking else {}
+        rows = [row for number, row in chunk if number not in chunk_errors]
+        if rows:
+            insert_chunk(model, rows)
+            db.session.commit()
+            inserted += len(rows)
+        for number, message in chunk_errors.items():
+            error_count += 1
+            if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+                errors.append({'row': number, 'error': message})
+    
+    chunk = []
+    for number, record in enumerate(records, start=1):
+        try:
+            row = validate_record(record, model, fields)
+            if model in AMENITY_LINKS:
+                row['amenities'] = parse_list(record['amenities']) if isinstance(record.get('amenities'), str) \
+                    else record.get('amenities')
+        except ValueError as e:
+            error_count += 1
+            if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+                errors.append({'row': number, 'error': str(e)})
+            continue
+        chunk.append((number, row))
+        if len(chunk) == IMPORT_CHUNK_SIZE:
+            flush(chunk)
+            chunk = []
+    flush(chunk)
+    
+    # Bulk inserts bypass the session, so caches are invalidated explicitly
+    invalidate_caches_for(model)
+    return {'inserted': inserted, 'error_count': error_count, 'errors': errors}
+
+
+def import_response(kind):
+    formats = {'application/json': 'json', 'application/x-ndjson': 'ndjson', 'text/csv': 'csv'}
+    fmt = formats.get(request.mimetype)
+    if fmt is None:
+        return jsonify({'error': 'Content-Type must be application/json, application/x-ndjson or text/csv'}), 415
+    
+    try:
+        result = import_records(kind, read_records(request.stream, fmt))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(result), 200
+
+
+@app.route('/api/wedding-halls/bulk', methods=['POST'])
+@admin_required
+def bulk_create_wedding_halls():
+    return import_response('wedding_halls')
+
+
+@app.route('/api/hotel-rooms/bulk', methods=['POST'])
+@admin_required
+def bulk_create_hotel_rooms():
+    return import_response('hotel_rooms')
+
+
+@app.route('/api/shopping-items/bulk', methods=['POST'])
+@admin_required
+def bulk_create_shopping_items():
+    return import_response('shopping_items')
+
+
+@app.route('/api/admin/bookings/bulk', methods=['POST'])
+@admin_required
+def bulk_import_bookings():
+    return import_response('bookings')
+
+
+@app.cli.command('import-data')
+@click.argument('kind', type=click.Choice(list(IMPORT_SPECS)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_data_command(kind, path):
+    """Import a .json, .ndjson or .csv file of halls, rooms, items or bookings."""
+    fmt = os.path.splitext(path)[1].lstrip('.').lower()
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        result = import_records(kind, read_records(f, fmt))
+    print(f"Imported {result['inserted']} rows in {time.perf_counter() - started:.1f}s, "
+          f"{result['error_count']} errors")
+    for error in result['errors']:
+        print(f"  row {error['row']}: {error['error']}")
+
+
+# ==================== TRIAGE ====================
+
+COMPLAINT_CHOICES = {
+    'status': ('open', 'in_progress', 'resolved', 'closed'),
+    'priority': ('low', 'medium', 'high', 'urgent'),
+}
+CONTACT_CHOICES = {
+    'status': ('unread', 'read', 'resolved'),
+}
+# Statuses that count as resolved: entering one stamps resolved_at
+RESOLVED_STATUSES = ('resolved', 'closed')
+MAX_BULK_UPDATE_IDS = 1000
+
+
+# Queue filter operator: the column matches any of the values
+def any_of(column, values):
+    return column.in_(values)
+
+
+# Queue filters: comma-separated values match any of them; the age bounds
+# take an ISO date or datetime
+COMPLAINT_FILTERS = {
+    'status': (Complaint.status, any_of, parse_list),
+    'priority': (Complaint.priority, any_of, parse_list),
+    'complaint_type': (Complaint.complaint_type, any_of, parse_list),
+    'user_id': (Complaint.user_id, operator.eq, int),
+    'created_after': (Complaint.created_at, operator.ge, datetime.fromisoformat),
+    'created_before': (Complaint.created_at, operator.lt, datetime.fromisoformat),
+}
+CONTACT_FILTERS = {
+    'status': (Contact.status, any_of, parse_list),
+    'created_after': (Contact.created_at, operator.ge, datetime.fromisoformat),
+    'created_before': (Contact.created_at, operator.lt, datetime.fromisoformat),
+}
+TRIAGE_SORTS = {model: {'created_at': model.created_at} for model in (Complaint, Contact)}
+
+
+def triage_detail(model, fields, row_id):
+    row = db.session.execute(db.select(*fields).where(model.id == row_id)).first()
+    if row is None:
+        abort(404)
+    return json_response(serialize_rows([row], fields)[0])
+
+
+def triage_ids(data):
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not 0 < len(ids) <= MAX_BULK_UPDATE_IDS \
+            or not all(isinstance(row_id, int) for row_id in ids):
+        raise ValueError(f'ids must be a list of 1 to {MAX_BULK_UPDATE_IDS} integers')
+    return ids
+
+
+# Column values for a triage update: the fields in `choices` (checked against
+# their allowed values) and the free-text `notes` fields present in `data`.
+# Entering a resolved status stamps resolved_at, keeping an earlier stamp;
+# reopening clears it. Raises ValueError with the message for the client.
+def triage_values(model, data, choices, notes=()):
+    values = {}
+    for field, allowed in choices.items():
+        if field in data:
+            if data[field] not in allowed:
+                raise ValueError(f"{field} must be one of: {', '.join(allowed)}")
+            values[field] = data[field]
+    values.update((field, data[field]) for field in notes if field in data)
+    if not values:
+        raise ValueError(f"Nothing to update, expected {', '.join([*choices, *notes])}")
+    
+    if 'status' in values:
+        resolved = values['status'] in RESOLVED_STATUSES
+        values['resolved_at'] = db.func.coalesce(model.resolved_at, datetime.utcnow()) if resolved else None
+    return values
+
+
+# One set-based UPDATE for every id; returns how many rows changed
+def triage_update(model, ids, values):
+    updated = db.session.execute(
+        db.update(model)
+        .where(model.id.in_(ids))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    # Core updates bypass the session, so caches are invalidated explicitly
+    invalidate_caches_for(model)
+    return updated
+
+
+def hours_between(start, end):
+    if db.engine.dialect.name == 'postgresql':
+        # extract() returns numeric, which the driver hands back as Decimal
+        return db.cast(db.func.extract('epoch', end - start) / 3600, db.Float)
+    return (db.func.julianday(end) - db.func.julianday(start)) * 24
+
+
+def resolution_stats(model, start, end, *group_by):
+    hours = hours_between(model.created_at, model.resolved_at)
+    rows = db.session.execute(
+        db.select(
+            *group_by,
+            db.func.count().label('resolved'),
+            db.func.avg(hours).label('avg_hours'),
+            db.func.max(hours).label('max_hours')
+        )
+        .where(model.resolved_at >= start, model.resolved_at < end)
+        .group_by(*group_by)
+        .order_by(*group_by)
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+# Resolution times of tickets resolved in [start, end), plus the open
+# complaint backlog by status and priority with its oldest ticket
+def compute_resolution_stats(start, end):
+    backlog = db.session.execute(
+        db.select(
+            Complaint.status,
+            Complaint.priority,
+            db.func.count().label('complaints'),
+            db.func.min(Complaint.created_at).label('oldest')
+        )
+        .where(Complaint.status.notin_(RESOLVED_STATUSES))
+        .group_by(Complaint.status, Complaint.priority)
+        .order_by(Complaint.status, Complaint.priority)
+    )
+    return {
+        'complaints': resolution_stats(Complaint, start, end, Complaint.priority, Complaint.complaint_type),
+        'contacts': resolution_stats(Contact, start, end),
+        'backlog': [dict(row._mapping) for row in backlog]
+    }
 
 
 # ==================== ADMIN ROUTES ====================
 
+DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 60))
+# Report keys include the client's date range, so the cache is bounded
+dashboard_cache = LRUCache(int(os.environ.get('DASHBOARD_CACHE_SIZE', 256)), DASHBOARD_CACHE_TTL)
+invalidate_on_commit(dashboard_cache, User, Booking, Contact, Complaint)
+
+
+# Dashboard figures are computed on the primary, never a replica, since every
+# admin shares them. An admin pinned there after a write skips the cache, as
+# the write cleared only this worker's copy.
+def dashboard_cached(key, compute):
+    if pinned_to_primary():
+        return compute()
+    value = dashboard_cache.get(key)
+    if value is None:
+        value = compute()
+        dashboard_cache.set(key, value)
+    return value
+
+
+REVENUE_PERIODS = ('day', 'week', 'month')
+MAX_REVENUE_WINDOW_DAYS = 3 * 366
+
+
+def count_of(model, *criteria):
+    return db.select(db.func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+
+def compute_dashboard_stats():
+    revenue = db.select(db.func.coalesce(db.func.sum(Booking.total_price), 0)) \
+        .where(Booking.status == 'completed', Booking.payment_status == 'paid') \
+        .scalar_subquery()
+    
+    # All counters in a single round trip
+    row = db.session.execute(db.select(
+        count_of(User).label('total_users'),
+        count_of(Booking).label('total_bookings'),
+        count_of(Contact).label('total_contacts'),
+        count_of(Complaint).label('total_complaints'),
+        count_of(Complaint, Complaint.status == 'open').label('pending_complaints'),
+        count_of(Contact, Contact.status == 'unread').label('unread_contacts'),
+        revenue.label('total_revenue')
+    )).one()
+    return dict(row._mapping)
+
+
+def period_bucket(column, period):
+    if db.engine.dialect.name == 'postgresql':
+        return db.func.to_char(db.func.date_trunc(period, column), 'YYYY-MM-DD')
+    
+    # SQLite: weeks start on Monday, matching date_trunc('week') on PostgreSQL
+    if period == 'day':
+        return db.func.date(column)
+    if period == 'week':
+        return db.func.date(column, 'weekday 0', '-6 days')
+    return db.func.strftime('%Y-%m-01', column)
+
+
+def compute_revenue_buckets(period, start, end):
+    bucket = period_bucket(Booking.created_at, period).label('period')
+    paid = db.and_(Booking.status == 'completed', Booking.payment_status == 'paid')
+    rows = db.session.execute(
+        db.select(
+            bucket,
+            Booking.booking_type,
+            db.func.count().label('bookings'),
+            db.func.coalesce(db.func.sum(db.case((paid, Booking.total_price), else_=0)), 0).label('revenue')
+        )
+        .where(Booking.created_at >= start, Booking.created_at < end)
+        .group_by(bucket, Booking.booking_type)
+        .order_by(bucket, Booking.booking_type)
+    )
+    return [dict(row._mapping) for row in rows]
+
+
 @app.route('/api/admin/dashboard', methods=['GET'])
 @admin_required
 def admin_dashboard():
-    total_users = User.query.count()
-    total_bookings = Booking.query.count()
-    total_contacts = Contact.query.count()
-    total_complaints = Complaint.query.count()
+    return jsonify(dashboard_cached('stats', compute_dashboard_stats)), 200
+
+
+@app.route('/api/admin/dashboard/revenue', methods=['GET'])
+@admin_required
+def admin_revenue():
+    period = request.args.get('period', 'day')
+    if period not in REVENUE_PERIODS:
+        return jsonify({'error': "period must be 'day', 'week' or 'month'"}), 400
     
-    pending_complaints = Complaint.query.filter_by(status='open').count()
-    unread_contacts = Contact.query.filter_by(status='unread').count()
+    try:
+        end = parse_date(request.args['to']) if request.args.get('to') else date.today() + timedelta(days=1)
+        start = parse_date(request.args['from']) if request.args.get('from') else end - timedelta(days=90)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format, expected YYYY-MM-DD'}), 400
     
-    # Revenue calculation
-    completed_bookings = Booking.query.filter_by(status='completed', payment_status='paid').all()
-    total_revenue = sum(b.total_price for b in completed_bookings)
+    if end <= start:
+        return jsonify({'error': "'to' must be after 'from'"}), 400
+    if (end - start).days > MAX_REVENUE_WINDOW_DAYS:
+        return jsonify({'error': f'Date range cannot exceed {MAX_REVENUE_WINDOW_DAYS} days'}), 400
     
+    buckets = dashboard_cached(
+        ('revenue', period, start, end),
+        lambda: compute_revenue_buckets(period, start, end)
+    )
     return jsonify({
-        'total_users': total_users,
-        'total_bookings': total_bookings,
-        'total_contacts': total_contacts,
-        'total_complaints': total_complaints,
-        'pending_complaints': pending_complaints,
-        'unread_contacts': unread_contacts,
-        'total_revenue': total_revenue
+        'period': period,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'buckets': buckets
     }), 200
 
 
+@app.route('/api/admin/dashboard/resolution', methods=['GET'])
+@admin_required
+def admin_resolution():
+    try:
+        end = parse_date(request.args['to']) if request.args.get('to') else date.today() + timedelta(days=1)
+        start = parse_date(request.args['from']) if request.args.get('from') else end - timedelta(days=90)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format, expected YYYY-MM-DD'}), 400
+    
+    if end <= start:
+        return jsonify({'error': "'to' must be after 'from'"}), 400
+    
+    stats = dashboard_cached(('resolution', start, end), lambda: compute_resolution_stats(start, end))
+    return json_response(dict(stats, **{'from': start.isoformat(), 'to': end.isoformat()}))
+
+
 @app.route('/api/admin/users', methods=['GET'])
 @admin_required
+@replica_read
 def get_all_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users]), 200
+    if request.args.get('stream') == '1':
+        return export_response('users', USER_FIELDS)
+    
+    users, next_cursor = page_response(User.query, User.id, USER_FIELDS)
+    return json_response({'items': users, 'next_cursor': next_cursor})
 
 
 @app.route('/api/admin/bookings', methods=['GET'])
 @admin_required
+@replica_read
 def get_all_bookings():
-    bookings = Booking.query.all()
-    return jsonify([booking.to_dict() for booking in bookings]), 200
+    if request.args.get('stream') == '1':
+        return export_response('bookings', BOOKING_FIELDS)
+    
+    bookings, next_cursor = page_response(Booking.query, Booking.id, BOOKING_FIELDS)
+    return json_response({'items': bookings, 'next_cursor': next_cursor})
 
 
 @app.route('/api/admin/contacts', methods=['GET'])
 @admin_required
+@replica_read
 def get_all_contacts():
-    contacts = Contact.query.all()
-    return jsonify([{
-        'id': c.id,
-        'name': c.name,
-        'email': c.email,
-        'phone': c.phone,
-        'message': c.message,
-        'status': c.status,
-        'created_at': c.created_at.isoformat()
-    } for c in contacts]), 200
+    if request.args.get('stream') == '1':
+        return export_response('contacts', CONTACT_FIELDS)
+    
+    contacts, next_cursor = catalog_query(Contact, CONTACT_QUEUE_FIELDS, CONTACT_FILTERS, TRIAGE_SORTS[Contact])
+    return json_response({'items': contacts, 'next_cursor': next_cursor})
+
+
+@app.route('/api/admin/contacts/<int:contact_id>', methods=['GET'])
+@admin_required
+@replica_read
+def get_contact(contact_id):
+    return triage_detail(Contact, CONTACT_FIELDS, contact_id)
 
 
 @app.route('/api/admin/contacts/<int:contact_id>/resolve', methods=['POST'])
 @admin_required
 def resolve_contact(contact_id):
-    contact = Contact.query.get_or_404(contact_id)
-    contact.status = 'resolved'
-    db.session.commit()
+    if not triage_update(Contact, [contact_id], triage_values(Contact, {'status': 'resolved'}, CONTACT_CHOICES)):
+        abort(404)
     return jsonify({'message': 'Contact marked as resolved'}), 200
 
 
+@app.route('/api/admin/contacts/bulk-update', methods=['POST'])
+@admin_required
+def bulk_update_contacts():
+    data = request.get_json() or {}
+    try:
+        ids = triage_ids(data)
+        values = triage_values(Contact, data, CONTACT_CHOICES)
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    return jsonify({'message': 'Contacts updated', 'updated': triage_update(Contact, ids, values)}), 200
+
+
 @app.route('/api/admin/complaints', methods=['GET'])
 @admin_required
+@replica_read
 def get_all_complaints():
-    complaints = Complaint.query.all()
-    return jsonify([{
-        'id': c.id,
-        'user_id': c.user_id,
-        'complaint_type': c.complaint_type,
-        'subject': c.subject,
-        'description': c.description,
-        'status': c.status,
-        'priority': c.priority,
-        'admin_notes': c.admin_notes,
-        'created_at': c.created_at.isoformat()
-    } for c in complaints]), 200
+    if request.args.get('stream') == '1':
+        return export_response('complaints', COMPLAINT_FIELDS)
+    
+    complaints, next_cursor = catalog_query(
+        Complaint, COMPLAINT_QUEUE_FIELDS, COMPLAINT_FILTERS, TRIAGE_SORTS[Complaint]
+    )
+    return json_response({'items': complaints, 'next_cursor': next_cursor})
+
+
+@app.route('/api/admin/complaints/<int:complaint_id>', methods=['GET'])
+@admin_required
+@replica_read
+def get_complaint(complaint_id):
+    return triage_detail(Complaint, COMPLAINT_FIELDS, complaint_id)
 
 
 @app.route('/api/admin/complaints/<int:complaint_id>/update', methods=['POST'])
 @admin_required
 def update_complaint(complaint_id):
-    complaint = Complaint.query.get_or_404(complaint_id)
-    data = request.get_json()
+    try:
+        values = triage_values(Complaint, request.get_json() or {}, COMPLAINT_CHOICES, ('admin_notes',))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
     
-    if 'status' in data:
-        complaint.status = data['status']
-    if 'admin_notes' in data:
-        complaint.admin_notes = data['admin_notes']
-    if 'priority' in data:
-        complaint.priority = data['priority']
-    
-    db.session.commit()
+    if not triage_update(Complaint, [complaint_id], values):
+        abort(404)
     return jsonify({'message': 'Complaint updated'}), 200
 
 
+@app.route('/api/admin/complaints/bulk-update', methods=['POST'])
+@admin_required
+def bulk_update_complaints():
+    data = request.get_json() or {}
+    try:
+        ids = triage_ids(data)
+        values = triage_values(Complaint, data, COMPLAINT_CHOICES, ('admin_notes',))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    
+    return jsonify({'message': 'Complaints updated', 'updated': triage_update(Complaint, ids, values)}), 200
+
+
+# ==================== METRICS ====================
+
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 0))  # 0: no slow query log
+QUERY_COUNT_WARNING = int(os.environ.get('QUERY_COUNT_WARNING', 0))  # 0: no N+1 warnings
+QUERY_PLAN_CHECK = os.environ.get('QUERY_PLAN_CHECK', 'false').lower() in ('1', 'true', 'yes')
+
+# Registered metrics, rendered in this order by /metrics
+METRICS = []
+
+
+def format_labels(names, values, extra=''):
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class CounterMetric:
+    kind = 'counter'
+    
+    def __init__(self, name, description, labelnames):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.values = {}
+        self.lock = threading.Lock()
+        METRICS.append(self)
+    
+    def inc(self, *labelvalues, amount=1):
+        with self.lock:
+            self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+    
+    def samples(self):
+        with self.lock:
+            values = sorted(self.values.items())
+        for labelvalues, value in values:
+            yield f'{self.name}{format_labels(self.labelnames, labelvalues)} {value}'
+
+
+class HistogramMetric(CounterMetric):
+    kind = 'histogram'
+    
+    def __init__(self, name, description, labelnames, buckets):
+        super().__init__(name, description, labelnames)
+        self.buckets = buckets
+    
+    def observe(self, value, *labelvalues):
+        with self.lock:
+            series = self.values.get(labelvalues)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), then the sum
+                series = self.values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+    
+    def samples(self):
+        with self.lock:
+            values = sorted((labelvalues, list(series)) for labelvalues, series in self.values.items())
+        for labelvalues, series in values:
+            total = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                total += count
+                labels = format_labels(self.labelnames, labelvalues, f'le="{bound}"')
+                yield f'{self.name}_bucket{labels} {total}'
+            labels = format_labels(self.labelnames, labelvalues)
+            yield f'{self.name}_sum{labels} {series[-1]}'
+            yield f'{self.name}_count{labels} {total}'
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.append(f'# HELP {metric.name} {metric.description}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+HTTP_REQUESTS = CounterMetric('http_requests_total', 'Requests handled.', ('endpoint', 'method', 'status'))
+HTTP_REQUEST_DURATION = HistogramMetric(
+    'http_request_duration_seconds', 'Time to produce a response.', ('endpoint', 'method'),
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+HTTP_RESPONSE_SIZE = HistogramMetric(
+    'http_response_size_bytes', 'Response body size.', ('endpoint',),
+    (100, 1000, 10000, 100000, 1000000, 10000000)
+)
+DB_QUERIES_PER_REQUEST = HistogramMetric(
+    'db_queries_per_request', 'SQL statements issued per request.', ('endpoint',),
+    (0, 1, 2, 5, 10, 20, 50, 100)
+)
+DB_QUERY_DURATION = HistogramMetric(
+    'db_query_duration_seconds', 'SQL statement execution time; background work is endpoint="background".',
+    ('endpoint',), (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1)
+)
+DB_SLOW_QUERIES = CounterMetric('db_slow_queries_total', 'SQL statements slower than SLOW_QUERY_MS.', ('endpoint',))
+DB_ROUTED_READS = CounterMetric(
+    'db_routed_reads_total', 'Read-only requests by the database that served them.', ('database',)
+)
+
+
+# Per-request counters. A context variable rather than `g` so queries issued
+# by the async handlers in asgi.py are attributed to their request as well.
+class RequestStats:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.statements = Counter()
+
+
+request_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+def record_request(stats, method, status, size):
+    HTTP_REQUESTS.inc(stats.endpoint, method, str(status))
+    HTTP_REQUEST_DURATION.observe(time.perf_counter() - stats.started, stats.endpoint, method)
+    if size is not None:
+        HTTP_RESPONSE_SIZE.observe(size, stats.endpoint)
+    DB_QUERIES_PER_REQUEST.observe(stats.queries, stats.endpoint)
+    
+    if QUERY_COUNT_WARNING and stats.queries > QUERY_COUNT_WARNING:
+        statement, repeats = stats.statements.most_common(1)[0]
+        app.logger.warning(
+            'Possible N+1: %s %s issued %d queries, this one %d times: %s',
+            method, stats.endpoint, stats.queries, repeats, statement
+        )
+
+
+@app.before_request
+def start_request_stats():
+    g.request_stats_token = request_stats.set(RequestStats(request.endpoint or 'unmatched'))
+
+
+@app.after_request
+def record_request_stats(response):
+    stats = request_stats.get()
+    if stats is not None:
+        record_request(stats, request.method, response.status_code, response.content_length)
+    return response
+
+
+@app.teardown_request
+def end_request_stats(exception):
+    token = g.pop('request_stats_token', None)
+    if token is not None:
+        request_stats.reset(token)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    stats = request_stats.get()
+    endpoint = stats.endpoint if stats else 'background'
+    DB_QUERY_DURATION.observe(elapsed, endpoint)
+    if stats:
+        stats.queries += 1
+        if QUERY_COUNT_WARNING:
+            stats.statements[statement] += 1
+    
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        DB_SLOW_QUERIES.inc(endpoint)
+        app.logger.warning('Slow query (%.1f ms) in %s: %s %r', elapsed * 1000, endpoint, statement, parameters)
+    if QUERY_PLAN_CHECK and not executemany and statement not in checked_statements:
+        check_query_plan(conn, statement, parameters, endpoint)
+
+
+# Statements whose plan has been checked, and statement -> (endpoint, tables)
+# for those that filter a table without using an index
+checked_statements = set()
+full_table_scans = {}
+FILTERED = re.compile(r'\bWHERE\b')
+SQLITE_SCAN = re.compile(r'^SCAN (?!sqlite_)(\w+)$')
+POSTGRESQL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+# With QUERY_PLAN_CHECK on, explains each distinct filtered statement the
+# first time it runs and warns about full table scans, which point at a
+# missing index. Reading a whole table on purpose (no WHERE) is not reported.
+def check_query_plan(conn, statement, parameters, endpoint):
+    checked_statements.add(statement)
+    if not statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')) or not FILTERED.search(statement):
+        return
+    
+    cursor = conn.connection.cursor()
+    try:
+        if conn.dialect.name == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+            tables = [match.group(1) for row in cursor.fetchall() for match in [SQLITE_SCAN.match(row[-1])] if match]
+        elif conn.dialect.name == 'postgresql':
+            cursor.execute(f'EXPLAIN {statement}', parameters)
+            tables = [match.group(1) for row in cursor.fetchall() for match in [POSTGRESQL_SCAN.search(row[0])] if match]
+        else:
+            return
+    finally:
+        cursor.close()
+    if tables:
+        full_table_scans[statement] = (endpoint, tables)
+        app.logger.warning('Full scan of %s in %s: %s', ', '.join(tables), endpoint, statement)
+
+
+@event.listens_for(Engine, 'handle_error')
+def discard_query_timer(exception_context):
+    started = exception_context.connection.info.get('query_started') if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 # ==================== ERROR HANDLERS ====================
 
+@app.errorhandler(400)
+def bad_request(error):
+    return jsonify({'error': error.description}), 400
+
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Resource not found'}), 404
@@ -717,10 +4209,229 @@ def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 
+# ==================== MIGRATIONS ====================
+
+# db.create_all() creates missing tables but never alters existing ones, so
+# columns and indexes added to the models reach older databases through the
+# migrations below. Each runs once, in order, and is recorded in
+# schema_migrations; all of them are safe to re-run.
+MIGRATE_ON_STARTUP = os.environ.get('MIGRATE_ON_STARTUP', 'true').lower() in ('1', 'true', 'yes')
+MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', 10000))
+MIGRATION_BATCH_PAUSE = float(os.environ.get('MIGRATION_BATCH_PAUSE', 0))  # seconds between batches
+
+# (version, function) in the order they are applied
+MIGRATIONS = []
+
+
+def migration(version):
+    def decorator(f):
+        MIGRATIONS.append((version, f))
+        return f
+    return decorator
+
+
+# Adds a model column missing from its table. Only nullable columns without a
+# server default: adding those rewrites no rows, so it is instant on big
+# tables. Fill them with backfill() and tighten constraints afterwards.
+def add_column(model, name):
+    column = model.__table__.c[name]
+    if not column.nullable or column.server_default is not None:
+        raise ValueError(f'{model.__tablename__}.{name} must be nullable without a server default')
+    if name in {c['name'] for c in db.inspect(db.engine).get_columns(model.__tablename__)}:
+        return False
+    
+    column_type = column.type.compile(db.engine.dialect)
+    try:
+        db.session.execute(db.text(f'ALTER TABLE {model.__tablename__} ADD COLUMN {name} {column_type}'))
+        db.session.commit()
+    except OperationalError:
+        # Another process added it first
+        db.session.rollback()
+        if name not in {c['name'] for c in db.inspect(db.engine).get_columns(model.__tablename__)}:
+            raise
+    return True
+
+
+# Sets values on rows matching criteria, walking the primary key in ranges
+# of MIGRATION_BATCH_SIZE and committing each, so no transaction holds locks
+# for long and each batch reads only its own key range
+def backfill(model, values, *criteria):
+    max_id = db.session.scalar(db.select(db.func.max(model.id))) or 0
+    updated = 0
+    for start in range(0, max_id, MIGRATION_BATCH_SIZE):
+        result = db.session.execute(
+            db.update(model)
+            .where(model.id > start, model.id <= start + MIGRATION_BATCH_SIZE, *criteria)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        updated += result.rowcount
+        if MIGRATION_BATCH_PAUSE:
+            time.sleep(MIGRATION_BATCH_PAUSE)
+    return updated
+
+
+def index_names(inspector, table):
+    # SQLite reflection skips expression indexes, so read its catalog instead
+    if db.engine.dialect.name == 'sqlite':
+        return set(db.session.scalars(
+            db.text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"), {'table': table}
+        ))
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def missing_indexes():
+    inspector = db.inspect(db.engine)
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = index_names(inspector, table.name)
+        missing.extend(index for index in sorted(table.indexes, key=lambda index: index.name)
+                       if index.name not in existing)
+    return missing
+
+
+def missing_columns():
+    inspector = db.inspect(db.engine)
+    return [
+        f'{table.name}.{column.name}'
+        for table in db.metadata.sorted_tables if inspector.has_table(table.name)
+        for column in table.columns
+        if column.name not in {c['name'] for c in inspector.get_columns(table.name)}
+    ]
+
+
+# Builds the named indexes the database lacks, looked up on the models. On
+# PostgreSQL they are built CONCURRENTLY so writes continue meanwhile; on
+# SQLite readers continue and writers wait while each index is built.
+# Migrations name their indexes rather than building whatever the models
+# declare, so each does the same work whenever it runs, however many indexes
+# later models add. Columns must exist first: add them in the same migration.
+def create_indexes(*names):
+    declared = {index.name: index for table in db.metadata.sorted_tables for index in table.indexes}
+    inspector = db.inspect(db.engine)
+    created = []
+    for name in names:
+        index = declared[name]
+        if name in index_names(inspector, index.table.name):
+            continue
+        columns = {c['name'] for c in inspector.get_columns(index.table.name)}
+        absent = [column.name for column in index.columns if column.name not in columns]
+        if absent:
+            raise ValueError(f"{name} needs {index.table.name}.{', '.join(absent)}, which is not in the table yet")
+        ddl = CreateIndex(index, if_not_exists=True)
+        if db.engine.dialect.name == 'postgresql':
+            sql = str(ddl.compile(dialect=db.engine.dialect)).replace(' INDEX ', ' INDEX CONCURRENTLY ', 1)
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                connection.execute(db.text(sql))
+        else:
+            db.session.execute(ddl)
+            db.session.commit()
+        created.append(name)
+    return created
+
+
+def drop_index(name):
+    if db.engine.dialect.name == 'postgresql':
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(db.text(f'DROP INDEX CONCURRENTLY IF EXISTS {name}'))
+    else:
+        db.session.execute(db.text(f'DROP INDEX IF EXISTS {name}'))
+        db.session.commit()
+
+
+migration('0001_amenity_association')(migrate_amenity_strings)
+migration('0002_order_carts')(migrate_order_carts)
+
+
+# The indexes declared on the models when this migration was written. The
+# single-column complaint and contact status indexes it once built are left
+# to 0004, whose composite triage indexes replace them.
+@migration('0003_query_indexes')
+def add_query_indexes():
+    create_indexes(
+        'ix_amenities_lower_name', 'ix_hotel_room_amenities_amenity', 'ix_wedding_hall_amenities_amenity',
+        'ix_hotel_rooms_available', 'ix_hotel_rooms_capacity', 'ix_hotel_rooms_hotel_name',
+        'ix_hotel_rooms_price_per_night', 'ix_hotel_rooms_rating', 'ix_hotel_rooms_room_type',
+        'ix_wedding_halls_capacity', 'ix_wedding_halls_location', 'ix_wedding_halls_price_per_day',
+        'ix_wedding_halls_rating', 'ix_shopping_items_category_price', 'ix_shopping_items_price',
+        'ix_shopping_items_rating', 'ix_shopping_items_vendor', 'ix_bookings_created_at',
+        'ix_bookings_hall_availability', 'ix_bookings_room_availability', 'ix_bookings_status_check_out',
+        'ix_bookings_status_payment_created', 'ix_bookings_user_id', 'ix_orders_cart_id',
+        'ix_orders_status_reserved_until', 'ix_orders_user_id', 'ix_complaints_user_id',
+        'ix_jobs_status_run_at', 'ix_webhook_events_status_id'
+    )
+
+
+# The composite triage indexes, which cover status lookups too. Databases
+# that ran 0003 before it was narrowed have the single-column status indexes
+# these replace. Tickets resolved before resolved_at was maintained keep a
+# NULL, so they stay out of the resolution stats.
+@migration('0004_triage_indexes')
+def add_triage_indexes():
+    add_column(Contact, 'resolved_at')
+    create_indexes(
+        'ix_contacts_status_created', 'ix_contacts_resolved_at', 'ix_complaints_status_priority_created',
+        'ix_complaints_status_type_created', 'ix_complaints_resolved_at'
+    )
+    drop_index('ix_complaints_status')
+    drop_index('ix_contacts_status')
+
+
+def pending_migrations():
+    applied = set(db.session.scalars(db.select(SchemaMigration.version)))
+    return [(version, f) for version, f in MIGRATIONS if version not in applied]
+
+
+def run_migrations():
+    applied = []
+    for version, f in pending_migrations():
+        started = time.perf_counter()
+        f()
+        db.session.commit()
+        try:
+            db.session.add(SchemaMigration(version=version))
+            db.session.commit()
+        except IntegrityError:
+            # Applied concurrently by another process
+            db.session.rollback()
+        applied.append((version, time.perf_counter() - started))
+    return applied
+
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Apply pending schema migrations."""
+    applied = run_migrations()
+    for version, elapsed in applied:
+        print(f'Applied {version} in {elapsed:.1f}s')
+    if not applied:
+        print('No pending migrations')
+
+
+@app.cli.command('check-indexes')
+def check_indexes_command():
+    """Report indexes, columns and migrations missing from the database."""
+    problems = [f'missing index {index.name} on {index.table.name}' for index in missing_indexes()]
+    problems += [f'missing column {column}' for column in missing_columns()]
+    problems += [f'pending migration {version}' for version, _ in pending_migrations()]
+    for problem in problems:
+        print(problem)
+    if problems:
+        raise SystemExit(1)
+    print('Schema is up to date')
+
+
 # ==================== INITIALIZATION ====================
 
 with app.app_context():
     db.create_all()
+    for model, columns in CATALOG_SEARCH_COLUMNS.items():
+        setup_full_text_search(model, columns)
+    if MIGRATE_ON_STARTUP:
+        run_migrations()
     
     # Create admin user if doesn't exist
     admin = User.query.filter_by(username='admin').first()
@@ -742,8 +4453,9 @@ with app.app_context():
             capacity=500,
             price_per_day=50000,
             description='Luxurious wedding hall with modern amenities',
-            amenities='AC, Sound System, Parking, Catering'
+            amenities=amenities_from('AC, Sound System, Parking, Catering')
         )
+        db.session.add(hall1)
         
         room1 = HotelRoom(
             name='Deluxe Suite',
@@ -751,7 +4463,7 @@ with app.app_context():
             room_type='Suite',
             capacity=2,
             price_per_night=15000,
-            amenities='AC, WiFi, TV, Mini Bar'
+            amenities=amenities_from('AC, WiFi, TV, Mini Bar')
         )
         
         item1 = ShoppingItem(
@@ -763,11 +4475,10 @@ with app.app_context():
             description='Complete decoration set for weddings'
         )
         
-        db.session.add_all([hall1, room1, item1])
+        db.session.add_all([room1, item1])
         db.session.commit()
     
     print("Database initialized successfully!")
 
-
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,274 @@
+# ASGI entry point for high-concurrency deployments:
+#
+#     uvicorn asgi:app --workers 4
+#
+# The catalog lists, the signed-in user's booking list and the availability
+# endpoints are served by async handlers on an async database driver, so a
+# slow client or query holds a coroutine instead of a worker. Every other
+# request falls through to the Flask app, which runs in a thread pool.
+# The async handlers read from ASYNC_DATABASE_URL (by default the primary),
+# never the read replicas; only the Flask app routes reads to those.
+from contextlib import asynccontextmanager
+import asyncio
+import hashlib
+import os
+import time
+
+from a2wsgi import WSGIMiddleware
+from itsdangerous import BadSignature
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_etags
+
+from app import (
+    app as flask_app, db, catalog_cache, dumps, SQLITE_PRAGMAS,
+    WeddingHall, HotelRoom, ShoppingItem, Booking, wedding_hall_amenities, hotel_room_amenities,
+    HALL_FIELDS, HALL_FILTERS, HALL_SORTS, ROOM_FIELDS, ROOM_FILTERS, ROOM_SORTS,
+    ITEM_FIELDS, ITEM_FILTERS, ITEM_SORTS, BOOKING_FIELDS,
+    catalog_criteria, keyset_page, finish_page, serialize_rows, amenities_select,
+    availability_window, taken_dates, free_date_ranges, RequestStats, request_stats, record_request, start_job_worker
+)
+
+# sync driver -> async driver for the same database
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def async_database_url():
+    if os.environ.get('ASYNC_DATABASE_URL'):
+        return make_url(os.environ['ASYNC_DATABASE_URL'])
+    with flask_app.app_context():
+        # The resolved URL, so relative SQLite paths point at the instance folder
+        url = db.engine.url
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+
+engine_options = flask_app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+engine = create_async_engine(async_database_url(), **engine_options)
+
+# Requests queue for a connection on a FIFO semaphore sized to the pool. The
+# pool's own wait queue lets new arrivals take a returned connection ahead of
+# requests already waiting, which under load starves a few for seconds.
+checkout_slots = asyncio.Semaphore(engine_options.get('pool_size', 5) + engine_options.get('max_overflow', 10))
+
+if engine.dialect.name == 'sqlite':
+    @event.listens_for(engine.sync_engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+
+# ==================== HELPERS ====================
+
+@asynccontextmanager
+async def connect():
+    async with checkout_slots:
+        async with engine.connect() as connection:
+            yield connection
+
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status_code=status, media_type='application/json')
+
+
+# Query parameters as a werkzeug MultiDict, the shape the shared Flask
+# helpers read `request.args` in
+def request_args(request):
+    return MultiDict(request.query_params.multi_items())
+
+
+# Flask's signed session cookie, or {} when it is missing or invalid
+def session_data(request):
+    cookie = request.cookies.get(flask_app.config['SESSION_COOKIE_NAME'])
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    if not cookie or serializer is None:
+        return {}
+    try:
+        return serializer.loads(cookie, max_age=int(flask_app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return {}
+
+
+def session_user_id(request):
+    return session_data(request).get('user_id')
+
+
+# Same check as the Flask pinned_to_primary(): the client wrote recently
+def pinned_to_primary(request):
+    return session_data(request).get('primary_until', 0) > time.time()
+
+
+async def fetch_page(connection, statement, args, key_column, fields, sort_column=None, descending=False):
+    statement, limit = keyset_page(statement, args, key_column, sort_column, descending)
+    rows = (await connection.execute(statement)).all()
+    rows, next_cursor = finish_page(rows, limit, key_column, sort_column)
+    return serialize_rows(rows, fields), next_cursor
+
+
+async def attach_amenities(connection, items, association, key):
+    by_id = {item['id']: item for item in items}
+    for item in items:
+        item['amenities'] = []
+    if by_id:
+        for row_id, name in await connection.execute(amenities_select(association, key, by_id)):
+            by_id[row_id]['amenities'].append(name)
+    return items
+
+
+# Same cache, key and ETag as the Flask catalog_cached decorator, so both
+# stacks share entries and writes through Flask invalidate them. A client
+# pinned after a write skips it, as the write cleared only one worker's copy.
+def catalog_cached(f):
+    async def endpoint(request):
+        if pinned_to_primary(request):
+            return json_response(await f(request))
+        
+        key = f'{request.url.path}?{request.url.query}'
+        cached = catalog_cache.get(key)
+        if cached is not None:
+            etag, body = cached.split(b' ', 1)
+            etag = etag.decode()
+        else:
+            body = dumps(await f(request))
+            etag = hashlib.md5(body).hexdigest()
+            catalog_cache.set(key, etag.encode() + b' ' + body)
+        
+        headers = {'ETag': f'"{etag}"'}
+        if parse_etags(request.headers.get('if-none-match')).contains_weak(etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type='application/json', headers=headers)
+    return endpoint
+
+
+# Records the same request metrics as the Flask hooks, under the name of the
+# Flask view serving that path, so /metrics has one series per endpoint
+class RequestMetrics:
+    def __init__(self, app, endpoint):
+        self.app = app
+        self.endpoint = endpoint
+    
+    async def __call__(self, scope, receive, send):
+        stats = RequestStats(self.endpoint)
+        token = request_stats.set(stats)
+        response = {'status': 500, 'size': 0}
+        
+        async def send_and_measure(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            elif message['type'] == 'http.response.body':
+                response['size'] += len(message.get('body', b''))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            request_stats.reset(token)
+            record_request(stats, scope['method'], response['status'], response['size'])
+
+
+async def http_error(request, error):
+    return json_response({'error': error.description}, error.code)
+
+
+# ==================== ASYNC ROUTES ====================
+
+def catalog_list(model, fields, filters, sorts, amenities=None):
+    @catalog_cached
+    async def endpoint(request):
+        args = request_args(request)
+        criteria, sort_column, descending = catalog_criteria(model, filters, sorts, args)
+        async with connect() as connection:
+            items, next_cursor = await fetch_page(
+                connection, db.select(*fields).where(*criteria), args, model.id, fields, sort_column, descending
+            )
+            if amenities:
+                await attach_amenities(connection, items, *amenities)
+        return {'items': items, 'next_cursor': next_cursor}
+    return endpoint
+
+
+def availability(model, resource_column):
+    async def endpoint(request):
+        resource_id = request.path_params['resource_id']
+        async with connect() as connection:
+            if await connection.scalar(db.select(model.id).where(model.id == resource_id)) is None:
+                return json_response({'error': 'Resource not found'}, 404)
+            try:
+                start, end = availability_window(request_args(request))
+            except ValueError as error:
+                return json_response({'error': str(error)}, 400)
+            taken = await connection.execute(taken_dates(resource_column, resource_id, start, end))
+        return json_response({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'free': free_date_ranges(taken, start, end)
+        })
+    return endpoint
+
+
+async def user_bookings(request):
+    user_id = session_user_id(request)
+    if user_id is None:
+        return json_response({'error': 'Unauthorized'}, 401)
+    
+    async with connect() as connection:
+        bookings, next_cursor = await fetch_page(
+            connection, db.select(*BOOKING_FIELDS).where(Booking.user_id == user_id),
+            request_args(request), Booking.id, BOOKING_FIELDS
+        )
+    return json_response({'items': bookings, 'next_cursor': next_cursor})
+
+
+# ==================== APPLICATION ====================
+
+@asynccontextmanager
+async def lifespan(app):
+    start_job_worker()
+    yield
+    await engine.dispose()
+
+
+# Flask-CORS covers the mounted app, including preflight requests for these paths
+cors = [Middleware(
+    CORSMiddleware,
+    allow_origins=['http://localhost:3000', 'http://localhost:5000', '*'],
+    allow_credentials=True
+)]
+
+
+def route(path, endpoint, name):
+    return Route(path, endpoint, methods=['GET'], middleware=[Middleware(RequestMetrics, endpoint=name), *cors])
+
+
+routes = [
+    route('/api/wedding-halls', catalog_list(
+        WeddingHall, HALL_FIELDS, HALL_FILTERS, HALL_SORTS, (wedding_hall_amenities, 'wedding_hall_id')
+    ), 'get_wedding_halls'),
+    route('/api/hotel-rooms', catalog_list(
+        HotelRoom, ROOM_FIELDS, ROOM_FILTERS, ROOM_SORTS, (hotel_room_amenities, 'hotel_room_id')
+    ), 'get_hotel_rooms'),
+    route('/api/shopping-items', catalog_list(ShoppingItem, ITEM_FIELDS, ITEM_FILTERS, ITEM_SORTS),
+          'get_shopping_items'),
+    route('/api/wedding-halls/{resource_id:int}/availability',
+          availability(WeddingHall, Booking.wedding_hall_id), 'get_wedding_hall_availability'),
+    route('/api/hotel-rooms/{resource_id:int}/availability',
+          availability(HotelRoom, Booking.hotel_room_id), 'get_hotel_room_availability'),
+    route('/api/bookings', user_bookings, 'get_user_bookings'),
+    # Everything else, including other methods on the paths above
+    Mount('/', app=WSGIMiddleware(flask_app, workers=int(os.environ.get('WSGI_THREADS', 10)))),
+]
+
+app = Starlette(routes=routes, exception_handlers={HTTPException: http_error}, lifespan=lifespan)
@@ -0,0 +1,565 @@
+"""Throughput and latency of every API route, as JSON for comparing runs.
+
+Seeds a temporary database at the given scale, then sends --requests requests
+to each endpoint in turn, in-process through the Flask test client and over
+HTTP to a local gunicorn server, and reports requests/s and p50/p95/p99 per
+endpoint. Every route in app.py must have a scenario below; the script
+refuses to run when one is missing so new routes get measured.
+
+    python benchmarks/api_bench.py --output results.json
+    python benchmarks/api_bench.py --baseline results.json --tolerance 0.25
+
+With --baseline, an endpoint whose p95 grew by more than --tolerance (or that
+started failing) is reported and the exit status is 1. With --explain, the
+plan of every distinct filtered statement run in client mode, and by each
+periodic job afterwards, is checked, and full table scans are listed under
+"full_scans": statements that need an index.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'api_bench.db')}"
+os.environ['JOB_POLL_INTERVAL'] = '0'
+os.environ['PAYMENT_GATEWAY'] = 'fake'
+os.environ['PAYMENT_WEBHOOK_SECRET'] = 'bench-webhook-secret'
+os.environ['RATE_LIMITING'] = 'false'
+sys.path.insert(0, ROOT)
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+import app as application  # noqa: E402
+from app import (  # noqa: E402
+    app, db, JOB_HANDLERS, User, WeddingHall, HotelRoom, ShoppingItem, Booking, Payment, Contact, Complaint,
+    RateRule, PASSWORD_HASH_METHOD, payment_gateway, minor_units
+)
+
+PASSWORD = 'password123'
+CHUNK = 50000
+MODES = ('client', 'server')
+
+
+# ==================== SEEDING ====================
+
+def insert(model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(db.insert(model), rows[start:start + CHUNK])
+
+
+# Seeds the catalog and history, plus per-request pools of the bench user's
+# bookings and payments for the endpoints that use one up (cancel, pay, webhook)
+def seed(args, pool_size):
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    password_hash = generate_password_hash(PASSWORD, method=PASSWORD_HASH_METHOD)
+    insert(User, [{
+        'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': password_hash,
+        'full_name': f'User {i}', 'phone': '9876543210', 'is_admin': False, 'created_at': now
+    } for i in range(args.users)])
+    user_ids = db.session.scalars(db.select(User.id).where(User.is_admin.is_(False))).all()
+    
+    insert(WeddingHall, [{
+        'name': f'Hall {i}', 'location': rng.choice(['Mumbai', 'Delhi', 'Pune']), 'capacity': 100 + i % 900,
+        'price_per_day': 20000.0 + i, 'description': 'Garden venue with parking', 'rating': i % 50 / 10
+    } for i in range(args.halls)])
+    insert(HotelRoom, [{
+        'name': f'Room {i}', 'hotel_name': rng.choice(['Taj Hotels', 'Oberoi']), 'room_type': 'Deluxe',
+        'capacity': 1 + i % 4, 'price_per_night': 3000.0 + i, 'rating': i % 50 / 10, 'available': True
+    } for i in range(args.rooms)])
+    insert(ShoppingItem, [{
+        'name': f'Decoration set {i}', 'category': 'Decorations', 'price': 100.0 + i, 'stock': 10 ** 9,
+        'vendor': 'Decor Store', 'description': 'Flower and light decoration set', 'rating': i % 50 / 10
+    } for i in range(args.items)])
+    
+    insert(Booking, [{
+        'user_id': rng.choice(user_ids), 'booking_type': 'hotel_room', 'hotel_room_id': 1 + i % args.rooms,
+        'check_in_date': date(2025, 1, 1) + timedelta(days=i * 3 // args.rooms % 1800),
+        'check_out_date': date(2025, 1, 2) + timedelta(days=i * 3 // args.rooms % 1800),
+        'total_price': 3000.0, 'guests': 2, 'status': rng.choice(['pending', 'confirmed', 'completed']),
+        'payment_status': 'pending', 'created_at': now
+    } for i in range(args.bookings)])
+    insert(Contact, [{
+        'user_id': rng.choice(user_ids), 'name': f'Visitor {i}', 'email': f'visitor{i}@example.com',
+        'message': 'Do you host receptions?', 'status': 'unread', 'created_at': now
+    } for i in range(args.contacts)])
+    insert(Complaint, [{
+        'user_id': rng.choice(user_ids), 'complaint_type': rng.choice(['booking', 'payment', 'service']),
+        'subject': f'Complaint {i}', 'description': 'The room was not ready at check-in',
+        'priority': rng.choice(['low', 'medium', 'high', 'urgent']), 'status': rng.choice(['open', 'in_progress']),
+        'created_at': now - timedelta(minutes=args.complaints - i)
+    } for i in range(args.complaints)])
+    
+    user_id = user_ids[0]
+    max_id = db.session.scalar(db.select(db.func.max(Booking.id))) or 0
+    pools = {}
+    for name in ('cancel', 'pay', 'webhook'):
+        pools[name] = list(range(max_id + 1, max_id + pool_size + 1))
+        max_id += pool_size
+        insert(Booking, [{
+            'id': booking_id, 'user_id': user_id, 'booking_type': 'hotel_room', 'hotel_room_id': 1,
+            'check_in_date': date(2020, 1, 1), 'check_out_date': date(2020, 1, 2), 'total_price': 3000.0,
+            'status': 'pending', 'payment_status': 'pending', 'created_at': now
+        } for booking_id in pools[name]])
+    insert(Payment, [{
+        'user_id': user_id, 'booking_id': booking_id, 'amount': 3000.0, 'currency': 'INR', 'status': 'created',
+        'gateway': payment_gateway.name, 'gateway_order_id': f'order_bench_{booking_id}', 'created_at': now
+    } for booking_id in pools['webhook']])
+    pools['payment'] = db.session.scalars(db.select(Payment.id).order_by(Payment.id)).all()
+    
+    # A weekend surcharge for every hall and room, a season per room, and rules to delete
+    insert(RateRule, [{
+        'booking_type': booking_type, 'name': 'Weekend', 'weekdays': 0b1110000, 'min_guests': 1,
+        'multiplier': 1.25, 'amount': 0.0, 'created_at': now
+    } for booking_type in ('wedding_hall', 'hotel_room')] + [{
+        'booking_type': 'hotel_room', 'resource_id': 1 + i, 'name': 'Season', 'start_date': date.today(),
+        'end_date': date.today() + timedelta(days=60 + i % 30), 'min_guests': 1, 'multiplier': 1.1,
+        'amount': 0.0, 'created_at': now
+    } for i in range(args.rooms)])
+    max_id = db.session.scalar(db.select(db.func.max(RateRule.id)))
+    pools['rate_rule'] = list(range(max_id + 1, max_id + pool_size + 1))
+    insert(RateRule, [{
+        'id': rule_id, 'booking_type': 'hotel_room', 'resource_id': 1, 'name': 'Promotion', 'min_guests': 1,
+        'multiplier': 0.9, 'amount': 0.0, 'created_at': now
+    } for rule_id in pools['rate_rule']])
+    db.session.commit()
+    return pools
+
+
+# ==================== SCENARIOS ====================
+
+def webhook_event(booking_id):
+    body = json.dumps({'event': 'payment.captured', 'payload': {'payment': {'entity': {
+        'id': f'pay_bench_{booking_id}', 'order_id': f'order_bench_{booking_id}',
+        'amount': minor_units(3000.0), 'currency': 'INR', 'status': 'captured'
+    }}}}).encode()
+    return body, {
+        'X-Razorpay-Event-Id': f'evt_bench_{booking_id}',
+        'X-Razorpay-Signature': payment_gateway.sign(body),
+    }
+
+
+def catalog_rows(kind, n, rows):
+    if kind == 'halls':
+        return [{'name': f'Imported hall {n}-{i}', 'location': 'Pune', 'capacity': 300,
+                 'price_per_day': 25000.0} for i in range(rows)]
+    if kind == 'rooms':
+        return [{'name': f'Imported room {n}-{i}', 'hotel_name': 'Oberoi', 'room_type': 'Suite',
+                 'capacity': 2, 'price_per_night': 8000.0} for i in range(rows)]
+    return [{'name': f'Imported item {n}-{i}', 'category': 'Gifts', 'price': 500.0,
+             'vendor': 'Gift Shop'} for i in range(rows)]
+
+
+# A search page's worth of stays across rooms and halls, starting up to a year out
+def quote_items(n, count, scale):
+    items = []
+    for i in range(count):
+        check_in = date.today() + timedelta(days=(n + i) % 365)
+        check_out = check_in + timedelta(days=1 + i % 7)
+        stay = {'check_in_date': check_in.isoformat(), 'check_out_date': check_out.isoformat()}
+        if i % 4:
+            stay.update(booking_type='hotel_room', hotel_room_id=1 + (n * count + i) % scale.rooms, guests=1 + i % 4)
+        else:
+            stay.update(booking_type='wedding_hall', wedding_hall_id=1 + (n * count + i) % scale.halls)
+        items.append(stay)
+    return {'items': items}
+
+
+# A hall plus a block of rooms for one event, on dates no other request uses
+def event_bookings(n, rooms, scale):
+    check_in = date(2050, 1, 1) + timedelta(days=n * 2)
+    stay = {'check_in_date': check_in.isoformat(), 'check_out_date': (check_in + timedelta(days=1)).isoformat()}
+    return {'bookings': [dict(stay, booking_type='wedding_hall', wedding_hall_id=1 + n % scale.halls)] + [
+        dict(stay, booking_type='hotel_room', hotel_room_id=1 + (n * rooms + i) % scale.rooms, guests=2)
+        for i in range(rooms)
+    ]}
+
+
+def imported_bookings(n, rows, scale):
+    start = date(2050, 1, 1) + timedelta(days=n * 2)
+    return [{'user_id': 2, 'booking_type': 'hotel_room', 'hotel_room_id': 1 + i % scale.rooms,
+             'check_in_date': start.isoformat(), 'check_out_date': (start + timedelta(days=1)).isoformat(),
+             'total_price': 3000.0} for i in range(rows)]
+
+
+# endpoint -> (session, expected statuses, builder). A builder takes the
+# request number n, the seeded id pools and the parsed arguments and returns
+# (method, path, body); dict and list bodies are sent as JSON, bytes bodies
+# as (bytes, extra headers).
+SCENARIOS = {
+    'signup': ('anon', {201}, lambda n, pools, a: ('POST', '/api/auth/signup', {
+        'username': f'bench{n}', 'email': f'bench{n}@example.com', 'password': PASSWORD,
+        'full_name': 'Bench User', 'phone': '9876543210'})),
+    'login': ('anon', {200}, lambda n, pools, a: ('POST', '/api/auth/login', {
+        'username': 'user0', 'password': PASSWORD})),
+    'logout': ('user', {200}, lambda n, pools, a: ('POST', '/api/auth/logout', None)),
+    'get_current_user': ('user', {200}, lambda n, pools, a: ('GET', '/api/auth/me', None)),
+    
+    'get_wedding_halls': ('anon', {200}, lambda n, pools, a: (
+        'GET', ['/api/wedding-halls', '/api/wedding-halls?sort=-rating&min_capacity=300',
+                '/api/wedding-halls?q=garden&location=Pune'][n % 3], None)),
+    'get_wedding_hall': ('anon', {200}, lambda n, pools, a: ('GET', f'/api/wedding-halls/{1 + n % a.halls}', None)),
+    'get_wedding_hall_availability': ('anon', {200}, lambda n, pools, a: (
+        'GET', f'/api/wedding-halls/{1 + n % a.halls}/availability?from=2025-01-01&to=2025-12-31', None)),
+    'create_wedding_hall': ('admin', {201}, lambda n, pools, a: ('POST', '/api/wedding-halls', {
+        'name': f'New hall {n}', 'location': 'Delhi', 'capacity': 250, 'price_per_day': 30000.0,
+        'amenities': ['Parking', 'Catering']})),
+    'bulk_create_wedding_halls': ('admin', {200}, lambda n, pools, a: (
+        'POST', '/api/wedding-halls/bulk', catalog_rows('halls', n, a.bulk_rows))),
+    
+    'get_hotel_rooms': ('anon', {200}, lambda n, pools, a: (
+        'GET', ['/api/hotel-rooms', '/api/hotel-rooms?sort=price&min_capacity=2',
+                '/api/hotel-rooms?hotel_name=Oberoi&available=true'][n % 3], None)),
+    'get_hotel_room': ('anon', {200}, lambda n, pools, a: ('GET', f'/api/hotel-rooms/{1 + n % a.rooms}', None)),
+    'get_hotel_room_availability': ('anon', {200}, lambda n, pools, a: (
+        'GET', f'/api/hotel-rooms/{1 + n % a.rooms}/availability?from=2025-01-01&to=2025-12-31', None)),
+    'create_hotel_room': ('admin', {201}, lambda n, pools, a: ('POST', '/api/hotel-rooms', {
+        'name': f'New room {n}', 'hotel_name': 'Taj Hotels', 'room_type': 'Suite', 'capacity': 2,
+        'price_per_night': 9000.0})),
+    'bulk_create_hotel_rooms': ('admin', {200}, lambda n, pools, a: (
+        'POST', '/api/hotel-rooms/bulk', catalog_rows('rooms', n, a.bulk_rows))),
+    
+    'get_shopping_items': ('anon', {200}, lambda n, pools, a: (
+        'GET', ['/api/shopping-items', '/api/shopping-items?sort=-price&in_stock=true',
+                '/api/shopping-items?q=flower&max_price=1000'][n % 3], None)),
+    'get_shopping_item': ('anon', {200}, lambda n, pools, a: ('GET', f'/api/shopping-items/{1 + n % a.items}', None)),
+    'create_shopping_item': ('admin', {201}, lambda n, pools, a: ('POST', '/api/shopping-items', {
+        'name': f'New item {n}', 'category': 'Gifts', 'price': 750.0, 'vendor': 'Gift Shop'})),
+    'bulk_create_shopping_items': ('admin', {200}, lambda n, pools, a: (
+        'POST', '/api/shopping-items/bulk', catalog_rows('items', n, a.bulk_rows))),
+    
+    'create_booking': ('user', {201}, lambda n, pools, a: ('POST', '/api/bookings', {
+        'booking_type': 'hotel_room', 'hotel_room_id': 1 + n % a.rooms,
+        'check_in_date': (date(2040, 1, 1) + timedelta(days=n // a.rooms * 2)).isoformat(),
+        'check_out_date': (date(2040, 1, 2) + timedelta(days=n // a.rooms * 2)).isoformat(), 'guests': 2})),
+    'create_booking_batch': ('user', {201}, lambda n, pools, a: (
+        'POST', '/api/bookings/batch', event_bookings(n, a.batch_rooms, a))),
+    'get_user_bookings': ('user', {200}, lambda n, pools, a: ('GET', '/api/bookings', None)),
+    'get_booking': ('user', {200}, lambda n, pools, a: (
+        'GET', f"/api/bookings/{pools['cancel'][n % len(pools['cancel'])]}", None)),
+    'cancel_booking': ('user', {200}, lambda n, pools, a: ('POST', f"/api/bookings/{pools['cancel'][n]}/cancel", None)),
+    
+    'create_quotes': ('anon', {200}, lambda n, pools, a: ('POST', '/api/quotes', quote_items(n, a.quote_items, a))),
+    'get_rate_rules': ('admin', {200}, lambda n, pools, a: ('GET', '/api/admin/rate-rules', None)),
+    'create_rate_rule': ('admin', {201}, lambda n, pools, a: ('POST', '/api/admin/rate-rules', {
+        'booking_type': 'hotel_room', 'resource_id': 1 + n % a.rooms, 'name': f'Event {n}',
+        'start_date': (date(2040, 1, 1) + timedelta(days=n)).isoformat(), 'multiplier': 1.5})),
+    'delete_rate_rule': ('admin', {200}, lambda n, pools, a: (
+        'POST', f"/api/admin/rate-rules/{pools['rate_rule'][n]}/delete", None)),
+    
+    'create_order': ('user', {201}, lambda n, pools, a: ('POST', '/api/orders', {
+        'items': [{'item_id': 1 + n % a.items, 'quantity': 1}, {'item_id': 1 + (n + 1) % a.items, 'quantity': 2}]})),
+    'get_user_orders': ('user', {200}, lambda n, pools, a: ('GET', '/api/orders', None)),
+    
+    'create_payment': ('user', {201}, lambda n, pools, a: ('POST', '/api/payments', {'booking_id': pools['pay'][n]})),
+    'get_payment': ('user', {200}, lambda n, pools, a: (
+        'GET', f"/api/payments/{pools['payment'][n % len(pools['payment'])]}", None)),
+    'payment_webhook': ('anon', {202}, lambda n, pools, a: (
+        'POST', '/api/payments/webhook', webhook_event(pools['webhook'][n]))),
+    
+    'submit_contact': ('anon', {201}, lambda n, pools, a: ('POST', '/api/contact', {
+        'name': 'Visitor', 'email': 'visitor@example.com', 'message': f'Question {n}'})),
+    'submit_complaint': ('user', {201}, lambda n, pools, a: ('POST', '/api/complaints', {
+        'complaint_type': 'service', 'subject': f'Complaint {n}', 'description': 'Slow check-in'})),
+    'get_user_complaints': ('user', {200}, lambda n, pools, a: ('GET', '/api/complaints', None)),
+    
+    'admin_dashboard': ('admin', {200}, lambda n, pools, a: ('GET', '/api/admin/dashboard', None)),
+    'admin_revenue': ('admin', {200}, lambda n, pools, a: (
+        'GET', ['/api/admin/dashboard/revenue?period=day', '/api/admin/dashboard/revenue?period=month'][n % 2], None)),
+    'get_all_users': ('admin', {200}, lambda n, pools, a: ('GET', '/api/admin/users', None)),
+    'get_all_bookings': ('admin', {200}, lambda n, pools, a: ('GET', '/api/admin/bookings', None)),
+    'bulk_import_bookings': ('admin', {200}, lambda n, pools, a: (
+        'POST', '/api/admin/bookings/bulk', imported_bookings(n, a.bulk_rows, a))),
+    'get_all_contacts': ('admin', {200}, lambda n, pools, a: (
+        'GET', ['/api/admin/contacts', '/api/admin/contacts?status=unread&sort=created_at'][n % 2], None)),
+    'get_contact': ('admin', {200}, lambda n, pools, a: ('GET', f'/api/admin/contacts/{1 + n % a.contacts}', None)),
+    'resolve_contact': ('admin', {200}, lambda n, pools, a: (
+        'POST', f'/api/admin/contacts/{1 + n % a.contacts}/resolve', None)),
+    'bulk_update_contacts': ('admin', {200}, lambda n, pools, a: ('POST', '/api/admin/contacts/bulk-update', {
+        'ids': [1 + (n * 50 + i) % a.contacts for i in range(50)], 'status': 'read'})),
+    'get_all_complaints': ('admin', {200}, lambda n, pools, a: ('GET', [
+        '/api/admin/complaints',
+        '/api/admin/complaints?status=open&priority=high,urgent',
+        '/api/admin/complaints?status=open,in_progress&complaint_type=booking&sort=created_at',
+    ][n % 3], None)),
+    'get_complaint': ('admin', {200}, lambda n, pools, a: (
+        'GET', f'/api/admin/complaints/{1 + n % a.complaints}', None)),
+    'update_complaint': ('admin', {200}, lambda n, pools, a: (
+        'POST', f'/api/admin/complaints/{1 + n % a.complaints}/update', {'status': 'in_progress'})),
+    'bulk_update_complaints': ('admin', {200}, lambda n, pools, a: ('POST', '/api/admin/complaints/bulk-update', {
+        'ids': [1 + (n * 50 + i) % a.complaints for i in range(50)], 'status': ['resolved', 'open'][n % 2]})),
+    'admin_resolution': ('admin', {200}, lambda n, pools, a: ('GET', '/api/admin/dashboard/resolution', None)),
+    
+    'metrics': ('anon', {200}, lambda n, pools, a: ('GET', '/metrics', None)),
+}
+UNMEASURED = {'static'}
+
+
+def build_requests(endpoint, first, count, pools, args, cookies):
+    role, expected, builder = SCENARIOS[endpoint]
+    requests = []
+    for n in range(first, first + count):
+        method, path, body = builder(n, pools, args)
+        headers = {'Host': '127.0.0.1'}
+        if role != 'anon':
+            headers['Cookie'] = cookies[role]
+        if isinstance(body, tuple):
+            body, extra = body
+            headers.update(extra, **{'Content-Type': 'application/json'})
+        elif body is not None:
+            body = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        requests.append((method, path, headers, body or b''))
+    return requests, expected
+
+
+# ==================== DRIVERS ====================
+
+def login(send, username, password):
+    status, headers = send('POST', '/api/auth/login', {'Content-Type': 'application/json'},
+                           json.dumps({'username': username, 'password': password}).encode())
+    if status != 200:
+        raise RuntimeError(f'login as {username} failed with {status}')
+    return headers['Set-Cookie'].split(';', 1)[0]
+
+
+def run_client(client, requests):
+    latencies, statuses = [], []
+    started = time.perf_counter()
+    for method, path, headers, body in requests:
+        sent = time.perf_counter()
+        response = client.open(path, method=method, headers=headers, data=body)
+        response.get_data()
+        latencies.append(time.perf_counter() - sent)
+        statuses.append(response.status_code)
+    return latencies, statuses, time.perf_counter() - started
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, workers):
+    process = subprocess.Popen(
+        ['gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--backlog', '4096'],
+        cwd=ROOT, env=os.environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('gunicorn did not start')
+
+
+def raw_request(method, path, headers, body):
+    head = f'{method} {path} HTTP/1.1\r\n' + ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+    return f'{head}Content-Length: {len(body)}\r\n\r\n'.encode() + body
+
+
+async def sender(port, queue, latencies, statuses):
+    reader = writer = None
+    while queue:
+        request = queue.pop()
+        sent = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            head = await reader.readuntil(b'\r\n\r\n')
+            headers = dict(
+                line.split(': ', 1) for line in head.decode('latin-1').lower().split('\r\n')[1:] if ': ' in line
+            )
+            await reader.readexactly(int(headers.get('content-length', 0)))
+            statuses.append(int(head.split(b' ', 2)[1]))
+            if headers.get('connection') == 'close':
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError):
+            statuses.append(0)
+            if writer is not None:
+                writer.close()
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - sent)
+    if writer is not None:
+        writer.close()
+
+
+async def run_server(port, requests, concurrency):
+    queue = [raw_request(*request) for request in reversed(requests)]
+    latencies, statuses = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*[sender(port, queue, latencies, statuses) for _ in range(concurrency)])
+    return latencies, statuses, time.perf_counter() - started
+
+
+def server_send(port):
+    def send(method, path, headers, body):
+        request = urllib.request.Request(f'http://127.0.0.1:{port}{path}', data=body, headers=headers, method=method)
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers
+    return send
+
+
+def client_send(client):
+    def send(method, path, headers, body):
+        response = client.open(path, method=method, headers=headers, data=body)
+        return response.status_code, response.headers
+    return send
+
+
+# ==================== REPORTING ====================
+
+def percentile(values, fraction):
+    return round(values[min(int(len(values) * fraction), len(values) - 1)] * 1000, 3) if values else None
+
+
+def summarize(mode, endpoint, requests, expected, latencies, statuses, elapsed):
+    latencies.sort()
+    return {
+        'mode': mode,
+        'endpoint': endpoint,
+        'method': requests[0][0],
+        'requests': len(requests),
+        'errors': sum(status not in expected for status in statuses),
+        'rps': round(len(requests) / elapsed, 1),
+        'p50_ms': percentile(latencies, 0.5),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    previous = {(row['mode'], row['endpoint']): row for row in baseline['results']}
+    found = []
+    for row in results:
+        before = previous.get((row['mode'], row['endpoint']))
+        if before is None:
+            continue
+        if row['errors'] > before['errors']:
+            found.append(f"{row['mode']} {row['endpoint']}: {row['errors']} errors (was {before['errors']})")
+        elif before['p95_ms'] and row['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            found.append(f"{row['mode']} {row['endpoint']}: p95 {row['p95_ms']} ms (was {before['p95_ms']} ms)")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--halls', type=int, default=500)
+    parser.add_argument('--rooms', type=int, default=2000)
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--bookings', type=int, default=50000)
+    parser.add_argument('--contacts', type=int, default=5000)
+    parser.add_argument('--complaints', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and mode')
+    parser.add_argument('--bulk-rows', type=int, default=100, help='rows per bulk import request')
+    parser.add_argument('--quote-items', type=int, default=100, help='stays priced per quote request')
+    parser.add_argument('--batch-rooms', type=int, default=50, help='rooms booked with a hall per batch booking')
+    parser.add_argument('--modes', default=','.join(MODES), help='client, server or both')
+    parser.add_argument('--only', help='comma-separated endpoints to run')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers in server mode')
+    parser.add_argument('--concurrency', type=int, default=16, help='connections per endpoint in server mode')
+    parser.add_argument('--output', help='write JSON results here instead of stdout')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 growth over the baseline')
+    parser.add_argument('--explain', action='store_true', help='report statements that scan a whole table')
+    args = parser.parse_args()
+    
+    missing = {rule.endpoint for rule in app.url_map.iter_rules()} - set(SCENARIOS) - UNMEASURED
+    if missing:
+        parser.error(f"no scenario for {', '.join(sorted(missing))}; add them to SCENARIOS")
+    endpoints = args.only.split(',') if args.only else list(SCENARIOS)
+    modes = args.modes.split(',')
+    
+    started = time.perf_counter()
+    with app.app_context():
+        pools = seed(args, args.requests * len(modes))
+    print(f'seeded in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+    application.QUERY_PLAN_CHECK = args.explain
+    
+    results = []
+    for index, mode in enumerate(modes):
+        process = None
+        if mode == 'server':
+            port = free_port()
+            process = start_server(port, args.workers)
+            send = server_send(port)
+        else:
+            client = app.test_client(use_cookies=False)
+            send = client_send(client)
+        try:
+            cookies = {'user': login(send, 'user0', PASSWORD), 'admin': login(send, 'admin', 'admin123')}
+            for endpoint in endpoints:
+                # Each mode numbers its requests from its own range, so unique
+                # names, dates and pooled ids are never reused between modes
+                requests, expected = build_requests(
+                    endpoint, index * args.requests, args.requests, pools, args, cookies
+                )
+                if mode == 'server':
+                    measured = asyncio.run(run_server(port, requests, args.concurrency))
+                else:
+                    measured = run_client(client, requests)
+                row = summarize(mode, endpoint, requests, expected, *measured)
+                results.append(row)
+                print(f"{mode:<7} {endpoint:<32} {row['rps']:>9.1f}/s  p50 {row['p50_ms']:>8.2f}  "
+                      f"p95 {row['p95_ms']:>8.2f}  p99 {row['p99_ms']:>8.2f} ms  {row['errors']} errors",
+                      file=sys.stderr)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+    
+    if args.explain:
+        with app.app_context():
+            for handler in JOB_HANDLERS.values():
+                handler()
+    
+    report = {
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'scale': {name: getattr(args, name) for name in
+                  ('users', 'halls', 'rooms', 'items', 'bookings', 'contacts', 'complaints', 'requests',
+                   'bulk_rows', 'workers', 'concurrency')},
+        'results': results,
+    }
+    if args.explain:
+        report['full_scans'] = [
+            {'endpoint': endpoint, 'tables': tables, 'statement': statement}
+            for statement, (endpoint, tables) in sorted(application.full_table_scans.items(), key=lambda item: item[1])
+        ]
+        for scan in report['full_scans']:
+            print(f"full scan of {', '.join(scan['tables'])} in {scan['endpoint']}", file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f'regression: {line}', file=sys.stderr)
+        sys.exit(1 if found else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""Latency under many concurrent connections: gunicorn sync workers (app:app)
+vs. uvicorn serving the async read endpoints (asgi:app).
+
+Both servers run on a seeded temporary database with the same worker count.
+Each of --connections clients sends GETs round-robin over the read endpoints
+for --duration seconds, reconnecting whenever the server closes the
+connection, and latency includes any time spent waiting to connect.
+
+    python benchmarks/asgi_load_bench.py --connections 1000 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'asgi_load_bench.db')}"
+os.environ['JOB_POLL_INTERVAL'] = '0'
+os.environ['PAYMENT_GATEWAY'] = 'fake'
+os.environ['PAYMENT_WEBHOOK_SECRET'] = 'bench-webhook-secret'
+sys.path.insert(0, ROOT)
+
+from app import app, db, WeddingHall, HotelRoom, ShoppingItem, Booking  # noqa: E402
+
+PATHS = [
+    '/api/wedding-halls?sort=price',
+    '/api/hotel-rooms?min_capacity=2',
+    '/api/shopping-items?q=set',
+    '/api/wedding-halls/1/availability?from=2025-01-01&to=2025-12-31',
+    '/api/hotel-rooms/1/availability?from=2025-01-01&to=2025-12-31',
+    '/api/bookings',
+]
+SERVERS = {
+    'gunicorn (sync)': ['gunicorn', 'app:app', '--bind', '127.0.0.1:{port}', '--workers', '{workers}',
+                        '--backlog', '4096'],
+    'uvicorn (asgi)': ['uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', '{port}', '--workers', '{workers}',
+                       '--backlog', '4096', '--no-access-log'],
+}
+
+
+def seed(rows):
+    with app.app_context():
+        db.session.execute(db.insert(WeddingHall), [
+            {'name': f'Hall {i}', 'location': 'Mumbai', 'capacity': 100 + i % 400, 'price_per_day': 10000 + i}
+            for i in range(rows)
+        ])
+        db.session.execute(db.insert(HotelRoom), [
+            {'name': f'Room {i}', 'hotel_name': 'Taj Hotels', 'room_type': 'Suite', 'capacity': 1 + i % 4,
+             'price_per_night': 2000 + i}
+            for i in range(rows)
+        ])
+        db.session.execute(db.insert(ShoppingItem), [
+            {'name': f'Decoration set {i}', 'category': 'Decorations', 'price': 100 + i, 'stock': 10,
+             'vendor': 'Decor Store', 'description': 'Decoration set'}
+            for i in range(rows)
+        ])
+        bookings = []
+        for i in range(rows):
+            check_in = date(2025, 1, 1) + timedelta(days=(i * 3) % 365)
+            bookings.append({
+                'user_id': 1, 'booking_type': 'wedding_hall' if i % 2 else 'hotel_room',
+                'wedding_hall_id': 1 if i % 2 else None, 'hotel_room_id': None if i % 2 else 1,
+                'check_in_date': check_in, 'check_out_date': check_in + timedelta(days=1),
+                'total_price': 1000.0, 'guests': 2
+            })
+        db.session.execute(db.insert(Booking), bookings)
+        db.session.commit()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(command, port, workers):
+    process = subprocess.Popen(
+        [part.format(port=port, workers=workers) for part in command],
+        cwd=ROOT, env=os.environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/shopping-items?limit=1', timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'{command[0]} did not start')
+
+
+def login(port):
+    request = urllib.request.Request(
+        f'http://127.0.0.1:{port}/api/auth/login',
+        data=json.dumps({'username': 'admin', 'password': 'admin123'}).encode(),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request) as response:
+        return response.headers['Set-Cookie'].split(';', 1)[0]
+
+
+async def client(port, cookie, offset, stop_at, latencies, errors):
+    requests = [
+        f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n\r\n'.encode()
+        for path in PATHS
+    ]
+    reader = writer = None
+    sent = offset
+    while time.monotonic() < stop_at:
+        started = time.monotonic()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(requests[sent % len(requests)])
+            head = await reader.readuntil(b'\r\n\r\n')
+            headers = dict(
+                line.split(': ', 1) for line in head.decode('latin-1').lower().split('\r\n')[1:] if ': ' in line
+            )
+            await reader.readexactly(int(headers.get('content-length', 0)))
+            if not head.startswith(b'HTTP/1.1 200') and not head.startswith(b'HTTP/1.0 200'):
+                errors.append(head.split(b'\r\n', 1)[0])
+            if headers.get('connection') == 'close':
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError) as error:
+            errors.append(type(error).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+            continue
+        latencies.append(time.monotonic() - started)
+        sent += 1
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, cookie, connections, duration):
+    latencies, errors = [], []
+    stop_at = time.monotonic() + duration
+    await asyncio.gather(*[
+        client(port, cookie, i, stop_at, latencies, errors) for i in range(connections)
+    ])
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)] * 1000 if values else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=2000)
+    args = parser.parse_args()
+    
+    seed(args.seed)
+    print(f"{'server':<18} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, command in SERVERS.items():
+        port = free_port()
+        process = start_server(command, port, args.workers)
+        try:
+            latencies, errors = asyncio.run(load(port, login(port), args.connections, args.duration))
+        finally:
+            process.terminate()
+            process.wait()
+        latencies.sort()
+        print(f'{name:<18} {len(latencies):>9} {len(errors):>7} {len(latencies) / args.duration:>8.0f} '
+              f'{percentile(latencies, 0.5):>8.1f} {percentile(latencies, 0.99):>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Availability check latency vs. booking history size.
+
+Seeds a throwaway SQLite database with N historical bookings spread over a
+set of halls, then times the overlap check used by create_booking for a
+near-future date range. With the availability indexes the latency should
+stay flat as N grows.
+
+    python benchmarks/availability_bench.py 1000 10000 100000 1000000
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'availability_bench.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+os.environ['PAYMENT_GATEWAY'] = 'fake'
+os.environ['PAYMENT_WEBHOOK_SECRET'] = 'bench-webhook-secret'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, Booking, WeddingHall, overlapping_bookings  # noqa: E402
+
+HALLS = 100
+CHECKS = 2000
+TODAY = date.today()
+
+
+def seed(total):
+    existing = Booking.query.count()
+    rows = []
+    for i in range(existing, total):
+        hall_id = i % HALLS + 1
+        # Each hall gets back-to-back two-day bookings going back in time
+        check_out = TODAY - timedelta(days=2 * (i // HALLS))
+        rows.append({
+            'user_id': 1,
+            'booking_type': 'wedding_hall',
+            'wedding_hall_id': hall_id,
+            'check_in_date': check_out - timedelta(days=2),
+            'check_out_date': check_out,
+            'total_price': 1000.0,
+            'status': 'completed',
+            'payment_status': 'paid',
+        })
+        if len(rows) == 50000:
+            db.session.execute(db.insert(Booking), rows)
+            rows = []
+    if rows:
+        db.session.execute(db.insert(Booking), rows)
+    db.session.commit()
+
+
+def time_checks():
+    start = time.perf_counter()
+    for i in range(CHECKS):
+        check_in = TODAY + timedelta(days=i % 30)
+        overlapping_bookings(Booking.wedding_hall_id, i % HALLS + 1, check_in, check_in + timedelta(days=2)).first()
+    return (time.perf_counter() - start) / CHECKS * 1e6
+
+
+def main(sizes):
+    with app.app_context():
+        for i in range(HALLS - WeddingHall.query.count()):
+            db.session.add(WeddingHall(name=f'Hall {i}', location='Bench', capacity=100, price_per_day=1000))
+        db.session.commit()
+        
+        print(f"{'bookings':>10}  {'check latency (us)':>20}")
+        for size in sizes:
+            seed(size)
+            print(f'{size:>10}  {time_checks():>20.1f}')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000, 1000000])
@@ -0,0 +1,95 @@
+"""Time to expire unpaid bookings and complete past ones: a per-row ORM loop
+vs. the batched set-based lifecycle jobs.
+
+The ORM loop runs on --orm-rows bookings (it is too slow for millions); the
+jobs run on all --rows. Half the bookings are stale unpaid pending ones and
+half are confirmed stays that have ended.
+
+    python benchmarks/booking_transitions_bench.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'booking_transitions_bench.db')}"
+os.environ['JOB_POLL_INTERVAL'] = '0'
+os.environ['PAYMENT_GATEWAY'] = 'fake'
+os.environ['PAYMENT_WEBHOOK_SECRET'] = 'bench-webhook-secret'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import (  # noqa: E402
+    app, db, Booking, BOOKING_PAYMENT_TTL_HOURS, JOB_BATCH_SIZE, expire_unpaid_bookings, complete_past_bookings
+)
+
+CHUNK = 50000
+
+
+def seed(rows):
+    db.session.execute(db.delete(Booking))
+    stale = datetime.utcnow() - timedelta(hours=BOOKING_PAYMENT_TTL_HOURS + 1)
+    for start in range(0, rows, CHUNK):
+        db.session.execute(db.insert(Booking), [{
+            'user_id': 1,
+            'booking_type': 'hotel_room',
+            'hotel_room_id': 1,
+            'check_in_date': date(2024, 1, 1) + timedelta(days=i % 365),
+            'check_out_date': date(2024, 1, 2) + timedelta(days=i % 365),
+            'total_price': 1000.0,
+            'status': 'pending' if i % 2 else 'confirmed',
+            'payment_status': 'pending' if i % 2 else 'paid',
+            'created_at': stale,
+        } for i in range(start, min(start + CHUNK, rows))])
+    db.session.commit()
+
+
+def orm_loop():
+    cutoff = datetime.utcnow() - timedelta(hours=BOOKING_PAYMENT_TTL_HOURS)
+    changed = 0
+    for booking in Booking.query.filter(Booking.status == 'pending', Booking.payment_status == 'pending',
+                                        Booking.created_at < cutoff):
+        booking.status = 'cancelled'
+        changed += 1
+    for booking in Booking.query.filter(Booking.status == 'confirmed', Booking.check_out_date <= date.today()):
+        booking.status = 'completed'
+        changed += 1
+    db.session.commit()
+    return changed
+
+
+def batched_jobs():
+    return expire_unpaid_bookings() + complete_past_bookings()
+
+
+def timed(rows, transition):
+    seed(rows)
+    db.session.expunge_all()
+    started = time.perf_counter()
+    changed = transition()
+    elapsed = time.perf_counter() - started
+    assert changed == rows, (changed, rows)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--orm-rows', type=int, default=100000)
+    args = parser.parse_args()
+    
+    with app.app_context():
+        results = [
+            ('ORM loop', args.orm_rows, timed(args.orm_rows, orm_loop)),
+            (f'batched jobs ({JOB_BATCH_SIZE}/batch)', args.orm_rows, timed(args.orm_rows, batched_jobs)),
+            (f'batched jobs ({JOB_BATCH_SIZE}/batch)', args.rows, timed(args.rows, batched_jobs)),
+        ]
+    
+    print(f"{'transition':<28} {'bookings':>9} {'seconds':>8} {'rows/s':>10}")
+    for name, rows, elapsed in results:
+        print(f'{name:<28} {rows:>9} {elapsed:>8.2f} {rows / elapsed:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
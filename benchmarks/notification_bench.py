@@ -0,0 +1,89 @@
+"""Request latency with notifications queued in the outbox, and dispatch throughput.
+
+Submits contact messages through POST /api/contact while a dispatcher thread
+drains the outbox into a sender that takes --provider-ms per batch (a stand-in
+for a slow email/SMS provider). Request latency should not move with
+--provider-ms; only how long the outbox takes to drain does.
+
+    python benchmarks/notification_bench.py --requests 2000 --provider-ms 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SlowSender:
+    def __init__(self, delay):
+        self.delay = delay
+        self.sent = 0
+    
+    def send(self, messages):
+        time.sleep(self.delay)
+        self.sent += len(messages)
+        return {}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--provider-ms', type=float, default=200, help='sender latency per batch')
+    args = parser.parse_args()
+    
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'notification_bench.db')}"
+    os.environ['JOB_POLL_INTERVAL'] = '0'
+    os.environ['PAYMENT_GATEWAY'] = 'fake'
+    os.environ['PAYMENT_WEBHOOK_SECRET'] = 'bench-webhook-secret'
+    os.environ['RATE_LIMITING'] = 'false'
+    sys.path.insert(0, ROOT)
+    import app as application
+    from app import app, db, Notification, dispatch_notifications
+    
+    sender = application.notification_sender = SlowSender(args.provider_ms / 1000)
+    done = threading.Event()
+    
+    def dispatcher():
+        with app.app_context():
+            while not done.is_set() or dispatch_notifications():
+                time.sleep(0.01)
+    
+    thread = threading.Thread(target=dispatcher)
+    thread.start()
+    
+    client = app.test_client()
+    latencies = []
+    started = time.perf_counter()
+    for i in range(args.requests):
+        sent_at = time.perf_counter()
+        response = client.post('/api/contact', json={
+            'name': 'Bench', 'email': 'bench@example.com', 'message': f'message {i}'
+        })
+        latencies.append(time.perf_counter() - sent_at)
+        assert response.status_code == 201, response.get_json()
+    submitted = time.perf_counter() - started
+    
+    done.set()
+    thread.join()
+    drained = time.perf_counter() - started
+    
+    with app.app_context():
+        pending = db.session.scalar(db.select(db.func.count()).where(Notification.status != 'sent'))
+    
+    print(f'provider latency:  {args.provider_ms:.0f} ms per batch')
+    print(f'requests:          {args.requests} in {submitted:.2f}s')
+    print(f'request latency:   p50 {percentile(latencies, 0.5) * 1000:.2f} ms  '
+          f'p95 {percentile(latencies, 0.95) * 1000:.2f} ms  p99 {percentile(latencies, 0.99) * 1000:.2f} ms')
+    print(f'notifications:     {sender.sent} sent, {pending} not sent, outbox drained after {drained:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Logins per second per core at different password hash cost settings.
+
+Times werkzeug's check_password_hash for each method on a single core. That
+check is the CPU cost of one successful login, so 1 / time is the login
+ceiling per core. Pass method strings to try other settings:
+
+    python benchmarks/password_hash_bench.py scrypt:16384:8:1 pbkdf2:sha256:300000
+"""
+import sys
+import time
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHODS = [
+    'scrypt:32768:8:1',
+    'scrypt:16384:8:1',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:100000',
+]
+MIN_SECONDS = 2.0
+
+
+def logins_per_second(method):
+    stored = generate_password_hash('correct horse battery staple', method=method)
+    checks = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < MIN_SECONDS:
+        check_password_hash(stored, 'correct horse battery staple')
+        checks += 1
+    elapsed = time.perf_counter() - started
+    return checks / elapsed, elapsed / checks * 1000
+
+
+def main(methods):
+    print(f"{'method':<24} {'logins/s/core':>14} {'ms/login':>10}")
+    for method in methods:
+        rate, latency = logins_per_second(method)
+        print(f'{method:<24} {rate:>14.1f} {latency:>10.1f}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or DEFAULT_METHODS)
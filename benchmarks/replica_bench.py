@@ -0,0 +1,162 @@
+"""Booking writes alongside admin reporting, with and without read replicas.
+
+Worker processes (standing in for gunicorn workers) each run writer threads
+that book hotel rooms through POST /api/bookings and reader threads that page
+through the admin booking list and revenue report. With --replicas N the
+primary is copied into N SQLite files once, before the run, so the replicas
+are as stale as they can get: every writer re-reads the availability of the
+room it just booked, and any booking missing from that read is reported as a
+read-your-writes violation.
+
+    python benchmarks/replica_bench.py --replicas 0
+    python benchmarks/replica_bench.py --replicas 2
+
+Set DATABASE_URL and DATABASE_REPLICA_URLS to run against PostgreSQL and its
+streaming replicas instead (--replicas is then ignored).
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure(database_url, replica_urls):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['DATABASE_REPLICA_URLS'] = replica_urls
+    os.environ['JOB_POLL_INTERVAL'] = '0'
+    os.environ['PAYMENT_GATEWAY'] = 'fake'
+    os.environ['PAYMENT_WEBHOOK_SECRET'] = 'bench-webhook-secret'
+    os.environ['RATE_LIMITING'] = 'false'
+    os.environ['PASSWORD_HASH_WORKERS'] = '0'  # pool workers cannot start processes
+    sys.path.insert(0, ROOT)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0
+
+
+def writer(app, number, args, results):
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    for i in range(args.bookings):
+        room_id = 2 + number % args.rooms
+        check_in = date(2040, 1, 1) + timedelta(days=(number // args.rooms * args.bookings + i) * 2)
+        window = {'from': check_in.isoformat(), 'to': (check_in + timedelta(days=1)).isoformat()}
+        started = time.perf_counter()
+        response = client.post('/api/bookings', json={
+            'booking_type': 'hotel_room', 'hotel_room_id': room_id, 'guests': 1,
+            'check_in_date': window['from'], 'check_out_date': window['to']
+        })
+        results['write'].append(time.perf_counter() - started)
+        results['status'].append(response.status_code)
+        availability = client.get(f'/api/hotel-rooms/{room_id}/availability', query_string=window).get_json()
+        if response.status_code == 201 and availability['free']:
+            results['violations'] += 1
+
+
+def reader(app, args, results, done):
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    paths = ['/api/admin/bookings?limit=500', '/api/admin/dashboard/revenue?period=day']
+    turn = 0
+    while not done.is_set():
+        started = time.perf_counter()
+        client.get(paths[turn % len(paths)])
+        results['read'].append(time.perf_counter() - started)
+        turn += 1
+
+
+def worker(database_url, replica_urls, first_writer, args):
+    configure(database_url, replica_urls)
+    from app import app, DB_ROUTED_READS
+    
+    results = {'write': [], 'read': [], 'status': [], 'violations': 0}
+    done = threading.Event()
+    readers = [threading.Thread(target=reader, args=(app, args, results, done)) for _ in range(args.readers)]
+    writers = [
+        threading.Thread(target=writer, args=(app, first_writer + number, args, results))
+        for number in range(args.writers)
+    ]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+    results['routed'] = Counter({labels[0]: value for labels, value in DB_ROUTED_READS.values.items()})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--replicas', type=int, default=2, help='SQLite replica copies; 0 reads from the primary')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--writers', type=int, default=4, help='writer threads per worker')
+    parser.add_argument('--readers', type=int, default=4, help='reader threads per worker')
+    parser.add_argument('--bookings', type=int, default=50, help='bookings per writer')
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--history', type=int, default=20000, help='bookings already in the database')
+    args = parser.parse_args()
+    
+    copy_replicas = not os.environ.get('DATABASE_URL')
+    if not copy_replicas:
+        database_url, replica_urls = os.environ['DATABASE_URL'], os.environ.get('DATABASE_REPLICA_URLS', '')
+    else:
+        directory = tempfile.mkdtemp()
+        database_url = f"sqlite:///{os.path.join(directory, 'primary.db')}"
+        replica_urls = ','.join(
+            f"sqlite:///{os.path.join(directory, f'replica_{number}.db')}" for number in range(1, args.replicas + 1)
+        )
+    configure(database_url, replica_urls)
+    from app import app, db, HotelRoom, Booking
+    
+    with app.app_context():
+        db.session.execute(db.insert(HotelRoom), [
+            {'name': f'Room {i}', 'hotel_name': 'Bench Hotel', 'room_type': 'Double', 'capacity': 2,
+             'price_per_night': 1000} for i in range(args.rooms)
+        ])
+        db.session.execute(db.insert(Booking), [
+            {'user_id': 1, 'booking_type': 'hotel_room', 'hotel_room_id': 2 + i % args.rooms,
+             'check_in_date': date(2030, 1, 1) + timedelta(days=i // args.rooms * 2),
+             'check_out_date': date(2030, 1, 2) + timedelta(days=i // args.rooms * 2),
+             'total_price': 1000, 'guests': 1, 'status': 'confirmed'} for i in range(args.history)
+        ])
+        db.session.commit()
+        if copy_replicas and replica_urls:
+            print(app.test_cli_runner().invoke(args=['sync-replicas']).output, end='')
+        for engine in db.engines.values():
+            engine.dispose()
+    
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        per_worker = pool.starmap(worker, [
+            (database_url, replica_urls, number * args.writers, args) for number in range(args.workers)
+        ])
+    elapsed = time.perf_counter() - started
+    
+    writes = [value for results in per_worker for value in results['write']]
+    reads = [value for results in per_worker for value in results['read']]
+    created = sum(status == 201 for results in per_worker for status in results['status'])
+    violations = sum(results['violations'] for results in per_worker)
+    routed = sum((results['routed'] for results in per_worker), Counter())
+    print(f"replicas:      {len([url for url in replica_urls.split(',') if url])}")
+    print(f'bookings:      {created} created of {len(writes)} in {elapsed:.2f}s')
+    print(f'write latency: p50 {percentile(writes, 0.5) * 1000:.2f} ms  p95 {percentile(writes, 0.95) * 1000:.2f} ms')
+    print(f'reads:         {len(reads)}, p50 {percentile(reads, 0.5) * 1000:.2f} ms  '
+          f'p95 {percentile(reads, 0.95) * 1000:.2f} ms')
+    print(f'served by:     {dict(sorted(routed.items())) or "primary (no replicas configured)"}')
+    print('RESULT:        ' + (f'{violations} read-your-writes violations' if violations else 'ok, no stale reads'))
+    sys.exit(1 if violations or created != len(writes) else 0)
+
+
+if __name__ == '__main__':
+    main()
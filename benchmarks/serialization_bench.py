@@ -0,0 +1,84 @@
+"""Rows/sec serializing a page of bookings: ORM to_dict() + jsonify vs. the
+column-select serializer, with orjson and with the stdlib fallback.
+
+    python benchmarks/serialization_bench.py --rows 500 --seed 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'serialization_bench.db')}"
+os.environ['JOB_POLL_INTERVAL'] = '0'
+os.environ['PAYMENT_GATEWAY'] = 'fake'
+os.environ['PAYMENT_WEBHOOK_SECRET'] = 'bench-webhook-secret'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as application  # noqa: E402
+from app import app, db, Booking, BOOKING_FIELDS, serialize_rows, dumps  # noqa: E402
+from flask import jsonify  # noqa: E402
+
+MIN_SECONDS = 2.0
+
+
+def seed(count):
+    db.session.execute(db.insert(Booking), [{
+        'user_id': 1,
+        'booking_type': 'hotel_room',
+        'hotel_room_id': 1,
+        'check_in_date': date(2024, 1, 1) + timedelta(days=i % 365),
+        'check_out_date': date(2024, 1, 2) + timedelta(days=i % 365),
+        'total_price': 15000.0,
+        'guests': 2,
+        'special_requests': 'Late check-in',
+        'created_at': datetime(2024, 1, 1),
+    } for i in range(count)])
+    db.session.commit()
+
+
+def orm_path(rows):
+    bookings = Booking.query.order_by(Booking.id).limit(rows).all()
+    return jsonify({'items': [booking.to_dict() for booking in bookings]}).get_data()
+
+
+def column_path(rows):
+    result = db.session.execute(db.select(*BOOKING_FIELDS).order_by(Booking.id).limit(rows))
+    return dumps({'items': serialize_rows(result, BOOKING_FIELDS)})
+
+
+def rows_per_second(path, rows):
+    pages = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < MIN_SECONDS:
+        path(rows)
+        db.session.expunge_all()
+        pages += 1
+    return pages * rows / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500, help='rows per response')
+    parser.add_argument('--seed', type=int, default=20000)
+    args = parser.parse_args()
+    
+    with app.test_request_context():
+        seed(args.seed)
+        orjson = application.orjson
+        results = [('to_dict() + jsonify', rows_per_second(orm_path, args.rows))]
+        if orjson is not None:
+            results.append(('columns + orjson', rows_per_second(column_path, args.rows)))
+        application.orjson = None
+        results.append(('columns + json', rows_per_second(column_path, args.rows)))
+        application.orjson = orjson
+    
+    baseline = results[0][1]
+    print(f"{'path':<22} {'rows/s':>10} {'speedup':>8}")
+    for name, rate in results:
+        print(f'{name:<22} {rate:>10.0f} {rate / baseline:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
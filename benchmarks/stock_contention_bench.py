@@ -0,0 +1,99 @@
+"""Concurrent buyers hammering a single hot item.
+
+Spawns worker processes (standing in for gunicorn workers), each running a
+pool of buyer threads that repeatedly order one unit of the same item
+through POST /api/orders. Afterwards it checks that the item was never
+oversold: successful orders + remaining stock == initial stock.
+
+    python benchmarks/stock_contention_bench.py --workers 4 --buyers 32 --stock 2000
+
+Set DATABASE_URL to run against PostgreSQL instead of a throwaway SQLite file.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure(database_url):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['JOB_POLL_INTERVAL'] = '0'
+    os.environ['PAYMENT_GATEWAY'] = 'fake'
+    os.environ['PAYMENT_WEBHOOK_SECRET'] = 'bench-webhook-secret'
+    os.environ['RATE_LIMITING'] = 'false'
+    sys.path.insert(0, ROOT)
+
+
+def buyer(app, item_id, orders_per_buyer, results):
+    client = app.test_client()
+    client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    for _ in range(orders_per_buyer):
+        response = client.post('/api/orders', json={'item_id': item_id, 'quantity': 1})
+        results[response.status_code] += 1
+
+
+def worker(database_url, item_id, buyers, orders_per_buyer):
+    configure(database_url)
+    from app import app
+    
+    results = Counter()
+    threads = [
+        threading.Thread(target=buyer, args=(app, item_id, orders_per_buyer, results))
+        for _ in range(buyers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--buyers', type=int, default=32, help='buyer threads per worker')
+    parser.add_argument('--orders', type=int, default=25, help='orders attempted per buyer')
+    parser.add_argument('--stock', type=int, default=2000)
+    args = parser.parse_args()
+    
+    database_url = os.environ.get('DATABASE_URL') or \
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stock_bench.db')}"
+    configure(database_url)
+    from app import app, db, ShoppingItem, Order
+    
+    with app.app_context():
+        item = ShoppingItem(name='Hot item', category='Bench', price=1, stock=args.stock, vendor='Bench')
+        db.session.add(item)
+        db.session.commit()
+        item_id = item.id
+    
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        per_worker = pool.starmap(worker, [(database_url, item_id, args.buyers, args.orders)] * args.workers)
+    elapsed = time.perf_counter() - started
+    
+    results = sum(per_worker, Counter())
+    with app.app_context():
+        remaining = db.session.get(ShoppingItem, item_id).stock
+        ordered = db.session.query(db.func.coalesce(db.func.sum(Order.quantity), 0)) \
+            .filter(Order.item_id == item_id).scalar()
+    
+    attempts = sum(results.values())
+    print(f'buyers:        {args.workers * args.buyers}')
+    print(f'attempts:      {attempts}')
+    print(f'responses:     {dict(results)}')
+    print(f'throughput:    {attempts / elapsed:.0f} orders/s')
+    print(f'stock:         {args.stock} initial, {remaining} remaining, {ordered} ordered')
+    oversold = remaining < 0 or ordered + remaining != args.stock or results[201] != ordered
+    print('RESULT:        ' + ('OVERSOLD' if oversold else 'ok, no oversell'))
+    sys.exit(1 if oversold else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Webhook intake under a burst, then the verification job draining it.
+
+Seeds --payments pending bookings with fake-gateway payments, then fires one
+signed `payment.captured` delivery per payment plus --duplicates redeliveries
+(as a fraction), shuffled, at a gunicorn server from --concurrency clients.
+Reports deliveries/s, latency and how many were deduplicated, then times
+process_payment_events() applying the queued events and checks that every
+booking was paid exactly once.
+
+    python benchmarks/webhook_throughput_bench.py --payments 20000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'webhook_throughput_bench.db')}"
+os.environ['JOB_POLL_INTERVAL'] = '0'
+os.environ['PAYMENT_GATEWAY'] = 'fake'
+os.environ['PAYMENT_WEBHOOK_SECRET'] = 'bench-webhook-secret'
+sys.path.insert(0, ROOT)
+
+from app import (  # noqa: E402
+    app, db, Booking, Payment, WebhookEvent, payment_gateway, minor_units, process_payment_events
+)
+
+PRICE = 15000.0
+CHUNK = 50000
+
+
+def seed(payments):
+    now = datetime.utcnow()
+    for start in range(0, payments, CHUNK):
+        ids = range(start + 1, min(start + CHUNK, payments) + 1)
+        db.session.execute(db.insert(Booking), [{
+            'id': i, 'user_id': 1, 'booking_type': 'hotel_room', 'hotel_room_id': 1,
+            'check_in_date': date(2030, 1, 1), 'check_out_date': date(2030, 1, 2),
+            'total_price': PRICE, 'created_at': now,
+        } for i in ids])
+        db.session.execute(db.insert(Payment), [{
+            'user_id': 1, 'booking_id': i, 'amount': PRICE, 'currency': 'INR',
+            'gateway': payment_gateway.name, 'gateway_order_id': f'order_fake_{i}',
+        } for i in ids])
+    db.session.commit()
+
+
+def deliveries(payments, duplicates):
+    events = []
+    for i in range(1, payments + 1):
+        body = json.dumps({'event': 'payment.captured', 'payload': {'payment': {'entity': {
+            'id': f'pay_{i}', 'order_id': f'order_fake_{i}', 'amount': minor_units(PRICE),
+            'currency': 'INR', 'status': 'captured',
+        }}}}).encode()
+        events.append((
+            f'POST /api/payments/webhook HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n'
+            f'X-Razorpay-Event-Id: evt_{i}\r\nX-Razorpay-Signature: {payment_gateway.sign(body)}\r\n'
+            f'Content-Length: {len(body)}\r\n\r\n'
+        ).encode() + body)
+    events += random.choices(events, k=int(payments * duplicates))
+    random.shuffle(events)
+    return events
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, workers):
+    process = subprocess.Popen(
+        ['gunicorn', 'app:app', '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--backlog', '4096'],
+        cwd=ROOT, env=os.environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/api/shopping-items?limit=1', timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('gunicorn did not start')
+
+
+async def sender(port, queue, latencies, statuses):
+    reader = writer = None
+    while queue:
+        request = queue.pop()
+        started = time.monotonic()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            head = await reader.readuntil(b'\r\n\r\n')
+            headers = dict(
+                line.split(': ', 1) for line in head.decode('latin-1').lower().split('\r\n')[1:] if ': ' in line
+            )
+            await reader.readexactly(int(headers.get('content-length', 0)))
+            statuses.append(int(head.split(b' ', 2)[1]))
+            if headers.get('connection') == 'close':
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError):
+            # Not acknowledged: the gateway would deliver it again
+            queue.insert(0, request)
+            if writer is not None:
+                writer.close()
+            writer = None
+            continue
+        latencies.append(time.monotonic() - started)
+    if writer is not None:
+        writer.close()
+
+
+async def burst(port, requests, concurrency):
+    queue = list(requests)
+    latencies, statuses = [], []
+    await asyncio.gather(*[sender(port, queue, latencies, statuses) for _ in range(concurrency)])
+    return latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--payments', type=int, default=20000)
+    parser.add_argument('--duplicates', type=float, default=0.25, help='redeliveries as a fraction of payments')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    
+    with app.app_context():
+        seed(args.payments)
+    requests = deliveries(args.payments, args.duplicates)
+    
+    port = free_port()
+    process = start_server(port, args.workers)
+    try:
+        started = time.perf_counter()
+        latencies, statuses = asyncio.run(burst(port, requests, args.concurrency))
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+    
+    latencies.sort()
+    print(f'intake: {len(requests)} deliveries in {elapsed:.1f}s = {len(requests) / elapsed:.0f}/s, '
+          f'p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms')
+    print(f'        {statuses.count(202)} queued, {statuses.count(200)} duplicates, '
+          f'{len(statuses) - statuses.count(202) - statuses.count(200)} errors')
+    
+    with app.app_context():
+        started = time.perf_counter()
+        processed = 0
+        while True:
+            batch = process_payment_events()
+            db.session.expunge_all()
+            if not batch:
+                break
+            processed += batch
+        elapsed = time.perf_counter() - started
+        paid = db.session.scalar(db.select(db.func.count()).where(Booking.payment_status == 'paid'))
+        stored = db.session.scalar(db.select(db.func.count()).select_from(WebhookEvent))
+    print(f'verify: {processed} events in {elapsed:.1f}s = {processed / elapsed:.0f}/s, '
+          f'{stored} stored, {paid}/{args.payments} bookings paid')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""SQLite write throughput under concurrent workers, before and after tuning.
+
+Runs the same workload twice against fresh database files: once with the
+SQLite defaults (rollback journal, synchronous=FULL, the driver's 5s busy
+timeout) and once with the engine tuning from app.py (WAL,
+synchronous=NORMAL, busy_timeout, mmap). Each worker process submits
+contact messages through POST /api/contact from several threads.
+
+    python benchmarks/write_throughput_bench.py --workers 4 --threads 8 --requests 200
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'before (defaults)': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_BUSY_TIMEOUT_MS': '5000',  # what the sqlite3 driver sets by default
+        'SQLITE_MMAP_SIZE': '0',
+    },
+    'after (tuned)': {},
+}
+
+
+def writer(app, requests, results):
+    client = app.test_client()
+    for i in range(requests):
+        response = client.post('/api/contact', json={
+            'name': 'Bench', 'email': 'bench@example.com', 'message': f'message {i}'
+        })
+        results[response.status_code] += 1
+
+
+def worker(environ, threads, requests):
+    os.environ.update(environ)
+    sys.path.insert(0, ROOT)
+    import logging
+    logging.disable(logging.CRITICAL)
+    from app import app
+    
+    results = Counter()
+    pool = [threading.Thread(target=writer, args=(app, requests, results)) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return results
+
+
+def run(profile, args):
+    environ = dict(
+        PROFILES[profile],
+        DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'write_bench.db')}",
+        JOB_POLL_INTERVAL='0',
+        PAYMENT_GATEWAY='fake',
+        PAYMENT_WEBHOOK_SECRET='bench-webhook-secret',
+        RATE_LIMITING='false',
+    )
+    # Create the schema once before the workers race for it
+    with multiprocessing.Pool(1) as pool:
+        pool.apply(worker, (environ, 0, 0))
+    
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        per_worker = pool.starmap(worker, [(environ, args.threads, args.requests)] * args.workers)
+    elapsed = time.perf_counter() - started
+    
+    results = sum(per_worker, Counter())
+    print(f'{profile:<20} {results[201] / elapsed:>10.0f} writes/s {sum(results.values()) - results[201]:>8} failed')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8, help='writer threads per worker')
+    parser.add_argument('--requests', type=int, default=200, help='writes per thread')
+    args = parser.parse_args()
+    
+    print(f'{args.workers} workers x {args.threads} threads x {args.requests} writes')
+    for profile in PROFILES:
+        run(profile, args)
+
+
+if __name__ == '__main__':
+    main()
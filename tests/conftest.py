@@ -0,0 +1,48 @@
+"""Fixtures for the API tests.
+
+The app reads its configuration from the environment on import, so the
+database, an (initially empty) read replica and the fake payment gateway are
+set here before any test imports it. test_migrations.py runs the app in a
+subprocess against its own database instead.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = tempfile.mkdtemp()
+
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(DATA_DIR, 'primary.db')}",
+    DATABASE_REPLICA_URLS=f"sqlite:///{os.path.join(DATA_DIR, 'replica.db')}",
+    REPLICA_HEALTH_INTERVAL='0',
+    JOB_POLL_INTERVAL='0',
+    RATE_LIMITING='true',
+    PAYMENT_GATEWAY='fake',
+    PAYMENT_WEBHOOK_SECRET='test-webhook-secret',
+)
+os.environ.pop('RATE_LIMIT_STORE_URL', None)
+os.environ.pop('CATALOG_CACHE_URL', None)
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# A client signed in as the sample admin account
+@pytest.fixture
+def admin(app):
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    assert response.status_code == 200, response.get_json()
+    return client
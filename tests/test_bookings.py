@@ -0,0 +1,22 @@
+"""Booking availability: overlapping stays are rejected."""
+
+
+def book_hall(client, check_in, check_out):
+    return client.post('/api/bookings', json={
+        'booking_type': 'wedding_hall', 'wedding_hall_id': 1,
+        'check_in_date': check_in, 'check_out_date': check_out
+    })
+
+
+def test_overlapping_booking_is_rejected(admin):
+    assert book_hall(admin, '2035-06-01', '2035-06-03').status_code == 201
+    
+    response = book_hall(admin, '2035-06-02', '2035-06-04')
+    assert response.status_code == 409
+    assert response.get_json()['error'] == 'Selected dates are not available'
+
+
+# Stays are half-open: checking in on another booking's check-out day is fine
+def test_back_to_back_bookings_are_allowed(admin):
+    assert book_hall(admin, '2035-07-01', '2035-07-03').status_code == 201
+    assert book_hall(admin, '2035-07-03', '2035-07-05').status_code == 201
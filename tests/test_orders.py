@@ -0,0 +1,28 @@
+"""Shopping orders: concurrent orders never sell more than the stock."""
+from concurrent.futures import ThreadPoolExecutor
+
+STOCK = 3
+BUYERS = 8
+
+
+def test_concurrent_orders_do_not_oversell(app, admin):
+    from app import db, ShoppingItem
+    
+    with app.app_context():
+        item = db.session.get(ShoppingItem, 1)
+        item.stock = STOCK
+        db.session.commit()
+    
+    cookie = admin.get_cookie(app.config['SESSION_COOKIE_NAME'])
+    
+    def order(_):
+        client = app.test_client()
+        client.set_cookie(cookie.key, cookie.value)
+        return client.post('/api/orders', json={'item_id': 1, 'quantity': 1}).status_code
+    
+    with ThreadPoolExecutor(BUYERS) as pool:
+        statuses = list(pool.map(order, range(BUYERS)))
+    
+    assert sorted(statuses) == [201] * STOCK + [409] * (BUYERS - STOCK)
+    with app.app_context():
+        assert db.session.get(ShoppingItem, 1).stock == 0
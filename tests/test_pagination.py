@@ -0,0 +1,23 @@
+"""Cursor pagination on the list endpoints."""
+import pytest
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', '!!!', 'eyJ4IjogMX0'])
+def test_invalid_cursor_is_rejected(client, cursor):
+    response = client.get(f'/api/wedding-halls?cursor={cursor}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
+
+
+def test_next_cursor_walks_every_page(client):
+    seen = []
+    cursor = None
+    while True:
+        query = f'limit=2&cursor={cursor}' if cursor else 'limit=2'
+        page = client.get(f'/api/hotel-rooms?{query}').get_json()
+        seen.extend(room['id'] for room in page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == sorted(set(seen))
+    assert len(seen) == len(client.get('/api/hotel-rooms?limit=500').get_json()['items'])
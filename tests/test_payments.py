@@ -0,0 +1,50 @@
+"""Payment webhooks: signatures are checked and redeliveries are deduplicated."""
+import json
+
+
+def deliver(client, payment_gateway, payment, event_id, signature=None):
+    body = json.dumps({'event': 'payment.captured', 'payload': {'payment': {'entity': {
+        'id': 'pay_test', 'order_id': payment['gateway_order_id'], 'amount': payment['amount'],
+        'currency': payment['currency'], 'status': 'captured'
+    }}}}).encode()
+    return client.post('/api/payments/webhook', data=body, content_type='application/json', headers={
+        'X-Razorpay-Signature': signature or payment_gateway.sign(body),
+        'X-Razorpay-Event-Id': event_id
+    })
+
+
+def create_payment(admin):
+    booking = admin.post('/api/bookings', json={
+        'booking_type': 'hotel_room', 'hotel_room_id': 1,
+        'check_in_date': '2036-01-01', 'check_out_date': '2036-01-03'
+    })
+    assert booking.status_code == 201, booking.get_json()
+    response = admin.post('/api/payments', json={'booking_id': booking.get_json()['booking']['id']})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['payment']
+
+
+def test_webhook_redelivery_is_deduplicated(app, admin, client):
+    from app import db, payment_gateway, WebhookEvent
+    payment = create_payment(admin)
+    
+    first = deliver(client, payment_gateway, payment, 'evt_redelivered')
+    second = deliver(client, payment_gateway, payment, 'evt_redelivered')
+    
+    assert first.status_code == 202
+    assert second.status_code == 200
+    assert second.get_json() == {'status': 'duplicate'}
+    with app.app_context():
+        events = db.session.scalars(db.select(WebhookEvent).filter_by(event_id='evt_redelivered')).all()
+        assert len(events) == 1
+
+
+def test_webhook_with_bad_signature_is_rejected(app, client):
+    from app import db, payment_gateway, WebhookEvent
+    payment = {'gateway_order_id': 'order_forged', 'amount': 100, 'currency': 'INR'}
+    
+    response = deliver(client, payment_gateway, payment, 'evt_forged', signature='0' * 64)
+    
+    assert response.status_code == 400
+    with app.app_context():
+        assert db.session.scalars(db.select(WebhookEvent).filter_by(event_id='evt_forged')).first() is None
@@ -0,0 +1,14 @@
+"""Rate limits: a client over its budget gets 429 with Retry-After."""
+
+# The contact form allows 5 messages a minute per client address
+CONTACT_BURST = 5
+
+
+def test_contact_form_is_rate_limited(client):
+    message = {'name': 'Test', 'email': 'test@example.com', 'message': 'Hello'}
+    for _ in range(CONTACT_BURST):
+        assert client.post('/api/contact', json=message).status_code == 201
+    
+    response = client.post('/api/contact', json=message)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0